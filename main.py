@@ -1,16 +1,50 @@
+import time
+
+_T0 = time.perf_counter()  # before Qt is imported, for --startup-benchmark
+
 from PySide6 import QtWidgets, QtCore, QtGui
+import json
 import sys
 import os
 from spritesheet_builder.builder_app import BuilderApp
 
 
+class _FirstPaint(QtCore.QObject):
+    """Prints startup timings once the main window has painted, then quits."""
+
+    def __init__(self, marks: dict):
+        super().__init__()
+        self.marks = marks
+
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.Type.Paint and "first_paint" not in self.marks:
+            self.marks["first_paint"] = time.perf_counter()
+            # let the paint finish before quitting
+            QtCore.QTimer.singleShot(0, self._report)
+        return False
+
+    def _report(self):
+        result = {name: round((t - _T0) * 1000, 1) for name, t in self.marks.items()}
+        result["loaded_modules"] = sorted(m for m in sys.modules if m.startswith("spritesheet_builder."))
+        print(json.dumps(result, indent=2))
+        QtWidgets.QApplication.quit()
+
+
 def main():
+    # --startup-benchmark: print ms from process start to imports, window and first paint
+    benchmark = "--startup-benchmark" in sys.argv
+    marks = {"imports": time.perf_counter()}
     QtCore.QCoreApplication.setOrganizationName("AISpritesheet")
     QtCore.QCoreApplication.setApplicationName("Sprite Sheet Builder")
     app = QtWidgets.QApplication(sys.argv)
+    marks["app"] = time.perf_counter()
 
     window = BuilderApp()
     window.resize(1200, 800)
+    marks["window"] = time.perf_counter()
+    if benchmark:
+        probe = _FirstPaint(marks)
+        window.installEventFilter(probe)
     window.show()
 
     sys.exit(app.exec())
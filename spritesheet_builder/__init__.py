@@ -1 +1,8 @@
+"""Sprite Sheet Builder.
+
+The core modules (project_model, folder_index, frame_sources, dedupe,
+compose, bundle, journal, path_resolver, cli) use only the stdlib and
+Pillow and never import Qt; everything else is GUI. GUI pages and dialogs
+are imported on first use to keep startup fast.
+"""
 __all__ = []
@@ -0,0 +1,194 @@
+from __future__ import annotations
+import dataclasses
+from PySide6 import QtGui, QtCore
+from .project_model import ProjectModel, GridConfig
+from .image_utils import prepare_tile, sheet_size, cell_rect
+from .image_jobs import ImageJobQueue
+
+
+class LiveAtlas(QtCore.QObject):
+    """In-memory composed spritesheet, patched one cell at a time.
+
+    Holds the same pixels `_compose_spritesheet` would produce for the current
+    cells so previews and export can read straight from it.
+    """
+    changed = QtCore.Signal(QtCore.QRect)  # sheet-space rect that was repainted
+    reset = QtCore.Signal()  # whole sheet reallocated (grid/crop change)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._grid: GridConfig | None = None  # snapshot the pixels were built with
+        self._project: ProjectModel | None = None
+        self._image = QtGui.QImage()
+        self._cells: list[list[str | None]] = []
+        # Bulk patches decode tiles in the background; cells waiting per path
+        self._jobs = ImageJobQueue(self)
+        self._jobs.ready.connect(self._on_tile_ready)
+        self._waiters: dict[str, set[tuple[int, int]]] = {}
+
+    def configure(self, project: ProjectModel):
+        """Allocate an empty sheet for the project's grid."""
+        self._project = project
+        self._allocate()
+        self.reset.emit()
+
+    def _allocate(self):
+        self._jobs.cancel_all()
+        self._waiters.clear()
+        g = self._project.grid
+        self._grid = dataclasses.replace(g)
+        size = sheet_size(g)
+        self._image = QtGui.QImage(max(1, size.width()), max(1, size.height()), QtGui.QImage.Format.Format_ARGB32)
+        self._image.fill(QtCore.Qt.GlobalColor.transparent)
+        self._cells = [[None] * g.cols for _ in range(g.rows)]
+
+    def image(self) -> QtGui.QImage:
+        return self._image
+
+    def grid(self) -> GridConfig | None:
+        return self._grid
+
+    def cell_path(self, row: int, col: int) -> str | None:
+        if 0 <= row < len(self._cells) and 0 <= col < len(self._cells[row]):
+            return self._cells[row][col]
+        return None
+
+    def set_cell(self, row: int, col: int, path: str | None):
+        """Re-compose a single cell. No-op if the path is unchanged."""
+        if self._grid is None:
+            return
+        if not (0 <= row < len(self._cells) and 0 <= col < len(self._cells[row])):
+            return
+        if self._cells[row][col] == path:
+            return
+        self._cells[row][col] = path
+        tile = prepare_tile(str(path), self._grid) if path else None
+        rect = self._paint_cell(row, col, tile)
+        self.changed.emit(rect)
+
+    def apply_changes(self, changes: list, _label: str = ""):
+        """Patch a list of (row, col, old, new) edits, e.g. from GridWidget.cells_changed.
+
+        A single edit is composed immediately; bulk edits decode their tiles
+        in the background and patch the sheet as each one arrives.
+        """
+        if self._grid is None:
+            return
+        if len(changes) == 1:
+            row, col, _old, path = changes[0]
+            self.set_cell(row, col, path)
+            return
+        dirty: QtCore.QRect | None = None
+        for row, col, _old, path in changes:
+            if not (0 <= row < len(self._cells) and 0 <= col < len(self._cells[row])):
+                continue
+            if self._cells[row][col] == path:
+                continue
+            self._cells[row][col] = path
+            if path:
+                self._request_tile(row, col, path)
+            else:
+                rect = self._paint_cell(row, col, None)
+                dirty = rect if dirty is None else dirty.united(rect)
+        if dirty is not None:
+            self.changed.emit(dirty)
+
+    def refresh_paths(self, paths):
+        """Re-compose (in the background) every cell showing one of these
+        sources, e.g. after the files were re-rendered on disk."""
+        paths = set(paths)
+        for r, row in enumerate(self._cells):
+            for c, p in enumerate(row):
+                if p in paths:
+                    self._request_tile(r, c, p)
+
+    def _request_tile(self, row: int, col: int, path: str):
+        waiting = self._waiters.get(path)
+        if waiting is not None:
+            waiting.add((row, col))
+            return
+        self._waiters[path] = {(row, col)}
+        self._jobs.submit(path, prepare_tile, str(path), self._grid)
+
+    def _on_tile_ready(self, path: str, tile: QtGui.QImage):
+        dirty: QtCore.QRect | None = None
+        for r, c in self._waiters.pop(path, ()):
+            # skip cells reassigned while the tile was decoding
+            if self._cells[r][c] != path:
+                continue
+            rect = self._paint_cell(r, c, tile)
+            dirty = rect if dirty is None else dirty.united(rect)
+        if dirty is not None:
+            self.changed.emit(dirty)
+
+    def diagnostics(self) -> dict:
+        return {"bytes": self._image.sizeInBytes(), "size": [self._image.width(), self._image.height()], "pending_tiles": self.pending()}
+
+    def pending(self) -> int:
+        """Number of tiles still decoding."""
+        return self._jobs.pending()
+
+    def wait(self):
+        """Finish all background decoding and apply it (blocking)."""
+        while self._jobs.pending():
+            self._jobs.wait()
+            QtCore.QCoreApplication.processEvents()
+
+    def _paint_cell(self, row: int, col: int, tile: QtGui.QImage | None) -> QtCore.QRect:
+        rect = cell_rect(self._grid, row, col)
+        painter = QtGui.QPainter(self._image)
+        painter.setCompositionMode(QtGui.QPainter.CompositionMode.CompositionMode_Source)
+        painter.fillRect(rect, QtCore.Qt.GlobalColor.transparent)
+        if tile is not None:
+            if not tile.isNull():
+                painter.setCompositionMode(QtGui.QPainter.CompositionMode.CompositionMode_SourceOver)
+                # center within tile rect
+                dx = rect.x() + (rect.width() - tile.width()) // 2
+                dy = rect.y() + (rect.height() - tile.height()) // 2
+                painter.drawImage(QtCore.QPoint(dx, dy), tile)
+            else:
+                # unreadable source: treated as empty, same as export
+                self._cells[row][col] = None
+        painter.end()
+        return rect
+
+    def rebuild(self, cells: list[list[str | None]] | None = None):
+        """Recompose every cell, e.g. after a crop/scale or grid change."""
+        if self._project is None:
+            return
+        if cells is None:
+            cells = self._cells
+        self._allocate()
+        self.reset.emit()
+        # always take the background path so a crop tweak never stalls the UI
+        for r in range(self._grid.rows):
+            row = cells[r] if r < len(cells) else []
+            for c in range(self._grid.cols):
+                p = row[c] if c < len(row) else None
+                if p:
+                    self._cells[r][c] = p
+                    self._request_tile(r, c, p)
+
+    def is_current(self, project: ProjectModel, cells: list[list[str | None]]) -> bool:
+        """True if the held pixels match this grid config and these cells."""
+        if self._grid is None or project.grid != self._grid or self.pending():
+            return False
+        for r in range(self._grid.rows):
+            row = cells[r] if r < len(cells) else []
+            for c in range(self._grid.cols):
+                p = row[c] if c < len(row) else None
+                if (p or None) != self._cells[r][c]:
+                    return False
+        return True
+
+    def frame_rect(self, row: int, col: int) -> QtCore.QRect:
+        return cell_rect(self._grid, row, col) if self._grid else QtCore.QRect()
+
+    def row_rects(self, row: int) -> list[QtCore.QRect]:
+        """Rects of the non-empty cells of a row, in column order."""
+        if self._grid is None or not (0 <= row < len(self._cells)):
+            return []
+        return [cell_rect(self._grid, row, c) for c, p in enumerate(self._cells[row]) if p]
+
+    def frames(self) -> list[list[QtCore.QRect]]:
+        return [self.row_rects(r) for r in range(len(self._cells))]
@@ -1,10 +1,23 @@
-from PySide6 import QtWidgets, QtCore
+from PySide6 import QtWidgets, QtCore, QtGui
+import copy
+import os
 from .welcome_page import WelcomePage
-from .editor_page import EditorPage
 from .project_model import ProjectModel
+from .journal import ProjectJournal, replay_journal, journal_path
+from .path_resolver import resolve_cell_paths
+from .frame_sources import source_basename
+
+
+# Interval between background compactions of the change journal
+AUTOSAVE_INTERVAL_MS = 30_000
 
 
 class BuilderApp(QtWidgets.QMainWindow):
+    # Emitted from the journal worker thread; delivered on the GUI thread
+    _journal_error = QtCore.Signal(str)
+    _journal_saved = QtCore.Signal(str)
+    _save_failed = QtCore.Signal(str, str, object)  # path, error, previous project path
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Sprite Sheet Builder")
@@ -21,6 +34,20 @@ class BuilderApp(QtWidgets.QMainWindow):
         self._stack.addWidget(self.welcome)
 
         self.editor = None  # type: EditorPage | None
+        # Background export in progress (exporter.ExportTask); the editor is read-only meanwhile
+        self._export_task = None
+        self._diagnostics = None  # non-modal DiagnosticsDialog, created on first use
+
+        # Autosave: edits go to a journal next to the project file and are
+        # periodically compacted into it on a background thread
+        self.journal: ProjectJournal | None = None
+        self._journal_error.connect(lambda msg: self.statusBar().showMessage(f"Autosave error: {msg}", 10000))
+        self._journal_saved.connect(lambda msg: self.statusBar().showMessage(msg, 5000))
+        self._save_failed.connect(self._on_save_failed)
+        self._autosave_timer = QtCore.QTimer(self)
+        self._autosave_timer.setInterval(AUTOSAVE_INTERVAL_MS)
+        self._autosave_timer.timeout.connect(self._autosave)
+        self._autosave_timer.start()
 
         self._stack.setCurrentWidget(self.welcome)
 
@@ -34,15 +61,28 @@ class BuilderApp(QtWidgets.QMainWindow):
         act_save = file_menu.addAction("Save Project")
         act_save_as = file_menu.addAction("Save Project As…")
         act_export = file_menu.addAction("Export Bundle…")
+        act_export_shared = file_menu.addAction("Export Shared Atlas…")
         file_menu.addSeparator()
         act_back = file_menu.addAction("Back to Welcome")
+        # actions that would change or replace the project; disabled while exporting
+        self._edit_actions = [act_open, act_export, act_export_shared, act_back]
 
         act_open.triggered.connect(self._on_open_project)
         act_save.triggered.connect(self._on_save_project)
         act_save_as.triggered.connect(self._on_save_project_as)
         act_export.triggered.connect(self._on_export_bundle)
+        act_export_shared.triggered.connect(self._on_export_shared_atlas)
         act_back.triggered.connect(self._back_to_welcome)
 
+        edit_menu = mb.addMenu("&Edit")
+        self.act_undo = edit_menu.addAction("Undo")
+        self.act_undo.setShortcut(QtGui.QKeySequence.StandardKey.Undo)
+        self.act_redo = edit_menu.addAction("Redo")
+        self.act_redo.setShortcut(QtGui.QKeySequence.StandardKey.Redo)
+        self.act_undo.triggered.connect(lambda: self.editor and self.editor.undo())
+        self.act_redo.triggered.connect(lambda: self.editor and self.editor.redo())
+        self._update_undo_actions()
+
         settings_menu = mb.addMenu("&Settings")
         act_save_settings = settings_menu.addAction("Save Settings As…")
         act_load_settings = settings_menu.addAction("Load Settings…")
@@ -51,6 +91,11 @@ class BuilderApp(QtWidgets.QMainWindow):
         act_save_settings.triggered.connect(self._on_save_settings)
         act_load_settings.triggered.connect(self._on_load_settings_apply_current)
         act_apply_settings_new.triggered.connect(self._on_new_from_settings)
+        self._edit_actions += [act_load_settings, act_apply_settings_new]
+
+        tools_menu = mb.addMenu("&Tools")
+        act_diagnostics = tools_menu.addAction("Diagnostics…")
+        act_diagnostics.triggered.connect(self._on_diagnostics)
 
     @QtCore.Slot(ProjectModel)
     def _on_create_project(self, project: ProjectModel):
@@ -61,25 +106,48 @@ class BuilderApp(QtWidgets.QMainWindow):
             # Update existing project fields
             self.project.sheet_name = project.sheet_name
             self.project.source_folder = project.source_folder
+            self.project.source_frame_size = project.source_frame_size
             self.project.grid = project.grid
             self.project.rows_meta = project.rows_meta
+            self.project.export = project.export
             # Reload editor with updated settings
             self.editor.load_project(self.project)
             # Re-apply previous cells (will clip to new grid size if changed)
             if cells:
                 self.editor.grid.set_all_paths(cells)
                 self.editor._refresh_row_preview()
+                self.editor.reset_history()
+            # Grid shape may have changed; journal positions restart from a snapshot
+            self._autosave(force=True)
         else:
             # No project open; create new
+            self._close_journal()
             self.project = project
             self.project_path = None
-            if self.editor is None:
-                self.editor = EditorPage()
-                self.editor.request_back.connect(self._back_to_welcome)
-                self._stack.addWidget(self.editor)
+            self._ensure_editor()
             self.editor.load_project(self.project)
         self._stack.setCurrentWidget(self.editor)
 
+    def _ensure_editor(self):
+        if self.editor is None:
+            # imported on first use: the editor pulls in most of the GUI
+            from .editor_page import EditorPage
+            self.editor = EditorPage()
+            self.editor.request_back.connect(self._back_to_welcome)
+            self.editor.history_changed.connect(self._update_undo_actions)
+            self.editor.change_recorded.connect(self._on_change_recorded)
+            self._stack.addWidget(self.editor)
+
+    def _update_undo_actions(self):
+        history = self.editor.history if self.editor else None
+        exporting = self._export_task is not None
+        can_undo = bool(history and history.can_undo()) and not exporting
+        can_redo = bool(history and history.can_redo()) and not exporting
+        self.act_undo.setEnabled(can_undo)
+        self.act_redo.setEnabled(can_redo)
+        self.act_undo.setText(f"Undo {history.undo_label()}" if can_undo else "Undo")
+        self.act_redo.setText(f"Redo {history.redo_label()}" if can_redo else "Redo")
+
     @QtCore.Slot()
     def _back_to_welcome(self):
         # Toggle welcome button to Update if a project exists
@@ -99,51 +167,54 @@ class BuilderApp(QtWidgets.QMainWindow):
 
     # --- File ops ---
     def _resolve_cells(self, cells, cells_basenames, source_folder: str):
-        """Return a 2D list of paths by preferring absolute cells when they exist,
-        otherwise resolving via basenames within source_folder."""
-        if cells is None and cells_basenames is None:
-            return None
-        rows = cells or cells_basenames or []
-        out = []
-        for r_idx, row in enumerate(rows):
-            out_row = []
-            for c_idx, val in enumerate(row):
-                path = None
-                # prefer existing absolute path
-                if cells and r_idx < len(cells) and c_idx < len(cells[r_idx]):
-                    cand = cells[r_idx][c_idx]
-                    if isinstance(cand, str) and QtCore.QFile.exists(cand):
-                        path = cand
-                if path is None and cells_basenames and r_idx < len(cells_basenames) and c_idx < len(cells_basenames[r_idx]):
-                    base = cells_basenames[r_idx][c_idx]
-                    if isinstance(base, str):
-                        cand2 = QtCore.QDir(source_folder).filePath(base)
-                        if QtCore.QFile.exists(cand2):
-                            path = cand2
-                out_row.append(path)
-            out.append(out_row)
-        return out
+        """Return (2D list of paths, missing references) by preferring absolute
+        cells when they exist, otherwise resolving via basenames within
+        source_folder. Each involved folder is listed once (unfiltered: the
+        source index only lists PNGs, but cells may hold other files)."""
+        return resolve_cell_paths(cells, cells_basenames, source_folder)
+
+    def _report_missing(self, missing: list[str]):
+        if not missing:
+            return
+        shown = "\n".join(missing[:15])
+        more = f"\n… and {len(missing) - 15} more" if len(missing) > 15 else ""
+        QtWidgets.QMessageBox.warning(
+            self,
+            "Missing Frames",
+            f"{len(missing)} source image(s) referenced by this project were not found; those cells were left empty:\n\n{shown}{more}",
+        )
+
     def _on_open_project(self):
         path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Open Project", "", "Project Files (*.json *.plj);;All Files (*)")
         if not path:
             return
         try:
             proj, cells, cells_basenames = ProjectModel.load_json(path)
+            # Crash recovery: re-apply edits that never reached the project file
+            recovered = 0
+            if os.path.exists(journal_path(path)):
+                cells, recovered = replay_journal(path, proj, cells)
+                cells_basenames = [[source_basename(p) if p else None for p in row] for row in cells]
         except Exception as e:
             QtWidgets.QMessageBox.critical(self, "Open Failed", f"Could not open project:\n{e}")
             return
+        self._close_journal()
         self.project = proj
         self.project_path = path
-        if self.editor is None:
-            self.editor = EditorPage()
-            self.editor.request_back.connect(self._back_to_welcome)
-            self._stack.addWidget(self.editor)
+        self._ensure_editor()
         self.editor.load_project(self.project)
-        resolved = self._resolve_cells(cells, cells_basenames, self.project.source_folder)
+        resolved, missing = self._resolve_cells(cells, cells_basenames, self.project.source_folder)
         if resolved:
             self.editor.grid.set_all_paths(resolved)
             # Also refresh preview if a row already selected
             self.editor._refresh_row_preview()
+            # Loading is not an undoable step
+            self.editor.reset_history()
+        self._open_journal(path)
+        self._report_missing(missing)
+        if recovered:
+            self.statusBar().showMessage(f"Recovered {recovered} unsaved change(s) from the autosave journal.", 10000)
+            self._autosave(force=True)
         self._stack.setCurrentWidget(self.editor)
 
     def _do_save(self, path: str | None, include_cells: bool) -> bool:
@@ -154,28 +225,97 @@ class BuilderApp(QtWidgets.QMainWindow):
             save_path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Save Project", "", "Project Files (*.json *.plj);;All Files (*)")
             if not save_path:
                 return False
-        cells = self.editor.grid.get_all_paths() if include_cells else None
+        if include_cells:
+            # Full project saves are written by the journal worker, off the GUI thread;
+            # "Project saved." or a Save Failed dialog follows once the write is done
+            previous = self.project_path
+            if self.journal is None or self.journal.project_path != save_path:
+                self._close_journal()
+                self._open_journal(save_path)
+            self.project_path = save_path
+            self.statusBar().showMessage("Saving…")
+            self._autosave(
+                force=True,
+                message="Project saved.",
+                on_failed=lambda err: self._save_failed.emit(save_path, err, previous),
+            )
+            return True
         try:
-            self.project.save_json(save_path, cells)
+            self.project.save_json(save_path, None)
         except Exception as e:
             QtWidgets.QMessageBox.critical(self, "Save Failed", f"Could not save project:\n{e}")
             return False
-        if include_cells:
-            self.project_path = save_path
         return True
 
     def _on_save_project(self):
-        ok = self._do_save(None, include_cells=True)
-        if ok:
-            QtWidgets.QMessageBox.information(self, "Saved", "Project saved.")
+        self._do_save(None, include_cells=True)
 
     def _on_save_project_as(self):
         path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Save Project As", "", "Project Files (*.json *.plj);;All Files (*)")
         if not path:
             return
-        ok = self._do_save(path, include_cells=True)
-        if ok:
-            QtWidgets.QMessageBox.information(self, "Saved", "Project saved.")
+        self._do_save(path, include_cells=True)
+
+    def _on_save_failed(self, path: str, error: str, previous: str | None):
+        self.statusBar().clearMessage()
+        if self.project_path == path and previous != path:
+            # Save As did not happen: keep journaling next to the previous file
+            # (edits since then live on in memory and the next autosave)
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
+            self.project_path = previous
+            if previous:
+                self._open_journal(previous)
+                self._autosave(force=True)
+        QtWidgets.QMessageBox.critical(self, "Save Failed", f"Could not save project to:\n{path}\n\n{error}")
+
+    # --- Autosave journal ---
+    def _open_journal(self, path: str):
+        self.journal = ProjectJournal(path, on_error=self._journal_error.emit)
+
+    def _close_journal(self):
+        """Save pending journal records into the current project file and stop the worker."""
+        if self.journal is None:
+            return
+        self._autosave()
+        self.journal.close()
+        self.journal = None
+
+    def _on_change_recorded(self, record: dict):
+        if self.journal is not None:
+            self.journal.append(record)
+
+    def _autosave(self, force: bool = False, message: str = "Autosaved.", on_failed=None):
+        """Queue a background compaction of the journal into the project file.
+        Failures go to the status bar unless `on_failed(error)` is given."""
+        if self.journal is None or not self.project or not self.editor:
+            return
+        if not force and not self.journal.is_dirty():
+            return
+        # Snapshot on the GUI thread; encoding and disk I/O happen on the worker
+        data = copy.deepcopy(self.project.to_dict())
+        cells = self.editor.grid.get_all_paths()
+        self.journal.compact(data, cells, on_done=lambda: self._journal_saved.emit(message), on_failed=on_failed)
+
+    def closeEvent(self, event: QtGui.QCloseEvent) -> None:
+        if self._export_task is not None:
+            # stop the worker so its staging folder is removed
+            self._export_task.cancel()
+            self._export_task.wait(10.0)
+        if self.editor is not None:
+            self.editor.live_export.stop()
+            self.editor.live_export.wait()
+        self._close_journal()
+        super().closeEvent(event)
+
+    def _on_diagnostics(self):
+        if self._diagnostics is None:
+            from .diagnostics_dialog import DiagnosticsDialog
+            self._diagnostics = DiagnosticsDialog(lambda: self.editor, self)
+        self._diagnostics.show()
+        self._diagnostics.raise_()
+        self._diagnostics.activateWindow()
 
     # --- Settings ops ---
     def _on_save_settings(self):
@@ -210,8 +350,10 @@ class BuilderApp(QtWidgets.QMainWindow):
         # Apply grid + rows meta
         self.project.grid = proj_loaded.grid
         self.project.rows_meta = proj_loaded.rows_meta
+        self.project.export = proj_loaded.export
         # Refresh editor visuals
         self.editor.load_project(self.project)
+        self._autosave(force=True)
         QtWidgets.QMessageBox.information(self, "Settings Applied", "Settings applied to current project.")
 
     def _on_new_from_settings(self):
@@ -230,7 +372,7 @@ class BuilderApp(QtWidgets.QMainWindow):
         name, ok = QtWidgets.QInputDialog.getText(self, "Sheet Name", "Enter sheet name:", text=proj_loaded.sheet_name or "")
         if not ok or not name.strip():
             return
-        new_proj = ProjectModel(sheet_name=name.strip(), source_folder=folder, grid=proj_loaded.grid, rows_meta=proj_loaded.rows_meta)
+        new_proj = ProjectModel(sheet_name=name.strip(), source_folder=folder, grid=proj_loaded.grid, rows_meta=proj_loaded.rows_meta, export=proj_loaded.export)
         ok_valid, msg = new_proj.validate()
         if not ok_valid:
             QtWidgets.QMessageBox.warning(self, "Invalid Project", msg)
@@ -247,8 +389,60 @@ class BuilderApp(QtWidgets.QMainWindow):
         except Exception as e:
             QtWidgets.QMessageBox.critical(self, "Exporter Error", f"Failed to import exporter: {e}")
             return
+        if self._export_task is not None:
+            return
         cells = self.editor.grid.get_all_paths()
         try:
-            exporter.export_bundle(self, self.project, cells)
+            task = exporter.export_bundle(self, self.project, cells, atlas=self.editor.atlas)
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(self, "Export Failed", str(e))
+            return
+        if task is None:
+            return
+        self._export_task = task
+        task.ended.connect(self._on_export_ended)
+        self._set_exporting(True)
+
+    def _on_export_ended(self):
+        self._export_task = None
+        self._set_exporting(False)
+
+    def _set_exporting(self, on: bool):
+        """Keep the editor viewable but read-only while an export runs."""
+        for act in self._edit_actions:
+            act.setEnabled(not on)
+        if self.editor:
+            self.editor.set_read_only(on)
+        self._update_undo_actions()
+        if on:
+            self.statusBar().showMessage("Exporting… the editor is read-only until the export finishes.")
+        else:
+            self.statusBar().clearMessage()
+
+    def _on_export_shared_atlas(self):
+        paths, _ = QtWidgets.QFileDialog.getOpenFileNames(self, "Projects to Pack Together", "", "Spritesheet Project (*.json)")
+        if not paths:
+            return
+        dest = QtWidgets.QFileDialog.getExistingDirectory(self, "Choose Shared Atlas Folder")
+        if not dest:
+            return
+        try:
+            from .shared_atlas import export_shared_atlas
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(self, "Exporter Error", f"Failed to import exporter: {e}")
+            return
+        QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.CursorShape.WaitCursor)
+        try:
+            summary = export_shared_atlas(paths, dest)
         except Exception as e:
+            QtWidgets.QApplication.restoreOverrideCursor()
             QtWidgets.QMessageBox.critical(self, "Export Failed", str(e))
+            return
+        QtWidgets.QApplication.restoreOverrideCursor()
+        QtWidgets.QMessageBox.information(
+            self,
+            "Export Complete",
+            f"Packed {summary['projects']} projects ({summary['reused_projects']} unchanged) into {summary['pages']} page(s).\n"
+            f"{summary['frames']} unique frames for {summary['frame_refs']} references; "
+            f"{summary['new_frames']} newly packed, {summary['pages_written']} page(s) rewritten.\n\n{dest}",
+        )
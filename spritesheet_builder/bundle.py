@@ -0,0 +1,280 @@
+from __future__ import annotations
+from pathlib import Path
+import hashlib
+import json
+import shutil
+import zipfile
+from .project_model import ProjectModel
+from .bundle_helper import pack_meta
+from .postprocess import wants_postprocess, process_sheet
+from .compose import check_cancel, collapse_duplicates
+from .frame_sources import identity
+from .sound_bank import pack_sounds
+
+# Qt-free bundle writing shared by the GUI exporter, the shared atlas and the
+# command line. The sheet is anything with .save(path) (QImage or PIL image;
+# PIL when texture post-processing is enabled); frames are per-row lists of
+# (x, y, w, h).
+
+# Bump when the bundle layout or composition changes, so fingerprints of
+# bundles written by older versions no longer match.
+EXPORT_VERSION = 1
+
+
+def python_helper_code() -> str:
+    # The helper ships verbatim as python_helper.py; it must only use the stdlib
+    # (plus optional NumPy) since games import it without this package.
+    return (Path(__file__).with_name("bundle_helper.py")).read_text(encoding="utf-8")
+
+
+def copy_sound(f: str, sounds_dir: Path, rel: str) -> str:
+    """Copy a sound into sounds_dir and return its bundle-relative path
+    (`rel` + file name). Missing files keep their original reference."""
+    if not f:
+        return f
+    src_path = Path(f)
+    if not src_path.exists():
+        return f
+    dst = sounds_dir / src_path.name
+    try:
+        if dst.resolve() != src_path.resolve():
+            shutil.copy2(src_path, dst)
+    except Exception:
+        pass
+    return f"{rel}/{dst.name}"
+
+
+def rows_meta(project: ProjectModel, sounds_dir: Path, rel: str = "sounds") -> list[dict]:
+    """Per-row name/fps/loop_mode/sounds entries (frames left empty), copying row sounds."""
+    rows = []
+    for r in range(project.grid.rows):
+        meta = project.rows_meta.get(r)
+        name = meta.name if meta and getattr(meta, 'name', None) else f"row_{r}"
+        fps = int(meta.fps) if meta else 6
+        loop_mode = meta.loop_mode if meta else "pingpong"
+        sounds = list(meta.sounds) if meta and getattr(meta, 'sounds', None) else []
+        # For sounds in rows, rewrite file to relative if possible and copy into sounds/
+        new_sounds = []
+        for snd in sounds:
+            snd = dict(snd)
+            snd["file"] = copy_sound(snd.get("file", ""), sounds_dir, rel)
+            new_sounds.append(snd)
+        rows.append({"name": name, "fps": fps, "loop_mode": loop_mode, "frames": [], "sounds": new_sounds})
+    return rows
+
+
+def trigger_sounds_meta(project: ProjectModel, sounds_dir: Path, rel: str = "sounds") -> list[dict]:
+    # Global trigger sounds 0..15 -> copy and relativize
+    trigger_sounds = []
+    for ts in project.trigger_sounds:
+        ts = dict(ts or {})
+        ts["file"] = copy_sound(ts.get("file", ""), sounds_dir, rel)
+        ts["volume"] = float(ts.get("volume", 1.0))
+        trigger_sounds.append(ts)
+    # ensure length 16
+    if len(trigger_sounds) < 16:
+        trigger_sounds.extend({"file": "", "volume": 1.0} for _ in range(16 - len(trigger_sounds)))
+    return trigger_sounds[:16]
+
+
+def build_meta(project: ProjectModel, rows: list[dict], trigger_sounds: list[dict]) -> dict:
+    g = project.grid
+    return {
+        "sheet_name": project.sheet_name,
+        "image": "spritesheet.png",
+        "grid": {
+            "cols": g.cols,
+            "rows": g.rows,
+            "tile_width": g.tile_width,
+            "tile_height": g.tile_height,
+            "padding": g.padding,
+            "margin": g.margin,
+            "power_of_two": g.power_of_two,
+            "crop_enabled": g.crop_enabled,
+            "offset_x": g.offset_x,
+            "offset_y": g.offset_y,
+            "source_scale": getattr(g, 'source_scale', 100),
+            "color_key": g.color_key,
+            "key_tolerance": g.key_tolerance,
+        },
+        "rows": rows,
+        "trigger_sounds": trigger_sounds,
+    }
+
+
+def _fingerprint_path(project: ProjectModel, dest_dir: Path) -> Path:
+    return Path(dest_dir) / f".{project.sheet_name}.fingerprint"
+
+
+def sound_files(project: ProjectModel) -> list[str]:
+    """Source paths of all row and trigger sounds ("" for unset slots)."""
+    sounds = [s.get("file", "") for m in project.rows_meta.values() for s in (m.sounds or [])]
+    sounds += [(ts or {}).get("file", "") for ts in project.trigger_sounds]
+    return sounds
+
+
+def export_fingerprint(project: ProjectModel, cells: list[list[str | None]]) -> str:
+    """Hash of everything a bundle is built from: settings, row metadata,
+    each cell source and sound file (path, mtime, size), the exporter
+    version and the shipped helper. Only stats files, never decodes them."""
+    sounds = sound_files(project)
+    state = {
+        "version": EXPORT_VERSION,
+        "project": project.to_dict(),
+        "cells": [[identity(p) if p else None for p in row] for row in cells],
+        "sounds": [identity(f) if f else None for f in sounds],
+        "helper": hashlib.sha256(python_helper_code().encode("utf-8")).hexdigest(),
+    }
+    # identity() returns None for missing files; keep the path so a file
+    # appearing later still changes the fingerprint
+    blob = json.dumps(state, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def bundle_up_to_date(project: ProjectModel, dest_dir: Path, fingerprint: str) -> bool:
+    """True when <dest>/<sheet_name> and its ZIP were written from exactly
+    these inputs (same fingerprint) and are still present."""
+    dest_dir = Path(dest_dir)
+    name = project.sheet_name
+    try:
+        stored = _fingerprint_path(project, dest_dir).read_text(encoding="utf-8").strip()
+    except OSError:
+        return False
+    if stored != fingerprint:
+        return False
+    if not (dest_dir / f"{name}.zip").is_file() or not (dest_dir / name / "meta.json").is_file():
+        return False
+    if project.export.previews and not (dest_dir / name / "previews").is_dir():
+        return False
+    return True
+
+
+def store_fingerprint(project: ProjectModel, dest_dir: Path, fingerprint: str):
+    """Record the inputs of a completed export (call after previews too)."""
+    try:
+        _fingerprint_path(project, dest_dir).write_text(fingerprint + "\n", encoding="utf-8")
+    except OSError:
+        pass
+
+
+def write_bundle(project: ProjectModel, dest_dir: Path, sheet, frames: list[list], progress=None, cancel=None) -> tuple[Path, dict]:
+    """Write <dest>/<sheet_name>/ (sheet, meta.json, optional meta.bin, sounds,
+    python_helper.py) and <dest>/<sheet_name>.zip. Returns (zip path, meta).
+
+    Everything is written to a hidden staging folder first and moved into
+    place at the end, so an error or cancellation (`cancel` is a
+    threading.Event) leaves the previous export untouched. `progress` is
+    called as progress(stage, done, total) with stage "encoding" or "zipping".
+    """
+    dest_dir = Path(dest_dir)
+    name = project.sheet_name
+    staging = dest_dir / f".{name}.partial"
+    if staging.exists():
+        shutil.rmtree(staging, ignore_errors=True)
+    bundle_dir = staging / name
+    sounds_dir = bundle_dir / "sounds"
+    sounds_dir.mkdir(parents=True)
+    report = progress or (lambda stage, done, total: None)
+    try:
+        sheet_path = bundle_dir / "spritesheet.png"
+        texture = None
+        mip_paths: list[Path] = []
+        steps = 1 + (max(0, project.export.mip_levels) if wants_postprocess(project.export) else 0)
+        report("encoding", 0, steps)
+        if wants_postprocess(project.export):
+            sheet, mips, texture = process_sheet(project.grid, project.export, sheet)
+            for level, mip in enumerate(mips, start=1):
+                check_cancel(cancel)
+                p = bundle_dir / f"spritesheet_mip{level}.png"
+                mip.save(p)
+                mip_paths.append(p)
+                texture["mips"].append({"image": p.name, "width": mip.width, "height": mip.height})
+                report("encoding", level, steps)
+        check_cancel(cancel)
+        sheet.save(str(sheet_path))
+        report("encoding", steps, steps)
+        check_cancel(cancel)
+
+        rows = rows_meta(project, sounds_dir)
+        for r, row in enumerate(rows):
+            # Frames: only include non-empty positions from composed frames
+            row["frames"] = [[int(v) for v in box] for box in (frames[r] if r < len(frames) else [])]
+        meta = build_meta(project, rows, trigger_sounds_meta(project, sounds_dir))
+        if texture is not None:
+            meta["texture"] = texture
+        if project.export.sound_bank:
+            check_cancel(cancel)
+            pack_sounds(meta, bundle_dir)
+
+        (bundle_dir / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        bin_path = bundle_dir / "meta.bin"
+        if project.export.binary_meta:
+            bin_path.write_bytes(pack_meta(meta))
+        (bundle_dir / "python_helper.py").write_text(python_helper_code(), encoding="utf-8")
+
+        # PNG and audio are stored uncompressed so load_bundle can map them without a copy
+        entries = [(p, zipfile.ZIP_STORED) for p in [sheet_path] + mip_paths]
+        entries += [(bundle_dir / "meta.json", zipfile.ZIP_DEFLATED), (bundle_dir / "python_helper.py", zipfile.ZIP_DEFLATED)]
+        if bin_path.exists():
+            entries.append((bin_path, zipfile.ZIP_STORED))
+        # include sounds
+        entries += [(f, zipfile.ZIP_STORED) for f in sounds_dir.iterdir() if f.is_file()]
+        staged_zip = staging / f"{name}.zip"
+        with zipfile.ZipFile(staged_zip, "w", zipfile.ZIP_DEFLATED) as z:
+            for i, (p, compression) in enumerate(entries):
+                check_cancel(cancel)
+                z.write(p, p.relative_to(staging), compression)
+                report("zipping", i + 1, len(entries))
+        check_cancel(cancel)
+
+        # commit: swap the finished bundle in for the previous one; the old
+        # fingerprint no longer describes it until the caller stores a new one
+        final_dir = dest_dir / name
+        zip_path = dest_dir / f"{name}.zip"
+        _fingerprint_path(project, dest_dir).unlink(missing_ok=True)
+        old = staging / ".old"
+        if final_dir.exists():
+            final_dir.rename(old)
+        try:
+            bundle_dir.rename(final_dir)
+            staged_zip.replace(zip_path)
+        except BaseException:
+            # put the previous export back before the staging folder is removed
+            if old.exists():
+                if final_dir.exists():
+                    shutil.rmtree(final_dir, ignore_errors=True)
+                old.rename(final_dir)
+            raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return zip_path, meta
+
+
+def write_composed(project: ProjectModel, cells: list[list[str | None]], dest_dir: Path, sheet, frames: list[list], fingerprint: str | None = None) -> tuple[Path, dict, list[list]]:
+    """Finish a headless export from a composed Pillow sheet: collapse
+    duplicates, write the bundle and previews, then record the fingerprint.
+    `sheet` is not modified. Returns (zip path, meta, frames written)."""
+    dest_dir = Path(dest_dir)
+    if project.duplicate_threshold >= 0:
+        frames, cleared = collapse_duplicates(project, cells, frames)
+        if cleared:
+            sheet = sheet.copy()
+            for x, y, w, h in cleared:
+                sheet.paste((0, 0, 0, 0), (x, y, x + w, y + h))
+    zip_path, meta = write_bundle(project, dest_dir, sheet, frames)
+    if project.export.previews:
+        write_previews(sheet, frames, meta["rows"], dest_dir / project.sheet_name, project.export.previews)
+    store_fingerprint(project, dest_dir, fingerprint or export_fingerprint(project, cells))
+    return zip_path, meta, frames
+
+
+def write_previews(sheet, frames: list[list], rows: list[dict], bundle_dir: Path, fmt: str) -> str:
+    """Animated per-row previews for review (kept out of the ZIP). `sheet`
+    is a PIL image. Returns a short listing for display."""
+    from .previews import write_row_previews
+    results = write_row_previews(sheet, frames, rows, bundle_dir / "previews", fmt)
+    total = sum(size for _n, _p, size in results)
+    lines = "\n".join(f"  {path.name}: {size / 1024:.1f} KB" for _n, path, size in results[:12])
+    if len(results) > 12:
+        lines += f"\n  … {len(results) - 12} more in {bundle_dir / 'previews'}"
+    return f"Previews ({total / 1024:.1f} KB):\n{lines}"
@@ -0,0 +1,767 @@
+# Auto-generated helper for spritesheet bundle
+import io, json, math, mmap, socket, struct, sys, time, wave, zipfile
+from array import array
+from pathlib import Path
+
+try:  # optional: vectorized AnimatorPool
+    import numpy as np
+except ImportError:  # pure-Python fallback
+    np = None
+
+class Animator:
+    """Plays one animation row.
+
+    State is just the accumulated animation time; the frame index is derived
+    from it in closed form, so `advance` costs the same for any dt and
+    `seek(t_ms)` jumps anywhere in O(1). Sound triggers are precomputed into a
+    frame -> [(offset_ms, event)] table and fire on animation time, not wall
+    time.
+    """
+
+    def __init__(self, frames, fps=6, loop_mode="pingpong", sounds=None):
+        self.frames = []
+        self.fps = 6
+        self.loop_mode = "pingpong"
+        self.sounds = []
+        self.set_animation(frames, fps, loop_mode, sounds)
+
+    def set_animation(self, frames, fps=None, loop_mode=None, sounds=None):
+        self.frames = frames or []
+        if fps is not None: self.fps = max(1, int(fps))
+        if loop_mode is not None: self.loop_mode = loop_mode if loop_mode in ("loop","pingpong") else "pingpong"
+        if sounds is not None: self.sounds = sounds
+        self.frame_events = {}
+        for frame, off, event in build_sound_table(self.sounds, len(self.frames), self.fps):
+            self.frame_events.setdefault(frame, []).append((off, event))
+        self.seek(0.0)
+
+    @property
+    def interval_ms(self):
+        return 1000.0 / self.fps
+
+    def index_at(self, t_ms):
+        """Frame index shown at animation time t_ms."""
+        return frame_index(int(max(0.0, t_ms) * self.fps // 1000), len(self.frames), self.loop_mode)
+
+    def seek(self, t_ms):
+        """Jump to animation time t_ms (e.g. for replays or network sync).
+        Sounds between the old and new time are not emitted."""
+        self.t_ms = max(0.0, float(t_ms))
+        self._started = False  # time-0 triggers fire once, on the first advance
+        self.idx = self.index_at(self.t_ms)
+        return self.frames[self.idx] if self.frames else None
+
+    def advance(self, dt_ms):
+        t0 = self.t_ms
+        t1 = t0 + max(0.0, float(dt_ms))
+        self.t_ms = t1
+        self.idx = self.index_at(t1)
+        frame = self.frames[self.idx] if self.frames else None
+        events = []
+        fresh = t0 <= 0 and not self._started
+        self._started = True
+        if t1 > t0 or fresh:
+            interval = self.interval_ms
+            n = len(self.frames)
+            for trig, entries in self.frame_events.items():
+                for off, event in entries:
+                    # steps whose trigger time k*interval+off falls in (t0, t1];
+                    # time 0 itself counts on the first advance after a seek,
+                    # so frame-0 sounds fire once on start (also for dt=0)
+                    k0 = -1 if fresh else math.floor((t0 - off) / interval)
+                    k1 = math.floor((t1 - off) / interval)
+                    if _frame_hits(k0, k1, trig, n, self.loop_mode):
+                        events.append(dict(event))
+        return frame, events
+
+def frame_index(step, n, loop_mode):
+    """Frame shown after `step` whole frame intervals (closed form)."""
+    if n <= 1:
+        return 0
+    if loop_mode == "loop":
+        return step % n
+    period = 2 * n - 2
+    p = step % period
+    return p if p < n else period - p
+
+
+def _frame_hits(k0, k1, frame, n, loop_mode):
+    """How many steps k in (k0, k1] land on `frame`."""
+    if n <= 0:
+        return 0
+    def upto(k, phase, period):
+        # number of k' in [0, k] with k' % period == phase
+        return 0 if k < phase else (k - phase) // period + 1
+    if loop_mode == "loop" or n == 1:
+        phases, period = (frame,), n
+    else:
+        period = 2 * n - 2
+        phases = (frame,) if frame in (0, n - 1) else (frame, period - frame)
+    return sum(upto(k1, ph, period) - upto(k0, ph, period) for ph in phases)
+
+
+def build_sound_table(sounds, n, fps):
+    """Precompute sound triggers as (frame, offset_ms, event).
+
+    A sound fires when its trigger frame is entered; with repeat_ms > 0 it
+    re-fires every repeat_ms while that frame is still showing.
+    """
+    interval = 1000.0 / max(1, int(fps))
+    table = []
+    for s in sounds or []:
+        frame = int(s.get("trigger_frame", 0))
+        if n and not 0 <= frame < n:
+            continue
+        event = {"name": s.get("name") or "sound", "file": s.get("file", ""), "volume": float(s.get("volume", 1.0))}
+        rep = int(s.get("repeat_ms", 0))
+        offsets = [0.0]
+        if rep > 0:
+            offsets += [float(m * rep) for m in range(1, int(math.ceil(interval / rep))) if m * rep < interval]
+        for off in offsets:
+            table.append((frame, off, event))
+    return table
+
+
+class AnimatorPool:
+    """Struct-of-arrays animator for many entities sharing a bundle's animations.
+
+    Each entity is a slot holding an animation id and its accumulated
+    animation time. `advance(dt_ms)` steps every live entity in one call and
+    returns (rects, events): rects[slot] is the frame rect (x, y, w, h) of each
+    slot (zeros for free slots), events is a list of (slot, event) for sounds
+    triggered during this step. Frame indices are computed in closed form from
+    animation time, so large dt costs the same as small dt. Uses NumPy when
+    available, otherwise plain lists.
+    """
+
+    def __init__(self, animations, capacity=64):
+        self.names = list(animations)
+        self._ids = {name: i for i, name in enumerate(self.names)}
+        rows = [animations[name] for name in self.names]
+        self._n = [len(r.get("frames") or []) for r in rows]
+        self._fps = [max(1, int(r.get("fps", 6))) for r in rows]
+        self._pingpong = [r.get("loop_mode", "pingpong") != "loop" for r in rows]
+        self._offset = []
+        rects = []
+        for r in rows:
+            self._offset.append(len(rects))
+            rects.extend(tuple(f) for f in (r.get("frames") or []))
+        rects.append((0, 0, 0, 0))  # sentinel for empty animations / free slots
+        self._empty = len(rects) - 1
+        self._sounds = [build_sound_table(r.get("sounds"), n, fps) for r, n, fps in zip(rows, self._n, self._fps)]
+        self._free = []
+        self._count = 0
+        capacity = max(1, int(capacity))
+        if np is not None:
+            self._rects = np.asarray(rects, dtype=np.int32)
+            self._n_arr = np.asarray(self._n + [0], dtype=np.int64)
+            self._fps_arr = np.asarray(self._fps + [1], dtype=np.float64)
+            self._pp_arr = np.asarray(self._pingpong + [False], dtype=bool)
+            self._off_arr = np.asarray(self._offset + [self._empty], dtype=np.int64)
+            self.anim = np.full(capacity, len(self.names), dtype=np.int64)  # len(names) = free
+            self.t_ms = np.zeros(capacity, dtype=np.float64)
+            self.started = np.zeros(capacity, dtype=bool)  # time-0 triggers already fired
+        else:
+            self._rects = rects
+            self.anim = [len(self.names)] * capacity
+            self.t_ms = [0.0] * capacity
+            self.started = [False] * capacity
+
+    def __len__(self):
+        return self._count - len(self._free)
+
+    def _grow(self):
+        size = len(self.anim)
+        if np is not None:
+            self.anim = np.concatenate([self.anim, np.full(size, len(self.names), dtype=np.int64)])
+            self.t_ms = np.concatenate([self.t_ms, np.zeros(size, dtype=np.float64)])
+            self.started = np.concatenate([self.started, np.zeros(size, dtype=bool)])
+        else:
+            self.anim.extend([len(self.names)] * size)
+            self.t_ms.extend([0.0] * size)
+            self.started.extend([False] * size)
+
+    def spawn(self, name, t_ms=0.0):
+        """Add an entity playing animation `name`; returns its slot id."""
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self._count >= len(self.anim):
+                self._grow()
+            slot = self._count
+            self._count += 1
+        self.anim[slot] = self._ids[name]
+        self.t_ms[slot] = float(t_ms)
+        self.started[slot] = False
+        return slot
+
+    def despawn(self, slot):
+        self.anim[slot] = len(self.names)
+        self.t_ms[slot] = 0.0
+        self.started[slot] = False
+        self._free.append(slot)
+
+    def set_animation(self, slot, name, t_ms=0.0):
+        self.anim[slot] = self._ids[name]
+        self.t_ms[slot] = float(t_ms)
+        self.started[slot] = False
+
+    def frame_of(self, slot):
+        a = int(self.anim[slot])
+        if a >= len(self.names):
+            return 0
+        step = int(float(self.t_ms[slot]) * self._fps[a] // 1000)
+        return frame_index(step, self._n[a], "pingpong" if self._pingpong[a] else "loop")
+
+    def advance(self, dt_ms):
+        if np is not None:
+            return self._advance_np(float(dt_ms))
+        return self._advance_py(float(dt_ms))
+
+    def _advance_np(self, dt):
+        count = self._count
+        anim = self.anim[:count]
+        t0 = self.t_ms[:count].copy()
+        live = anim < len(self.names)
+        # slots at time 0 that have not advanced since spawn/set_animation
+        fresh = live & (t0 <= 0) & ~self.started[:count]
+        self.started[:count] |= live
+        self.t_ms[:count] = np.where(live, t0 + dt, 0.0)
+        t1 = self.t_ms[:count]
+        n = self._n_arr[anim]
+        fps = self._fps_arr[anim]
+        steps = np.floor(t1 * fps / 1000.0).astype(np.int64)
+        pingpong = self._pp_arr[anim]
+        period = np.where(pingpong, np.maximum(1, 2 * n - 2), np.maximum(1, n))
+        p = steps % period
+        idx = np.where(pingpong & (p >= n), period - p, p)
+        gidx = np.where(n > 0, self._off_arr[anim] + idx, self._empty)
+        rects = self._rects[gidx]
+        events = []
+        if any(self._sounds) and (dt > 0 or fresh.any()):
+            # group slots by animation once; a stable sort keeps slot order
+            order = np.argsort(anim, kind="stable")
+            ends = np.cumsum(np.bincount(anim, minlength=len(self.names) + 1))
+            for a, table in enumerate(self._sounds):
+                if not table:
+                    continue
+                slots = order[ends[a - 1] if a else 0:ends[a]]
+                if not slots.size:
+                    continue
+                na, interval = self._n[a], 1000.0 / self._fps[a]
+                pp = self._pingpong[a]
+                per = max(1, 2 * na - 2) if pp else max(1, na)
+                ts0, ts1, fr = t0[slots], t1[slots], fresh[slots]
+                for frame, off, event in table:
+                    # steps whose trigger time k*interval+off falls in (t0, t1];
+                    # a fresh entity also gets step 0
+                    k0 = np.where(fr, -1, np.floor((ts0 - off) / interval)).astype(np.int64)
+                    k1 = np.floor((ts1 - off) / interval).astype(np.int64)
+                    phases = (frame,) if (not pp or frame in (0, na - 1)) else (frame, per - frame)
+                    hit = np.zeros(slots.size, dtype=bool)
+                    for ph in phases:
+                        # count of k in (k0, k1] with k % per == ph, for k >= 0
+                        c1 = np.where(k1 >= ph, (k1 - ph) // per + 1, 0)
+                        c0 = np.where(k0 >= ph, (k0 - ph) // per + 1, 0)
+                        hit |= c1 > c0
+                    events.extend((int(s), dict(event)) for s in slots[hit])
+        return rects, events
+
+    def _advance_py(self, dt):
+        rects = []
+        events = []
+        names = len(self.names)
+        for slot in range(self._count):
+            a = self.anim[slot]
+            if a >= names:
+                rects.append(self._rects[self._empty])
+                continue
+            t0 = self.t_ms[slot]
+            t1 = t0 + dt
+            self.t_ms[slot] = t1
+            fresh = t0 <= 0 and not self.started[slot]
+            self.started[slot] = True
+            n, fps = self._n[a], self._fps[a]
+            mode = "pingpong" if self._pingpong[a] else "loop"
+            if n == 0:
+                rects.append(self._rects[self._empty])
+                continue
+            rects.append(self._rects[self._offset[a] + frame_index(int(t1 * fps // 1000), n, mode)])
+            if dt > 0 or fresh:
+                interval = 1000.0 / fps
+                for frame, off, event in self._sounds[a]:
+                    k0 = -1 if fresh else math.floor((t0 - off) / interval)
+                    k1 = math.floor((t1 - off) / interval)
+                    if _frame_hits(k0, k1, frame, n, mode):
+                        events.append((slot, dict(event)))
+        return rects, events
+
+
+class BundleMember:
+    """Lazy handle to one file inside a bundle ZIP (atlas image or sound).
+
+    Nothing is read until asked for. `view()` returns a memoryview; for
+    ZIP_STORED members (the exporter stores the PNG and sounds that way) it
+    points straight into the memory-mapped archive, so no copy is made.
+    """
+
+    def __init__(self, archive, info):
+        self._archive = archive
+        self.info = info
+        self.name = info.filename
+        self.size = info.file_size
+
+    @property
+    def stored(self):
+        return self.info.compress_type == zipfile.ZIP_STORED
+
+    def view(self):
+        return self._archive.view(self.info)
+
+    def read(self):
+        return bytes(self.view())
+
+    def open(self):
+        """Binary file object, e.g. for pygame.image.load / mixer.Sound."""
+        if self.stored:
+            return io.BytesIO(self.view())
+        return self._archive.zip.open(self.info)
+
+    def __repr__(self):
+        return f"BundleMember({self._archive.path.name!r}, {self.name!r})"
+
+
+class BundleArchive:
+    """Read-only view of an exported bundle ZIP, memory-mapped once."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.zip = zipfile.ZipFile(self._file)
+        names = [n for n in self.zip.namelist() if n.rsplit("/", 1)[-1] == "meta.json"]
+        if not names:
+            self.close()
+            raise FileNotFoundError(f"meta.json not found in {self.path}")
+        meta_name = min(names, key=lambda n: n.count("/"))
+        self.prefix = meta_name[: -len("meta.json")]
+        self.meta = json.loads(self.zip.read(meta_name).decode("utf-8"))
+
+    def member(self, name):
+        """Handle for a path relative to the bundle folder, or None."""
+        try:
+            return BundleMember(self, self.zip.getinfo(self.prefix + name))
+        except KeyError:
+            return None
+
+    def view(self, info):
+        if info.compress_type != zipfile.ZIP_STORED or info.flag_bits & 0x1:
+            return memoryview(self.zip.read(info))
+        # data follows the local header, whose extra field may differ from the central one
+        sig, *_rest, name_len, extra_len = struct.unpack_from("<IHHHHHIIIHH", self._mm, info.header_offset)
+        if sig != 0x04034B50:
+            raise zipfile.BadZipFile(f"bad local header for {info.filename}")
+        start = info.header_offset + 30 + name_len + extra_len
+        return memoryview(self._mm)[start:start + info.file_size]
+
+    def close(self):
+        self.zip.close()
+        try:
+            self._mm.close()
+        except BufferError:
+            pass  # views still alive; the map goes when they do
+        self._file.close()
+
+
+class BankSound:
+    """One sound of a packed sound bank (meta.json "sound_bank").
+
+    Same interface as BundleMember. `view()` is a zero-copy memoryview of
+    the raw PCM in the bank's format (e.g. pygame.mixer.Sound(buffer=...)
+    with the mixer set to the bank's sample_rate and channels); `open()`
+    wraps a copy in a WAV header for loaders that want a file.
+    """
+
+    def __init__(self, bank, name, offset, length):
+        self.bank = bank
+        self.name = name
+        self.offset = offset
+        self.size = length
+
+    def view(self):
+        return self.bank.data[self.offset:self.offset + self.size]
+
+    def read(self):
+        return bytes(self.view())
+
+    def open(self):
+        out = io.BytesIO()
+        with wave.open(out, "wb") as w:
+            w.setnchannels(self.bank.channels)
+            w.setsampwidth(self.bank.sample_width)
+            w.setframerate(self.bank.sample_rate)
+            w.writeframes(self.view())
+        out.seek(0)
+        return out
+
+    def __repr__(self):
+        return f"BankSound({self.name!r}, {self.size} bytes)"
+
+
+class SoundBank:
+    """All banked sounds of a bundle over one buffer (bytes, mmap or view)."""
+
+    def __init__(self, data, info):
+        self.data = memoryview(data)
+        self.sample_rate = int(info["sample_rate"])
+        self.channels = int(info["channels"])
+        self.sample_width = int(info["sample_width"])
+        self.sounds = {name: BankSound(self, name, int(off), int(size))
+                       for name, (off, size) in info.get("sounds", {}).items()}
+
+    def get(self, name):
+        return self.sounds.get(name)
+
+
+# meta.bin: optional binary mirror of meta.json (little-endian, 4-byte aligned)
+#   header   magic, version, header size, image string, counts, section offsets
+#   rows     name, fps, loop (1 = pingpong), first frame, frame count, first sound, sound count
+#   frames   x, y, w, h per frame, all rows back to back
+#   sounds   name, file, trigger_frame, repeat_ms, volume
+#   triggers file, volume (16 entries)
+#   strings  count, (offset, length) pairs, UTF-8 blob; string id -1 = ""
+BIN_MAGIC = b"SSBM"
+BIN_VERSION = 1
+_BIN_HEADER = struct.Struct("<4sHHi9I")
+_BIN_ROW = struct.Struct("<7i")
+_BIN_FRAME = struct.Struct("<4i")
+_BIN_SOUND = struct.Struct("<4if")
+_BIN_TRIGGER = struct.Struct("<if")
+
+
+def _align4(n):
+    return (n + 3) & ~3
+
+
+def pack_meta(meta):
+    """Encode a meta.json dict as meta.bin bytes."""
+    strings, ids = [], {}
+
+    def sid(text):
+        if not text:
+            return -1
+        if text not in ids:
+            ids[text] = len(strings)
+            strings.append(text.encode("utf-8"))
+        return ids[text]
+
+    rows, frames, sounds = bytearray(), bytearray(), bytearray()
+    n_frames = n_sounds = 0
+    for row in meta.get("rows", []):
+        row_frames = row.get("frames", [])
+        row_sounds = row.get("sounds", [])
+        rows += _BIN_ROW.pack(sid(row.get("name") or "row"), int(row.get("fps", 6)),
+                              int(row.get("loop_mode", "pingpong") != "loop"),
+                              n_frames, len(row_frames), n_sounds, len(row_sounds))
+        for f in row_frames:
+            frames += _BIN_FRAME.pack(*(int(v) for v in f))
+        for snd in row_sounds:
+            sounds += _BIN_SOUND.pack(sid(snd.get("name", "")), sid(snd.get("file", "")),
+                                      int(snd.get("trigger_frame", 0)), int(snd.get("repeat_ms", 0)),
+                                      float(snd.get("volume", 1.0)))
+        n_frames += len(row_frames)
+        n_sounds += len(row_sounds)
+    triggers = bytearray()
+    trigger_list = meta.get("trigger_sounds", [])
+    for ts in trigger_list:
+        triggers += _BIN_TRIGGER.pack(sid(ts.get("file", "")), float(ts.get("volume", 1.0)))
+    image = sid(meta.get("image", ""))
+    table, blob = bytearray(struct.pack("<I", len(strings))), bytearray()
+    for b in strings:
+        table += struct.pack("<II", len(blob), len(b))
+        blob += b
+    rows_off = _BIN_HEADER.size
+    frames_off = rows_off + len(rows)
+    sounds_off = frames_off + len(frames)
+    triggers_off = sounds_off + len(sounds)
+    strings_off = _align4(triggers_off + len(triggers))
+    header = _BIN_HEADER.pack(BIN_MAGIC, BIN_VERSION, _BIN_HEADER.size, image,
+                              len(meta.get("rows", [])), n_frames, n_sounds, len(trigger_list),
+                              rows_off, frames_off, sounds_off, triggers_off, strings_off)
+    out = header + rows + frames + sounds + triggers
+    return bytes(out + b"\0" * (strings_off - len(out)) + table + blob)
+
+
+class RectView:
+    """Read-only sequence of (x, y, w, h) over packed int32 frame data.
+
+    Rects are built on access; `ints` is the flat int32 memoryview of the
+    whole table (e.g. for numpy.frombuffer) and `raw()` this row's slice.
+    """
+    __slots__ = ("ints", "start", "count")
+
+    def __init__(self, ints, start, count):
+        self.ints = ints
+        self.start = start
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(self.count))]
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        o = 4 * (self.start + i)
+        return tuple(self.ints[o:o + 4])
+
+    def raw(self):
+        return self.ints[4 * self.start:4 * (self.start + self.count)]
+
+
+def read_meta_bin(buf):
+    """Decode meta.bin from a bytes-like buffer (mmap, memoryview, bytes).
+
+    Returns a dict shaped like meta.json ("image", "rows", "trigger_sounds")
+    whose row "frames" are RectViews over the buffer, not lists.
+    """
+    buf = memoryview(buf)
+    (magic, version, _hsize, image, n_rows, n_frames, n_sounds, n_triggers,
+     rows_off, frames_off, sounds_off, triggers_off, strings_off) = _BIN_HEADER.unpack_from(buf, 0)
+    if magic != BIN_MAGIC or version != BIN_VERSION:
+        raise ValueError("not a meta.bin file (or unsupported version)")
+    (n_strings,) = struct.unpack_from("<I", buf, strings_off)
+    blob = strings_off + 4 + 8 * n_strings
+    strings = [bytes(buf[blob + off:blob + off + size]).decode("utf-8")
+               for off, size in struct.iter_unpack("<II", buf[strings_off + 4:blob])]
+    text = lambda i: strings[i] if i >= 0 else ""
+    frame_bytes = buf[frames_off:frames_off + _BIN_FRAME.size * n_frames]
+    if sys.byteorder == "little":
+        ints = frame_bytes.cast("i")
+    else:
+        a = array("i", frame_bytes)
+        a.byteswap()
+        ints = memoryview(a)
+    sounds = [{"name": text(n), "file": text(f), "trigger_frame": t, "repeat_ms": r, "volume": round(v, 6)}
+              for n, f, t, r, v in _BIN_SOUND.iter_unpack(buf[sounds_off:sounds_off + _BIN_SOUND.size * n_sounds])]
+    rows = []
+    for name, fps, pingpong, first, count, s_first, s_count in _BIN_ROW.iter_unpack(buf[rows_off:rows_off + _BIN_ROW.size * n_rows]):
+        rows.append({
+            "name": text(name),
+            "fps": fps,
+            "loop_mode": "pingpong" if pingpong else "loop",
+            "frames": RectView(ints, first, count),
+            "sounds": sounds[s_first:s_first + s_count],
+        })
+    triggers = [{"file": text(f), "volume": round(v, 6)}
+                for f, v in _BIN_TRIGGER.iter_unpack(buf[triggers_off:triggers_off + _BIN_TRIGGER.size * n_triggers])]
+    return {"image": text(image), "rows": rows, "trigger_sounds": triggers}
+
+
+def load_bundle(bundle_dir):
+    """Load an exported bundle from its folder or directly from its ZIP.
+
+    Returns (image, animations, trigger_sounds). For a folder, image and
+    sound "file" entries are paths (row sounds relative to the bundle,
+    trigger sounds absolute); for a ZIP they are BundleMember handles
+    read lazily from the archive. If the bundle has a meta.bin it is used
+    instead of meta.json and frame lists are RectViews over it. Sounds in
+    a packed sound bank are BankSound slices of it; the bank is read with
+    one open and one read (or mapped from the ZIP).
+    """
+    bundle_dir = Path(bundle_dir)
+    bank = None
+    if bundle_dir.is_file() and zipfile.is_zipfile(bundle_dir):
+        archive = BundleArchive(bundle_dir)
+        binary = archive.member("meta.bin")
+        meta = read_meta_bin(binary.view()) if binary is not None else archive.meta
+        resolve = lambda f: (archive.member(f) or "") if f else ""
+        image_path = archive.member(meta["image"])
+        bank_info = archive.meta.get("sound_bank")
+        if bank_info and archive.member(bank_info["file"]) is not None:
+            bank = SoundBank(archive.member(bank_info["file"]).view(), bank_info)
+    else:
+        bin_path = bundle_dir / "meta.bin"
+        if bin_path.is_file():
+            with open(bin_path, "rb") as f:
+                meta = read_meta_bin(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            # meta.bin has no sound bank table; only then is meta.json needed
+            bank_info = None
+            if (bundle_dir / "sounds" / "soundbank.pcm").is_file():
+                bank_info = json.loads((bundle_dir / "meta.json").read_text(encoding="utf-8")).get("sound_bank")
+        else:
+            meta = json.loads((bundle_dir / "meta.json").read_text(encoding="utf-8"))
+            bank_info = meta.get("sound_bank")
+        resolve = None
+        image_path = bundle_dir / meta["image"]
+        if bank_info and (bundle_dir / bank_info["file"]).is_file():
+            with open(bundle_dir / bank_info["file"], "rb") as f:
+                bank = SoundBank(f.read(), bank_info)
+    in_folder = resolve is None
+    if bank is not None:
+        # banked sounds first; anything else (e.g. .ogg) stays a file, in the
+        # same form as without a bank
+        plain = resolve
+        resolve = lambda f: bank.get(f) or (plain(f) if plain else f)
+    animations = {}
+    for row in meta.get("rows", []):
+        name = row.get("name") or "row"
+        sounds = row.get("sounds", [])
+        if resolve is not None:
+            sounds = [dict(s, file=resolve(s.get("file", ""))) for s in sounds]
+        frames = row.get("frames", [])
+        animations[name] = {
+            "frames": frames if isinstance(frames, RectView) else [tuple(f) for f in frames],
+            "fps": int(row.get("fps", 6)),
+            "loop_mode": row.get("loop_mode", "pingpong"),
+            "sounds": sounds,
+        }
+    trigger_sounds = meta.get("trigger_sounds", [{"file": "", "volume": 1.0} for _ in range(16)])
+    # Return absolute paths (or archive members) for sound files
+    trig_map = []
+    for ts in trigger_sounds[:16]:
+        f = ts.get("file", "")
+        if resolve is not None:
+            f = resolve(f)
+        if in_folder and isinstance(f, str) and f:
+            f = str((bundle_dir / f).resolve())
+        trig_map.append({"file": f, "volume": float(ts.get("volume", 1.0))})
+    return image_path, animations, trig_map
+
+
+# Hot reload: the builder streams edits over localhost TCP. Each message is
+#   header   magic, JSON length, payload length (little-endian)
+#   JSON     {"type": "hello" | "tiles" | "rows", ...}
+#   payload  tiles only: RGBA8888 pixels (straight alpha, rows top to bottom)
+#            of every rect back to back, at the "offset"/"length" given per tile
+HOT_RELOAD_PORT = 47800
+HOT_MAGIC = b"SSHR"
+_HOT_HEADER = struct.Struct("<4sII")
+
+
+def encode_hot_message(header, payload=b""):
+    """Frame one hot-reload message (used by the builder's server)."""
+    text = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    return _HOT_HEADER.pack(HOT_MAGIC, len(text), len(payload)) + text + bytes(payload)
+
+
+class HotReloadClient:
+    """Receives live edits from the builder (Hot Reload in the editor).
+
+    Non-blocking; call update() once per game frame:
+
+        client = HotReloadClient()
+        changed_rows = client.update(anims, on_tile=patch_texture)
+
+    on_tile(x, y, w, h, rgba) gets sheet-space rects and a memoryview of
+    w*h*4 straight-alpha RGBA bytes; on_resize(w, h) is called first when
+    the sheet size changes. Row updates replace frames/fps/loop_mode in
+    `anims` (load_bundle's dict) and keep sounds; call set_animation on
+    Animators showing a changed row.
+    """
+
+    def __init__(self, host="127.0.0.1", port=HOT_RELOAD_PORT, timeout=2.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setblocking(False)
+        self._buf = bytearray()
+        self.sheet_size = None
+        self.sheet_name = ""
+
+    def poll(self):
+        """Return the complete messages received so far as (header, payload)."""
+        while True:
+            try:
+                chunk = self.sock.recv(1 << 20)
+            except (BlockingIOError, InterruptedError):
+                break
+            if not chunk:
+                raise ConnectionError("hot-reload server closed the connection")
+            self._buf += chunk
+        messages = []
+        view = memoryview(self._buf)
+        pos = 0
+        while len(view) - pos >= _HOT_HEADER.size:
+            magic, n_json, n_payload = _HOT_HEADER.unpack_from(view, pos)
+            if magic != HOT_MAGIC:
+                raise ValueError("not a hot-reload stream")
+            end = pos + _HOT_HEADER.size + n_json + n_payload
+            if len(view) < end:
+                break
+            start = pos + _HOT_HEADER.size
+            header = json.loads(bytes(view[start:start + n_json]).decode("utf-8"))
+            messages.append((header, bytes(view[start + n_json:end])))
+            pos = end
+        view.release()
+        del self._buf[:pos]
+        return messages
+
+    def apply(self, messages, animations, on_tile=None, on_resize=None):
+        """Apply polled messages; returns the names of rows that changed."""
+        changed = set()
+        for header, payload in messages:
+            kind = header.get("type")
+            if kind == "hello":
+                self.sheet_name = header.get("sheet_name", "")
+            if kind in ("hello", "tiles"):
+                size = tuple(header.get("sheet_size", self.sheet_size or (0, 0)))
+                if size != self.sheet_size:
+                    self.sheet_size = size
+                    if on_resize is not None:
+                        on_resize(*size)
+            if kind == "tiles" and on_tile is not None:
+                data = memoryview(payload)
+                for t in header.get("tiles", []):
+                    on_tile(t["x"], t["y"], t["w"], t["h"], data[t["offset"]:t["offset"] + t["length"]])
+            elif kind == "rows":
+                for row in header.get("rows", []):
+                    # update the row dict in place, so references to it stay valid
+                    anim = animations.pop(row["old_name"], None) if row.get("old_name") else None
+                    if anim is None:
+                        anim = animations.get(row["name"]) or {"sounds": []}
+                    anim["frames"] = [tuple(f) for f in row.get("frames", [])]
+                    anim["fps"] = int(row.get("fps", 6))
+                    anim["loop_mode"] = row.get("loop_mode", "pingpong")
+                    animations[row["name"]] = anim
+                    changed.add(row["name"])
+        return changed
+
+    def update(self, animations, on_tile=None, on_resize=None):
+        return self.apply(self.poll(), animations, on_tile, on_resize)
+
+    def close(self):
+        self.sock.close()
+
+
+def load_shared_atlas(atlas_dir):
+    """Load a shared atlas folder (atlas.json + page<N>.png).
+
+    Returns (page_paths, projects) where projects[sheet_name] is
+    (animations, trigger_sounds) shaped like load_bundle's result. Each
+    animation also has "pages": the page index of every frame, so
+    draw page_paths[anim["pages"][i]] at anim["frames"][i].
+    """
+    atlas_dir = Path(atlas_dir)
+    data = json.loads((atlas_dir / "atlas.json").read_text(encoding="utf-8"))
+    page_paths = [atlas_dir / p["image"] for p in data.get("pages", [])]
+    table = data.get("frames", {})
+    projects = {}
+    for sheet, entry in data.get("projects", {}).items():
+        animations = {}
+        for row in entry.get("rows", []):
+            placed = [table[k] for k in row.get("frames", [])]
+            animations[row.get("name") or "row"] = {
+                "frames": [tuple(f[1:]) for f in placed],
+                "pages": [f[0] for f in placed],
+                "fps": int(row.get("fps", 6)),
+                "loop_mode": row.get("loop_mode", "pingpong"),
+                "sounds": row.get("sounds", []),
+            }
+        trig_map = []
+        for ts in entry.get("trigger_sounds", [])[:16]:
+            f = ts.get("file", "")
+            trig_map.append({"file": str((atlas_dir / f).resolve()) if f else "", "volume": float(ts.get("volume", 1.0))})
+        projects[sheet] = (animations, trig_map)
+    return page_paths, projects
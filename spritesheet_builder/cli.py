@@ -0,0 +1,109 @@
+from __future__ import annotations
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import time
+from .project_model import ProjectModel
+from .journal import journal_path, replay_journal
+from .path_resolver import resolve_cell_paths
+from .frame_sources import source_basename
+from .compose import compose_sheet
+from .bundle import write_composed, export_fingerprint, bundle_up_to_date
+from .postprocess import extrude_warning
+
+# Headless entry point; imports only the Qt-free core so it starts fast and
+# runs on machines without a display:
+#   python -m spritesheet_builder.cli export walk.json out/
+#   python -m spritesheet_builder.cli shared-atlas a.json b.json out/atlas
+#   python -m spritesheet_builder.cli watch walk.json out/
+
+
+def load_project(path: str) -> tuple[ProjectModel, list[list[str | None]], list[str]]:
+    """Load a saved project as the editor would: journal replayed, cells resolved.
+    Returns (project, cells, missing basenames)."""
+    project, cells, bases = ProjectModel.load_json(path)
+    if os.path.exists(journal_path(path)):
+        cells, _recovered = replay_journal(path, project, cells)
+        bases = [[source_basename(p) if p else None for p in row] for row in cells]
+    cells, missing = resolve_cell_paths(cells, bases, project.source_folder)
+    return project, cells or [], missing
+
+
+def export_project(path: str, dest_dir: str, force: bool = False) -> dict:
+    """Compose and write one project's bundle; returns a summary dict.
+
+    Skipped (status "up to date") when the bundle in dest_dir was built
+    from the same inputs, unless `force` is set.
+    """
+    t0 = time.perf_counter()
+    project, cells, missing = load_project(path)
+    ok, msg = project.validate()
+    if not ok:
+        raise ValueError(msg)
+    fingerprint = export_fingerprint(project, cells)
+    if not force and bundle_up_to_date(project, Path(dest_dir), fingerprint):
+        return {
+            "project": path,
+            "zip": str(Path(dest_dir) / f"{project.sheet_name}.zip"),
+            "status": "up to date",
+            "seconds": round(time.perf_counter() - t0, 3),
+        }
+    sheet, frames = compose_sheet(project, cells)
+    zip_path, _meta, frames = write_composed(project, cells, Path(dest_dir), sheet, frames, fingerprint)
+    summary = {
+        "project": path,
+        "zip": str(zip_path),
+        "status": "exported",
+        "frames": sum(len(row) for row in frames),
+        "missing": len(missing),
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
+    warning = extrude_warning(project.grid, project.export.extrude)
+    if warning:
+        summary["warnings"] = [warning]
+    return summary
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m spritesheet_builder.cli", description="Sprite Sheet Builder without the GUI")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_export = sub.add_parser("export", help="export bundles for saved projects")
+    p_export.add_argument("projects", nargs="+", help="project .json files")
+    p_export.add_argument("dest", help="destination folder")
+    p_export.add_argument("--force", action="store_true", help="re-export bundles that are up to date")
+    p_watch = sub.add_parser("watch", help="export a project, then re-export changed frames and sounds as they are saved")
+    p_watch.add_argument("project", help="project .json file")
+    p_watch.add_argument("dest", help="destination folder")
+    p_watch.add_argument("--interval", type=float, default=0.2, help="seconds between file checks")
+    p_watch.add_argument("--debounce", type=float, default=0.3, help="quiet seconds before re-exporting")
+    p_shared = sub.add_parser("shared-atlas", help="pack several projects into a shared atlas")
+    p_shared.add_argument("projects", nargs="+", help="project .json files")
+    p_shared.add_argument("dest", help="atlas folder")
+    p_shared.add_argument("--page-size", type=int, default=2048)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "export":
+            for path in args.projects:
+                print(json.dumps(export_project(path, args.dest, force=args.force)))
+        elif args.command == "watch":
+            from .watch import watch_project
+            print(f"watching {args.project} (Ctrl+C to stop)", file=sys.stderr)
+            try:
+                watch_project(args.project, args.dest, lambda summary: print(json.dumps(summary), flush=True), args.interval, args.debounce)
+            except KeyboardInterrupt:
+                pass
+        else:
+            # shared_atlas imports load_project from this module
+            from .shared_atlas import export_shared_atlas
+            print(json.dumps(export_shared_atlas(args.projects, args.dest, page_size=args.page_size)))
+    except Exception as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+from __future__ import annotations
+from typing import Tuple
+from PIL import Image, ImageChops
+from .frame_sources import _FrameCache, identity, open_frame
+
+# Keyed frames by (file identity, key, tolerance); shared by export, the
+# live atlas and thumbnails so each source is keyed once per session
+_keyed = _FrameCache(64 * 1024 * 1024)
+
+
+def cache_stats() -> dict:
+    return _keyed.stats()
+
+
+def parse_key(key: str) -> Tuple[int, int, int] | None:
+    """'#rrggbb' -> (r, g, b); None when keying is off or the value is invalid."""
+    key = (key or "").strip().lstrip("#")
+    if len(key) != 6:
+        return None
+    try:
+        v = int(key, 16)
+    except ValueError:
+        return None
+    return (v >> 16) & 0xFF, (v >> 8) & 0xFF, v & 0xFF
+
+
+def apply_color_key(im: Image.Image, rgb: Tuple[int, int, int], tolerance: int = 0) -> Image.Image:
+    """Return an RGBA copy of `im` with pixels within `tolerance` of `rgb`
+    (largest per-channel difference) made fully transparent.
+
+    Works on whole buffers in Pillow's C code: one difference against a
+    solid image, a per-channel max, a lookup table and an alpha multiply.
+    """
+    im = im.convert("RGBA")
+    r, g, b, a = im.split()
+    solid = Image.new("RGB", im.size, rgb)
+    dr, dg, db = ImageChops.difference(Image.merge("RGB", (r, g, b)), solid).split()
+    diff = ImageChops.lighter(ImageChops.lighter(dr, dg), db)
+    tol = max(0, min(255, int(tolerance)))
+    keep = diff.point([0] * (tol + 1) + [255] * (255 - tol))
+    return Image.merge("RGBA", (r, g, b, ImageChops.multiply(a, keep)))
+
+
+def open_keyed_frame(path: str, grid=None) -> Image.Image:
+    """Decode a source frame with the grid's color key applied (if any).
+
+    Keyed results are cached per source; callers must not modify them.
+    """
+    rgb = parse_key(getattr(grid, "color_key", "")) if grid is not None else None
+    if rgb is None:
+        return open_frame(path)
+    tol = int(getattr(grid, "key_tolerance", 0))
+    ident = identity(path)
+    key = (ident, rgb, tol) if ident is not None else None
+    im = _keyed.get(key) if key is not None else None
+    if im is None:
+        im = apply_color_key(open_frame(path), rgb, tol)
+        if key is not None:
+            _keyed.put(key, im)
+    return im
@@ -0,0 +1,158 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Tuple
+from PIL import Image
+from .project_model import ProjectModel, GridConfig
+from .color_key import open_keyed_frame
+from .dedupe import duplicate_map
+from .metrics import timed
+
+# Qt-free composition (Pillow). Mirrors image_utils.prepare_tile and the
+# exporter's layout so headless exports match the GUI's sheet geometry.
+
+Box = Tuple[int, int, int, int]  # x, y, w, h
+
+
+class ExportCancelled(Exception):
+    """Raised inside an export when its cancel event is set."""
+
+
+def check_cancel(cancel) -> None:
+    if cancel is not None and cancel.is_set():
+        raise ExportCancelled()
+
+
+def sheet_dims(grid: GridConfig) -> Tuple[int, int]:
+    """Pixel size of the composed sheet for the given grid."""
+    w = grid.margin * 2 + grid.cols * grid.tile_width + max(0, grid.cols - 1) * grid.padding
+    h = grid.margin * 2 + grid.rows * grid.tile_height + max(0, grid.rows - 1) * grid.padding
+    return w, h
+
+
+def cell_box(grid: GridConfig, row: int, col: int) -> Box:
+    """(x, y, w, h) of a grid cell inside the composed sheet."""
+    x = grid.margin + col * (grid.tile_width + grid.padding)
+    y = grid.margin + row * (grid.tile_height + grid.padding)
+    return x, y, grid.tile_width, grid.tile_height
+
+
+def _fit(w: int, h: int, tw: int, th: int) -> Tuple[int, int]:
+    # same rounding as QSize.scaled(..., KeepAspectRatio)
+    rw = th * w // h
+    if rw <= tw:
+        return max(1, rw), th
+    return tw, max(1, tw * h // w)
+
+
+@timed("tile")
+def prepare_tile_image(path: str, grid: GridConfig) -> Image.Image | None:
+    """Load a source frame and scale/crop it into a tile (None if unreadable)."""
+    tw, th = grid.tile_width, grid.tile_height
+    try:
+        src = open_keyed_frame(path, grid).convert("RGBA")
+    except Exception:
+        return None
+    scale_percent = getattr(grid, 'source_scale', 100)
+    if scale_percent != 100:
+        s = max(10, min(400, int(scale_percent))) / 100.0
+        size = _fit(src.width, src.height, max(1, int(src.width * s)), max(1, int(src.height * s)))
+        src = src.resize(size, Image.Resampling.BILINEAR)
+    if grid.crop_enabled:
+        x = max(0, min(grid.offset_x, max(0, src.width - 1)))
+        y = max(0, min(grid.offset_y, max(0, src.height - 1)))
+        avail_w = src.width - x
+        avail_h = src.height - y
+        if avail_w > 0 and avail_h > 0:
+            w = max(1, min(tw, avail_w))
+            h = max(1, min(th, avail_h))
+            src = src.crop((x, y, x + w, y + h))
+        if src.size != (tw, th):
+            src = src.resize(_fit(src.width, src.height, tw, th), Image.Resampling.BILINEAR)
+    elif src.size != _fit(src.width, src.height, tw, th):
+        src = src.resize(_fit(src.width, src.height, tw, th), Image.Resampling.BILINEAR)
+    return src
+
+
+def _used_cells(grid: GridConfig, cells: List[List[str | None]]) -> List[Tuple[int, int, str]]:
+    return [(r, c, cells[r][c]) for r in range(min(grid.rows, len(cells))) for c in range(min(grid.cols, len(cells[r]))) if cells[r][c]]
+
+
+def prepare_tiles(grid: GridConfig, paths, progress=None, cancel=None) -> Dict[str, Image.Image | None]:
+    """Prepare distinct sources in parallel: {path: tile or None}.
+
+    progress("tiles", done, total) is reported as they finish and a set
+    `cancel` event stops the export.
+    """
+    unique = list(dict.fromkeys(str(p) for p in paths))
+    tiles: Dict[str, Image.Image | None] = {}
+    with ThreadPoolExecutor() as pool:
+        futures = {pool.submit(prepare_tile_image, p, grid): p for p in unique}
+        try:
+            for done, fut in enumerate(as_completed(futures), start=1):
+                check_cancel(cancel)
+                tiles[futures[fut]] = fut.result()
+                if progress:
+                    progress("tiles", done, len(unique))
+        except BaseException:
+            for f in futures:
+                f.cancel()
+            raise
+    return tiles
+
+
+def paste_tiles(grid: GridConfig, cells: List[List[str | None]], tiles: Dict[str, Image.Image | None]) -> Tuple[Image.Image, List[List[Box]]]:
+    """Place prepared tiles on a new sheet; returns (sheet, per-row frame boxes)."""
+    g = grid
+    sheet = Image.new("RGBA", sheet_dims(g), (0, 0, 0, 0))
+    frames: List[List[Box]] = [[] for _ in range(g.rows)]
+    for r, c, path in _used_cells(g, cells):
+        tile = tiles.get(str(path))
+        if tile is None:
+            continue
+        x, y, w, h = cell_box(g, r, c)
+        # center within tile rect
+        sheet.alpha_composite(tile, (x + (w - tile.width) // 2, y + (h - tile.height) // 2))
+        frames[r].append((x, y, w, h))
+    return sheet, frames
+
+
+@timed("compose_sheet")
+def compose_sheet(project: ProjectModel, cells: List[List[str | None]], progress=None, cancel=None) -> Tuple[Image.Image, List[List[Box]]]:
+    """Compose the spritesheet and per-row frame boxes without Qt."""
+    used = _used_cells(project.grid, cells)
+    tiles = prepare_tiles(project.grid, [p for _r, _c, p in used], progress, cancel)
+    return paste_tiles(project.grid, cells, tiles)
+
+
+def collapse_duplicates(
+    project: ProjectModel,
+    cells: List[List[str | None]],
+    frames: List[List[Box]],
+) -> Tuple[List[List[Box]], List[Box]]:
+    """Point frames of repeated or near-duplicate sources at the first cell
+    showing that frame. Returns (new frames, boxes of cells now unused)."""
+    g = project.grid
+    flat = [p for row in cells[:g.rows] for p in row[:g.cols] if p]
+    dup = duplicate_map(flat, project.duplicate_threshold, g)
+    first: dict[str, Box] = {}
+    cleared: List[Box] = []
+    out: List[List[Box]] = []
+    for r, row_frames in enumerate(frames):
+        row = cells[r] if r < len(cells) else []
+        by_pos = {cell_box(g, r, c)[:2]: c for c in range(min(g.cols, len(row)))}
+        new_row = []
+        for box in row_frames:
+            c = by_pos.get(tuple(box[:2]))
+            path = row[c] if c is not None else None
+            if path is None:
+                new_row.append(box)
+                continue
+            key = dup.get(path, path)
+            if key in first:
+                new_row.append(first[key])
+                cleared.append(box)
+            else:
+                first[key] = box
+                new_row.append(box)
+        out.append(new_row)
+    return out, cleared
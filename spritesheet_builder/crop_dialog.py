@@ -1,8 +1,10 @@
 from PySide6 import QtWidgets, QtCore, QtGui
+from .image_utils import load_source_image
+from .project_model import GridConfig
 
 
 class CropAlignDialog(QtWidgets.QDialog):
-    def __init__(self, image_paths: list[str] | str, tile_w: int, tile_h: int, offset_x: int = 0, offset_y: int = 0, parent=None, scale_percent: int = 100):
+    def __init__(self, image_paths: list[str] | str, tile_w: int, tile_h: int, offset_x: int = 0, offset_y: int = 0, parent=None, scale_percent: int = 100, color_key: str = "", key_tolerance: int = 0):
         super().__init__(parent)
         self.setWindowTitle("Crop / Align")
         self.resize(800, 600)
@@ -24,7 +26,8 @@ class CropAlignDialog(QtWidgets.QDialog):
         self._timer.timeout.connect(self._on_tick)
 
         # Color key / overlay state
-        self._color_key: QtGui.QColor | None = None
+        self._color_key: QtGui.QColor | None = QtGui.QColor(color_key) if color_key else None
+        self._key_tolerance = max(0, min(255, int(key_tolerance)))
         self._overlay_item: QtWidgets.QGraphicsPixmapItem | None = None
 
         self._build_ui()
@@ -99,6 +102,24 @@ class CropAlignDialog(QtWidgets.QDialog):
         controls.addWidget(hint)
         layout.addLayout(controls)
 
+        # Color key applied to every frame (export, atlas and thumbnails)
+        key_row = QtWidgets.QHBoxLayout()
+        self.key_chk = QtWidgets.QCheckBox("Key out color")
+        self.key_chk.setChecked(self._color_key is not None)
+        self.key_swatch = QtWidgets.QLabel()
+        self.key_swatch.setFixedSize(24, 16)
+        self.key_tol_spin = QtWidgets.QSpinBox()
+        self.key_tol_spin.setRange(0, 255)
+        self.key_tol_spin.setValue(self._key_tolerance)
+        self.key_tol_spin.setToolTip("Largest per-channel difference from the key that is still made transparent")
+        key_row.addWidget(self.key_chk)
+        key_row.addWidget(self.key_swatch)
+        key_row.addWidget(QtWidgets.QLabel("Tolerance:"))
+        key_row.addWidget(self.key_tol_spin)
+        key_row.addStretch(1)
+        layout.addLayout(key_row)
+        self._update_key_swatch()
+
         btns = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
         btns.accepted.connect(self.accept)
         btns.rejected.connect(self.reject)
@@ -112,6 +133,8 @@ class CropAlignDialog(QtWidgets.QDialog):
         self.play_btn.clicked.connect(self._on_toggle_play)
         self.overlay_chk.toggled.connect(self._on_overlay_toggled)
         self.sample_key_btn.clicked.connect(self._on_pick_key)
+        self.key_chk.toggled.connect(self._on_key_changed)
+        self.key_tol_spin.valueChanged.connect(self._on_key_changed)
 
         # Fit view
         self.view.setSceneRect(self._img_item.boundingRect())
@@ -147,6 +170,28 @@ class CropAlignDialog(QtWidgets.QDialog):
     def scale_percent(self) -> int:
         return int(self._scale_percent)
 
+    def color_key(self) -> str:
+        """'#rrggbb' when keying is enabled, else ''."""
+        chk = getattr(self, "key_chk", None)  # None while the UI is being built
+        if (chk is not None and not chk.isChecked()) or self._color_key is None:
+            return ""
+        return self._color_key.name()
+
+    def key_tolerance(self) -> int:
+        spin = getattr(self, "key_tol_spin", None)  # None while the UI is being built
+        return int(spin.value()) if spin is not None else self._key_tolerance
+
+    def _key_grid(self) -> GridConfig | None:
+        key = self.color_key()
+        return GridConfig(color_key=key, key_tolerance=self.key_tolerance()) if key else None
+
+    def _update_key_swatch(self):
+        col = self._color_key.name() if self._color_key is not None else "transparent"
+        self.key_swatch.setStyleSheet(f"background: {col}; border: 1px solid #888;")
+
+    def _on_key_changed(self, *_args):
+        self._show_current()
+
     def _on_scale_changed(self, val: int):
         self._scale_percent = max(10, min(400, int(val)))
         self.scale_label.setText(str(self._scale_percent))
@@ -179,7 +224,7 @@ class CropAlignDialog(QtWidgets.QDialog):
         if not self._image_paths:
             return QtGui.QPixmap()
         path = self._image_paths[self._img_index % len(self._image_paths)]
-        return QtGui.QPixmap(path)
+        return QtGui.QPixmap.fromImage(load_source_image(path, self._key_grid()))
 
     def _show_current(self):
         self._base_pm = self._load_current_pm()
@@ -214,13 +259,17 @@ class CropAlignDialog(QtWidgets.QDialog):
 
     def _on_pick_key(self):
         # Use current image's (0,0) pixel as color key
-        img = self._base_pm.toImage()
+        if not self._image_paths:
+            return
+        img = load_source_image(self._image_paths[self._img_index % len(self._image_paths)])
         if img.isNull():
             return
-        col = QtGui.QColor(img.pixel(0, 0))
-        self._color_key = col
-        if self.overlay_chk.isChecked():
-            self._rebuild_overlay()
+        self._color_key = QtGui.QColor(img.pixel(0, 0))
+        self._update_key_swatch()
+        if self.key_chk.isChecked():
+            self._show_current()
+        else:
+            self.key_chk.setChecked(True)  # refreshes through _on_key_changed
 
     def _on_overlay_toggled(self, on: bool):
         if on:
@@ -234,32 +283,22 @@ class CropAlignDialog(QtWidgets.QDialog):
         if not self._image_paths:
             return
         # Build a composited image where the color key is treated as transparent
-        base = QtGui.QPixmap(self._image_paths[0])
+        base = QtGui.QPixmap.fromImage(load_source_image(self._image_paths[0]))
         if base.isNull():
             return
         # Use base (scaled) size for overlay canvas to match display
         canvas = self._scaled_pixmap().toImage()
         canvas.fill(QtCore.Qt.GlobalColor.transparent)
         painter = QtGui.QPainter(canvas)
-        key = self._color_key
+        # keyed frames come from the shared cache, so toggling is cheap
+        key_grid = self._key_grid() or (GridConfig(color_key=self._color_key.name()) if self._color_key is not None else None)
         for p in self._image_paths:
-            pm = QtGui.QPixmap(p)
+            pm = QtGui.QPixmap.fromImage(load_source_image(p, key_grid))
             if pm.isNull():
                 continue
             # scale to current scale percent
             spm = pm if self._scale_percent == 100 else pm.scaled(self._scaled_pixmap().size(), QtCore.Qt.AspectRatioMode.KeepAspectRatio, QtCore.Qt.TransformationMode.SmoothTransformation)
-            img = spm.toImage().convertToFormat(QtGui.QImage.Format.Format_ARGB32)
-            if key is not None:
-                # apply color key: set alpha=0 for matching pixels
-                target_rgb = key.rgb() & 0x00FFFFFF
-                for y in range(img.height()):
-                    scan = img.scanLine(y)
-                    ptr = int(scan)
-                    for x in range(img.width()):
-                        c = QtGui.qRgb(QtGui.qRed(img.pixel(x, y)), QtGui.qGreen(img.pixel(x, y)), QtGui.qBlue(img.pixel(x, y))) & 0x00FFFFFF
-                        if c == target_rgb:
-                            img.setPixel(x, y, 0x00000000)
-            painter.drawImage(0, 0, img)
+            painter.drawImage(0, 0, spm.toImage())
         painter.end()
         over_pm = QtGui.QPixmap.fromImage(canvas)
         if self._overlay_item is None:
@@ -0,0 +1,209 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence, Tuple
+import hashlib
+import threading
+from PIL import Image, ImageChops
+from .project_model import GridConfig
+from .frame_sources import identity
+
+try:  # optional: compares a hash against all representatives at once
+    import numpy as np
+except ImportError:
+    np = None
+
+# Near-duplicates are judged on the prepared tile (scaled, cropped and
+# color-keyed: what lands in the atlas), not the raw source canvas. A 64-bit
+# dHash only proposes candidates; tiles are shared when their pixels match
+# exactly (threshold 0) or differ by at most PIXEL_TOLERANCE per channel, so
+# a coarse hash can never merge frames that visibly differ.
+
+# path -> (file identity, tile settings, (dHash, content digest)); shared by every
+# project in the session. One entry per path: a changed file or crop replaces it.
+_cache: Dict[str, tuple] = {}
+_cache_lock = threading.Lock()
+# brightness step (0..255) a neighbour must exceed to set a bit; keeps flat
+# or noisy areas from flipping bits
+_MARGIN = 8
+# largest per-channel difference (0..255) of any pixel in two near-duplicate tiles
+PIXEL_TOLERANCE = 12
+
+
+def cache_stats() -> dict:
+    with _cache_lock:
+        return {"entries": len(_cache)}
+
+
+def _tile_settings(grid: GridConfig) -> tuple:
+    return (grid.tile_width, grid.tile_height, grid.crop_enabled, grid.offset_x, grid.offset_y,
+            grid.source_scale, grid.color_key, grid.key_tolerance)
+
+
+def _tile(path: str, grid: GridConfig) -> Image.Image | None:
+    from .compose import prepare_tile_image  # compose imports this module
+    tile = prepare_tile_image(path, grid)
+    return tile.convert("RGBA") if tile is not None else None
+
+
+def dhash(im: Image.Image, size: int = 8) -> int:
+    """64-bit difference hash of an image.
+
+    Transparent pixels are composited onto black so the silhouette counts.
+    """
+    im = im.convert("RGBA")
+    back = Image.new("RGBA", im.size, (0, 0, 0, 255))
+    px = Image.alpha_composite(back, im).convert("L").resize((size + 1, size), Image.Resampling.BOX).tobytes()
+    bits = 0
+    for y in range(size):
+        row = px[y * (size + 1):(y + 1) * (size + 1)]
+        for x in range(size):
+            bits = (bits << 1) | (row[x] > row[x + 1] + _MARGIN)
+    return bits
+
+
+def _digest(im: Image.Image) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{im.width}x{im.height}".encode())
+    h.update(im.tobytes())
+    return h.digest()
+
+
+def tile_signature(path: str, grid: GridConfig) -> Tuple[int, bytes] | None:
+    """(dHash, content digest) of a source's prepared tile; None if unreadable."""
+    tile = _tile(path, grid)
+    if tile is None:
+        return None
+    return dhash(tile), _digest(tile)
+
+
+def hash_files(paths: Sequence[str], grid: GridConfig) -> List[Tuple[int, bytes] | None]:
+    """Tile signatures for many files; uncached ones are prepared in parallel."""
+    settings = _tile_settings(grid)
+    stamps = {p: (identity(p), settings) for p in paths}
+
+    def cached(p: str):
+        entry = _cache.get(p)
+        return entry[2] if entry is not None and entry[:2] == stamps[p] else False
+
+    with _cache_lock:
+        todo = sorted(p for p, (ident, _s) in stamps.items() if ident is not None and cached(p) is False)
+    if todo:
+        with ThreadPoolExecutor() as pool:
+            sigs = list(pool.map(lambda p: tile_signature(p, grid), todo))
+        with _cache_lock:
+            for p, sig in zip(todo, sigs):
+                _cache[p] = (*stamps[p], sig)
+    with _cache_lock:
+        return [cached(p) or None for p in paths]
+
+
+def distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def tiles_match(a: Image.Image, b: Image.Image, tolerance: int = PIXEL_TOLERANCE) -> bool:
+    """Same size and no channel of any pixel differs by more than `tolerance`."""
+    if a.size != b.size:
+        return False
+    return max(hi for _lo, hi in ImageChops.difference(a, b).getextrema()) <= tolerance
+
+
+class _Tiles:
+    """Prepared tiles decoded on demand for pixel checks, kept for one call."""
+
+    def __init__(self, grid: GridConfig):
+        self.grid = grid
+        self._tiles: Dict[str, Image.Image | None] = {}
+
+    def get(self, path: str) -> Image.Image | None:
+        if path not in self._tiles:
+            self._tiles[path] = _tile(path, self.grid)
+        return self._tiles[path]
+
+    def match(self, a: str, b: str) -> bool:
+        ta, tb = self.get(a), self.get(b)
+        return ta is not None and tb is not None and tiles_match(ta, tb)
+
+
+class _HashIndex:
+    """Representative dHashes; `near` compares a hash with all of them in one
+    numpy XOR + popcount when numpy is available."""
+
+    def __init__(self):
+        self.paths: List[str] = []
+        self._np = np
+        self._hashes = np.zeros(64, dtype=np.uint64) if np is not None else []
+
+    def add(self, h: int, path: str):
+        n = len(self.paths)
+        if self._np is None:
+            self._hashes.append(h)
+        else:
+            if n == len(self._hashes):
+                self._hashes = np.concatenate([self._hashes, np.zeros_like(self._hashes)])
+            self._hashes[n] = h
+        self.paths.append(path)
+
+    def near(self, h: int, threshold: int) -> List[str]:
+        """Representatives within `threshold` bits, closest first."""
+        if self._np is None:
+            found = sorted((distance(h, rh), i) for i, rh in enumerate(self._hashes) if distance(h, rh) <= threshold)
+            return [self.paths[i] for _d, i in found]
+        x = self._hashes[:len(self.paths)] ^ np.uint64(h)
+        bits = np.unpackbits(x.view(np.uint8)).reshape(-1, 64).sum(axis=1)
+        idx = np.flatnonzero(bits <= threshold)
+        return [self.paths[i] for i in idx[np.argsort(bits[idx], kind="stable")]]
+
+
+def collapse_runs(paths: Sequence[str], threshold: int, grid: GridConfig) -> List[str]:
+    """Drop frames that duplicate the first frame of their run.
+
+    `paths` is in playback order (the natural-sorted source listing). With
+    threshold 0 only pixel-identical tiles are dropped; above 0, a frame
+    within `threshold` hash bits of the run's first frame is dropped if its
+    tile also passes the pixel check.
+    """
+    if threshold < 0:
+        return list(paths)
+    tiles = _Tiles(grid)
+    out: List[str] = []
+    rep: Tuple[str, int, bytes] | None = None
+    for path, sig in zip(paths, hash_files(paths, grid)):
+        if sig is not None and rep is not None:
+            rep_path, rep_hash, rep_digest = rep
+            if sig[1] == rep_digest:
+                continue
+            if threshold > 0 and distance(sig[0], rep_hash) <= threshold and tiles.match(path, rep_path):
+                continue
+        out.append(path)
+        rep = (path, *sig) if sig is not None else None
+    return out
+
+
+def duplicate_map(paths: Sequence[str], threshold: int, grid: GridConfig) -> Dict[str, str]:
+    """Map each duplicate tile's path to the first equivalent path in `paths`.
+
+    Only paths that differ from their representative are included. Equal
+    content digests always match; with threshold > 0, representatives within
+    `threshold` hash bits are pixel-checked, closest first.
+    """
+    if threshold < 0:
+        return {}
+    unique = list(dict.fromkeys(p for p in paths if p))
+    tiles = _Tiles(grid)
+    index = _HashIndex()
+    by_digest: Dict[bytes, str] = {}
+    out: Dict[str, str] = {}
+    for path, sig in zip(unique, hash_files(unique, grid)):
+        if sig is None:
+            continue
+        h, digest = sig
+        match = by_digest.get(digest)
+        if match is None and threshold > 0:
+            match = next((rp for rp in index.near(h, threshold) if tiles.match(path, rp)), None)
+        if match is None:
+            by_digest[digest] = path
+            index.add(h, path)
+        else:
+            out[path] = match
+    return out
@@ -0,0 +1,123 @@
+from __future__ import annotations
+import json
+import os
+from PySide6 import QtWidgets, QtCore, QtGui
+from . import metrics, frame_sources, color_key, dedupe
+
+
+def _process_memory() -> dict:
+    """Resident set size of this process in bytes (peak where that is all we get)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return {"rss_bytes": int(line.split()[1]) * 1024}
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        return {"peak_rss_bytes": peak if os.uname().sysname == "Darwin" else peak * 1024}
+    except Exception:
+        return {}
+
+
+def _add_hit_rates(node):
+    # every {"hits", "misses"} block gains a "hit_rate"
+    if isinstance(node, dict):
+        if "hits" in node and "misses" in node:
+            node["hit_rate"] = metrics.hit_rate(node["hits"], node["misses"])
+        for value in node.values():
+            _add_hit_rates(value)
+    return node
+
+
+def collect_diagnostics(editor=None) -> dict:
+    """Snapshot of caches, timers and memory; `editor` is an EditorPage or None."""
+    data = {
+        "process": _process_memory(),
+        "caches": {
+            "container_frames": frame_sources.cache_stats(),
+            "color_keyed": color_key.cache_stats(),
+            "dhash": dedupe.cache_stats(),
+        },
+        "timers": metrics.timers(),
+    }
+    if editor is not None:
+        data["editor"] = editor.diagnostics()
+    return _add_hit_rates(data)
+
+
+class DiagnosticsDialog(QtWidgets.QDialog):
+    """Live cache, thumbnail and timing counters, refreshed every second.
+
+    Meant for spotting leaks: open a project a few times and compare the
+    numbers, or save snapshots as JSON and diff them.
+    """
+
+    def __init__(self, editor_fn, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Diagnostics")
+        self.resize(520, 640)
+        self._editor_fn = editor_fn  # returns the current EditorPage or None
+        self._data: dict = {}
+
+        layout = QtWidgets.QVBoxLayout(self)
+        self.text = QtWidgets.QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.SystemFont.FixedFont))
+        layout.addWidget(self.text, 1)
+
+        buttons = QtWidgets.QHBoxLayout()
+        self.reset_btn = QtWidgets.QPushButton("Reset Timers")
+        self.reset_btn.clicked.connect(self._on_reset_timers)
+        buttons.addWidget(self.reset_btn)
+        self.copy_btn = QtWidgets.QPushButton("Copy")
+        self.copy_btn.clicked.connect(lambda: QtWidgets.QApplication.clipboard().setText(self._json()))
+        buttons.addWidget(self.copy_btn)
+        self.save_btn = QtWidgets.QPushButton("Save JSON…")
+        self.save_btn.clicked.connect(self._on_save)
+        buttons.addWidget(self.save_btn)
+        buttons.addStretch(1)
+        close_btn = QtWidgets.QPushButton("Close")
+        close_btn.clicked.connect(self.close)
+        buttons.addWidget(close_btn)
+        layout.addLayout(buttons)
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(1000)
+        self._timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event: QtGui.QShowEvent) -> None:
+        super().showEvent(event)
+        self.refresh()
+        self._timer.start()
+
+    def hideEvent(self, event: QtGui.QHideEvent) -> None:
+        self._timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        self._data = collect_diagnostics(self._editor_fn())
+        bar = self.text.verticalScrollBar()
+        pos = bar.value()
+        self.text.setPlainText(self._json())
+        bar.setValue(pos)
+
+    def _json(self) -> str:
+        return json.dumps(self._data, indent=2)
+
+    def _on_reset_timers(self):
+        metrics.reset_timers()
+        self.refresh()
+
+    def _on_save(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Save Diagnostics", "diagnostics.json", "JSON Files (*.json);;All Files (*)")
+        if not path:
+            return
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(self._json())
+        except OSError as e:
+            QtWidgets.QMessageBox.critical(self, "Save Failed", str(e))
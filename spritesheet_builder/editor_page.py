@@ -2,12 +2,23 @@ from PySide6 import QtWidgets, QtCore, QtGui
 from .project_model import ProjectModel
 from .grid_widget import GridWidget
 from .raw_sprites_panel import RawSpritesPanel
-from .crop_dialog import CropAlignDialog
 from .row_preview import RowPreview
+from .atlas import LiveAtlas
+from .sheet_preview import SheetPreview
+from .folder_watcher import FolderWatcher
+from .live_export import LiveExport
+from .hot_reload import HotReloadServer, HOT_RELOAD_PORT
+from .history import EditHistory, CellEdit
+from .dedupe import collapse_runs
 
 
 class EditorPage(QtWidgets.QWidget):
     request_back = QtCore.Signal()
+    history_changed = QtCore.Signal()
+    # Every model change as a small dict, for the autosave journal:
+    # {"t": "cells", "c": [[row, col, path], ...]} or
+    # {"t": "meta", "s": scope, "i": index, "k": key, "v": value}
+    change_recorded = QtCore.Signal(dict)
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -15,6 +26,14 @@ class EditorPage(QtWidgets.QWidget):
         # Guards to avoid selection sync feedback loops
         self._syncing_from_raw = False
         self._syncing_from_grid = False
+        # Keeps the project's cached source listing in sync with disk
+        self.source_watcher = FolderWatcher(self)
+        self.source_watcher.changed.connect(self._on_source_files_changed)
+        # Undo/redo of cell and metadata edits
+        self.history = EditHistory()
+        self._applying_history = False
+        self._fill_images: list[str] | None = None  # cache for _auto_fill_images
+        self._load_count = 0  # for the diagnostics panel
         self._build_ui()
 
     def _build_ui(self):
@@ -37,6 +56,18 @@ class EditorPage(QtWidgets.QWidget):
         self.crop_btn.setToolTip("Draw a tile-sized box over an example image and apply offsets to all frames")
         self.crop_btn.clicked.connect(self._on_crop_align)
         top.addWidget(self.crop_btn)
+        self.live_label = QtWidgets.QLabel("")
+        top.addWidget(self.live_label)
+        self.live_btn = QtWidgets.QPushButton("Live Export")
+        self.live_btn.setCheckable(True)
+        self.live_btn.setToolTip("Watch source frames and sounds and re-export the bundle into a folder as they change")
+        self.live_btn.toggled.connect(self._on_live_export_toggled)
+        top.addWidget(self.live_btn)
+        self.hot_btn = QtWidgets.QPushButton("Hot Reload")
+        self.hot_btn.setCheckable(True)
+        self.hot_btn.setToolTip("Serve cell and row edits to a running game on localhost (see HotReloadClient in python_helper.py)")
+        self.hot_btn.toggled.connect(self._on_hot_reload_toggled)
+        top.addWidget(self.hot_btn)
         layout.addLayout(top)
 
         # Splitter: left grid, right raw list
@@ -46,12 +77,32 @@ class EditorPage(QtWidgets.QWidget):
         self.grid = GridWidget()
         splitter.addWidget(self.grid)
 
+        # In-memory composed sheet, patched per cell as the grid changes
+        self.atlas = LiveAtlas(self)
+        self.grid.cells_changed.connect(self.atlas.apply_changes)
+        self.grid.cells_changed.connect(self._on_cells_changed)
+        # Watch mode: re-export changed frames from the atlas
+        self.live_export = LiveExport(self.atlas, self)
+        self.live_export.files_changed.connect(self._on_source_files_modified)
+        self.live_export.status.connect(self.live_label.setText)
+        self.change_recorded.connect(lambda _change: self.live_export.inputs_changed())
+        # Hot reload: push atlas and row edits to running games
+        self.hot_reload = HotReloadServer(self.atlas, self)
+        self.hot_reload.status.connect(self.live_label.setText)
+        self.change_recorded.connect(lambda _change: self.hot_reload.rows_changed())
+
         right_panel = QtWidgets.QWidget()
         right_layout = QtWidgets.QVBoxLayout(right_panel)
         right_layout.setContentsMargins(0, 0, 0, 0)
-        # Live row preview area
+        # Live row preview and full sheet preview, both drawn from the atlas
+        self.preview_tabs = QtWidgets.QTabWidget()
         self.row_preview = RowPreview()
-        right_layout.addWidget(self.row_preview)
+        self.row_preview.set_atlas(self.atlas)
+        self.preview_tabs.addTab(self.row_preview, "Row")
+        self.sheet_preview = SheetPreview()
+        self.sheet_preview.set_atlas(self.atlas)
+        self.preview_tabs.addTab(self.sheet_preview, "Sheet")
+        right_layout.addWidget(self.preview_tabs)
         right_layout.addSpacing(6)
         right_layout.addWidget(QtWidgets.QLabel("Raw Sprites"))
         self.raw_panel = RawSpritesPanel()
@@ -90,6 +141,16 @@ class EditorPage(QtWidgets.QWidget):
         header.addWidget(self.auto_enable)
         self.fill_all_btn = QtWidgets.QPushButton("Fill All Rows")
         header.addWidget(self.fill_all_btn)
+        self.skip_dups_check = QtWidgets.QCheckBox("Skip near-duplicates")
+        self.skip_dups_check.setToolTip("Auto-fill skips frames that look the same as the previous kept frame;\nexport maps near-duplicate cells to one atlas slot.")
+        header.addWidget(self.skip_dups_check)
+        self.dup_threshold_spin = QtWidgets.QSpinBox()
+        self.dup_threshold_spin.setRange(0, 32)
+        self.dup_threshold_spin.setValue(1)
+        self.dup_threshold_spin.setToolTip("0 = only pixel-identical frames; higher values also allow render noise\n(max perceptual-hash difference, bits of 64; pixels are checked too)")
+        header.addWidget(self.dup_threshold_spin)
+        self.skip_dups_check.toggled.connect(self._on_duplicate_threshold_changed)
+        self.dup_threshold_spin.valueChanged.connect(self._on_duplicate_threshold_changed)
         header.addStretch(1)
         auto_v.addLayout(header)
 
@@ -104,6 +165,7 @@ class EditorPage(QtWidgets.QWidget):
         auto_v.addWidget(self.auto_scroll)
 
         layout.addWidget(auto_box)
+        self.auto_box = auto_box
 
         # Engine triggers (0..15)
         trig_box = QtWidgets.QGroupBox("Engine Trigger Sounds (0..15)")
@@ -141,11 +203,8 @@ class EditorPage(QtWidgets.QWidget):
                     dlg.setFileMode(QtWidgets.QFileDialog.ExistingFile)
                     if dlg.exec() == QtWidgets.QDialog.Accepted:
                         path = dlg.selectedFiles()[0]
+                        # textChanged records the edit and updates the project
                         edit.setText(path)
-                        try:
-                            self.project.trigger_sounds[ii]["file"] = path
-                        except Exception:
-                            pass
                 return _handler
             browse.clicked.connect(make_on_browse())
 
@@ -154,7 +213,9 @@ class EditorPage(QtWidgets.QWidget):
                     if not self.project:
                         return
                     try:
+                        old = self.project.trigger_sounds[ii].get("volume", 1.0)
                         self.project.trigger_sounds[ii]["volume"] = float(val)
+                        self._record_meta("Change Trigger Volume", "trigger", ii, "volume", old, float(val))
                     except Exception:
                         pass
                 return _on
@@ -165,7 +226,9 @@ class EditorPage(QtWidgets.QWidget):
                     if not self.project:
                         return
                     try:
+                        old = self.project.trigger_sounds[ii].get("file", "")
                         self.project.trigger_sounds[ii]["file"] = text
+                        self._record_meta("Change Trigger Sound", "trigger", ii, "file", old, text)
                     except Exception:
                         pass
                 return _on
@@ -175,17 +238,26 @@ class EditorPage(QtWidgets.QWidget):
 
         trig_v.addLayout(self.trig_grid)
         layout.addWidget(trig_box)
+        self.trig_box = trig_box
 
     def load_project(self, project: ProjectModel):
         self.project = project
+        self._load_count += 1
+        self.live_btn.setChecked(False)
+        if self.hot_reload.is_running():
+            self.hot_reload.project = project
         self.title_label.setText(f"Sheet: {project.sheet_name} | {project.grid.cols}x{project.grid.rows} tiles @ {project.grid.tile_width}x{project.grid.tile_height}")
         self.grid.configure(project)
-        self.raw_panel.load_folder(project.source_folder, project.grid)
+        self.atlas.configure(project)
+        self.source_watcher.watch(project.source_index())
+        self.raw_panel.load_folder(project.source_folder, project.grid, files=project.source_index().files())
         self.row_preview.configure(project)
         # Adjust raw icon size to be more visible (cap for performance)
         icon_w = max(64, min(project.grid.tile_width, 192))
         icon_h = max(64, min(project.grid.tile_height, 192))
         self.raw_panel.setIconSize(QtCore.QSize(icon_w, icon_h))
+        self._fill_images = None
+        self._sync_duplicate_widgets()
         # Build per-row auto-fill controls for current grid configuration
         self._rebuild_auto_rows()
         self._sync_auto_slider_max()
@@ -217,16 +289,47 @@ class EditorPage(QtWidgets.QWidget):
             pass
         # Intentionally do not sync grid -> raw on selection
         # Future: connect play/stop to preview row
-        # Row preview wiring
-        self.grid.row_selected.connect(self._on_row_selected)
-        self.fps_spin.valueChanged.connect(self._on_fps_changed)
-        self.loop_combo.currentTextChanged.connect(self._on_loop_changed)
-        self.play_btn.clicked.connect(self._on_play_row)
-        self.stop_btn.clicked.connect(self.row_preview.stop)
+        # Row preview wiring (unique: load_project runs once per opened project)
+        unique = QtCore.Qt.ConnectionType.UniqueConnection
+        self.grid.row_selected.connect(self._on_row_selected, unique)
+        self.fps_spin.valueChanged.connect(self._on_fps_changed, unique)
+        self.loop_combo.currentTextChanged.connect(self._on_loop_changed, unique)
+        self.play_btn.clicked.connect(self._on_play_row, unique)
+        self.stop_btn.clicked.connect(self.row_preview.stop, unique)
 
         # Auto populate wiring
-        self.auto_enable.toggled.connect(self._maybe_auto_fill_all)
-        self.fill_all_btn.clicked.connect(self._auto_fill_all)
+        self.auto_enable.toggled.connect(self._maybe_auto_fill_all, unique)
+        self.fill_all_btn.clicked.connect(self._auto_fill_all, unique)
+
+        # A freshly loaded project starts with an empty undo stack
+        self.reset_history()
+
+    def diagnostics(self) -> dict:
+        """Counters of the editor's widgets and caches for the diagnostics panel.
+
+        Receiver counts and "qobjects" should stay flat across repeated
+        load_project calls; growth points at a connection or widget leak.
+        """
+        sig = QtCore.SIGNAL
+        return {
+            "load_project_calls": self._load_count,
+            "grid": self.grid.diagnostics(),
+            "raw_panel": self.raw_panel.diagnostics(),
+            "row_preview": self.row_preview.diagnostics(),
+            "sheet_preview": self.sheet_preview.diagnostics(),
+            "atlas": self.atlas.diagnostics(),
+            "history": self.history.stats(),
+            "receivers": {
+                "grid.row_selected": self.grid.receivers(sig("row_selected(int)")),
+                "grid.cells_changed": self.grid.receivers(sig("cells_changed(QVariantList,QString)")),
+                "fps_spin.valueChanged": self.fps_spin.receivers(sig("valueChanged(int)")),
+                "play_btn.clicked": self.play_btn.receivers(sig("clicked(bool)")),
+                "change_recorded": self.receivers(sig("change_recorded(QVariantMap)")),
+            },
+            "qobjects": len(self.findChildren(QtCore.QObject)),
+            "live_export": self.live_export.is_active(),
+            "hot_reload": self.hot_reload.is_running(),
+        }
 
     def _on_export_bundle(self):
         if not self.project:
@@ -238,9 +341,20 @@ class EditorPage(QtWidgets.QWidget):
             return
         cells = self.grid.get_all_paths()
         try:
-            exporter.export_bundle(self, self.project, cells)
+            task = exporter.export_bundle(self, self.project, cells, atlas=self.atlas)
         except Exception as e:
             QtWidgets.QMessageBox.critical(self, "Export Failed", str(e))
+            return
+        if task is not None:
+            self.set_read_only(True)
+            task.ended.connect(lambda: self.set_read_only(False))
+
+    def set_read_only(self, on: bool):
+        """Block edits (e.g. during a background export); browsing, preview
+        playback and zoom keep working."""
+        self.grid.set_read_only(on)
+        for w in (self.back_btn, self.crop_btn, self.auto_box, self.trig_box, self.fps_spin, self.loop_combo):
+            w.setEnabled(not on)
 
     def _on_crop_align(self):
         if not self.project:
@@ -251,23 +365,35 @@ class EditorPage(QtWidgets.QWidget):
             return
         g = self.project.grid
         # Pass full list so dialog can cycle and overlay; falls back internally if a string
-        dlg = CropAlignDialog(images, g.tile_width, g.tile_height, g.offset_x, g.offset_y, self, scale_percent=getattr(g, 'source_scale', 100))
+        from .crop_dialog import CropAlignDialog
+        dlg = CropAlignDialog(images, g.tile_width, g.tile_height, g.offset_x, g.offset_y, self, scale_percent=getattr(g, 'source_scale', 100), color_key=g.color_key, key_tolerance=g.key_tolerance)
         if dlg.exec() == QtWidgets.QDialog.DialogCode.Accepted:
+            old = (g.offset_x, g.offset_y, g.source_scale, g.color_key, g.key_tolerance)
             x, y = dlg.offsets()
             g.offset_x = x
             g.offset_y = y
             # propagate scale back to project
             # Save scale
             g.source_scale = dlg.scale_percent()
-            # Refresh visuals
-            self.raw_panel.set_grid_config(g)
-            self.grid.refresh_icons(g)
-            # Refresh preview if a row is selected
-            self._refresh_row_preview()
+            g.color_key = dlg.color_key()
+            g.key_tolerance = dlg.key_tolerance()
+            self._record_meta("Crop / Align", "grid", None, "crop", old, (g.offset_x, g.offset_y, g.source_scale, g.color_key, g.key_tolerance))
+            self._apply_crop_visuals()
+
+    def _apply_crop_visuals(self):
+        g = self.project.grid
+        # Refresh visuals
+        self.raw_panel.set_grid_config(g)
+        self.grid.refresh_icons(g)
+        self.atlas.rebuild(self.grid.get_all_paths())
+        # duplicates are judged on prepared tiles
+        self._fill_images = None
+        self._sync_auto_slider_max()
+        # Refresh preview if a row is selected
+        self._refresh_row_preview()
 
     def _on_row_selected(self, row_idx: int):
-        paths = self.grid.get_row_paths(row_idx)
-        self.row_preview.set_paths(paths)
+        self.row_preview.set_rects(self.atlas.row_rects(row_idx))
         # Load row meta controls
         if self.project:
             meta = self.project.rows_meta.get(row_idx)
@@ -314,6 +440,7 @@ class EditorPage(QtWidgets.QWidget):
                 from .project_model import RowMeta
                 meta = RowMeta()
                 self.project.rows_meta[r] = meta
+            self._record_meta("Change FPS", "row", r, "fps", meta.fps, int(val))
             meta.fps = int(val)
 
     def _on_loop_changed(self, mode: str):
@@ -328,14 +455,14 @@ class EditorPage(QtWidgets.QWidget):
                 from .project_model import RowMeta
                 meta = RowMeta()
                 self.project.rows_meta[r] = meta
+            self._record_meta("Change Loop Mode", "row", r, "loop_mode", meta.loop_mode, mode)
             meta.loop_mode = mode
 
     def _on_play_row(self):
         # Ensure preview has current row frames and settings
         r = self._current_row_index()
         if r is not None:
-            paths = self.grid.get_row_paths(r)
-            self.row_preview.set_paths(paths)
+            self.row_preview.set_rects(self.atlas.row_rects(r))
         self.row_preview.start()
 
     # --- Auto populate helpers (per-row) ---
@@ -476,6 +603,7 @@ class EditorPage(QtWidgets.QWidget):
                     from .project_model import RowMeta
                     meta = RowMeta()
                     self.project.rows_meta[row_index] = meta
+                self._record_meta("Rename Row", "row", row_index, "name", meta.name, text)
                 meta.name = text
             name_edit.textChanged.connect(on_name_changed)
 
@@ -497,6 +625,7 @@ class EditorPage(QtWidgets.QWidget):
             def on_snd_name(text: str, row_index=r):
                 m = ensure_meta(row_index)
                 if not m: return
+                self._record_meta("Change Sound Name", "row", row_index, "sound.name", m.sounds[0].get("name", ""), text)
                 m.sounds[0]["name"] = text
             snd_name.textChanged.connect(on_snd_name)
 
@@ -508,24 +637,28 @@ class EditorPage(QtWidgets.QWidget):
                 if dlg.exec() == QtWidgets.QDialog.Accepted:
                     path = dlg.selectedFiles()[0]
                     snd_file.setText(path)
+                    self._record_meta("Change Sound File", "row", row_index, "sound.file", m.sounds[0].get("file", ""), path)
                     m.sounds[0]["file"] = path
             snd_browse.clicked.connect(on_snd_browse)
 
             def on_trig(val: int, row_index=r):
                 m = ensure_meta(row_index)
                 if not m: return
+                self._record_meta("Change Sound Trigger", "row", row_index, "sound.trigger_frame", m.sounds[0].get("trigger_frame", 0), int(val))
                 m.sounds[0]["trigger_frame"] = int(val)
             trig.valueChanged.connect(on_trig)
 
             def on_rep(val: int, row_index=r):
                 m = ensure_meta(row_index)
                 if not m: return
+                self._record_meta("Change Sound Repeat", "row", row_index, "sound.repeat_ms", m.sounds[0].get("repeat_ms", 0), int(val))
                 m.sounds[0]["repeat_ms"] = int(val)
             rep.valueChanged.connect(on_rep)
 
             def on_vol(val: float, row_index=r):
                 m = ensure_meta(row_index)
                 if not m: return
+                self._record_meta("Change Sound Volume", "row", row_index, "sound.volume", m.sounds[0].get("volume", 1.0), float(val))
                 m.sounds[0]["volume"] = float(val)
             vol.valueChanged.connect(on_vol)
 
@@ -548,10 +681,53 @@ class EditorPage(QtWidgets.QWidget):
         self.auto_rows_layout.addStretch(1)
         self._sync_auto_slider_max()
 
+    def _on_source_files_changed(self, added: list, removed: list):
+        if not self.project:
+            return
+        self.raw_panel.apply_changes(added, removed, self.project.source_index().files())
+        self._fill_images = None
+        self._sync_auto_slider_max()
+
+    def _on_source_files_modified(self, paths: list):
+        # re-rendered frames: new thumbnails; the atlas is refreshed by LiveExport
+        self.grid.refresh_paths(paths)
+        self.raw_panel.refresh_paths(paths)
+
+    def _on_live_export_toggled(self, on: bool):
+        if not on:
+            self.live_export.stop()
+            self.live_label.setText("")
+            return
+        if not self.project:
+            self.live_btn.setChecked(False)
+            return
+        ok, msg = self.project.validate()
+        dest = QtWidgets.QFileDialog.getExistingDirectory(self, "Live Export Folder") if ok else ""
+        if not ok:
+            QtWidgets.QMessageBox.warning(self, "Invalid Project", msg)
+        if not dest:
+            self.live_btn.setChecked(False)
+            return
+        self.live_export.start(self.project, self.grid.get_all_paths, dest)
+
+    def _on_hot_reload_toggled(self, on: bool):
+        if not on:
+            self.hot_reload.stop()
+            return
+        if not self.project:
+            self.hot_btn.setChecked(False)
+            return
+        port = QtCore.QSettings().value("hot_reload/port", HOT_RELOAD_PORT, type=int)
+        if not self.hot_reload.start(self.project, port):
+            self.hot_btn.setChecked(False)
+
     def _sync_auto_slider_max(self):
         if not self.project:
             return
-        n = len(self.project.list_source_images())
+        # the collapsed list is only built when auto-fill runs; until then
+        # the full listing bounds Start (fills clamp to the real length)
+        images = self._fill_images if self._fill_images is not None else self.project.source_index().files()
+        n = len(images)
         for row in getattr(self, '_auto_row_widgets', []):
             row['start'].setMaximum(max(0, max(0, n - 1)))
             # Update trigger max based on grid columns
@@ -560,6 +736,43 @@ class EditorPage(QtWidgets.QWidget):
             except Exception:
                 pass
 
+    def _auto_fill_images(self) -> list[str]:
+        """Source images auto-fill steps through; near-duplicate runs collapsed if enabled.
+        Built on first use after a change, so only auto-fill pays for hashing."""
+        if self._fill_images is None:
+            files = self.project.source_index().files()
+            threshold = self.project.duplicate_threshold
+            if threshold < 0:
+                self._fill_images = files
+            else:
+                QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.CursorShape.WaitCursor)
+                try:
+                    self._fill_images = collapse_runs(files, threshold, self.project.grid)
+                finally:
+                    QtWidgets.QApplication.restoreOverrideCursor()
+                self._sync_auto_slider_max()
+        return self._fill_images
+
+    def _on_duplicate_threshold_changed(self, *_):
+        if not self.project:
+            return
+        old = self.project.duplicate_threshold
+        new = self.dup_threshold_spin.value() if self.skip_dups_check.isChecked() else -1
+        self._record_meta("Change Duplicate Threshold", "project", None, "duplicate_threshold", old, new)
+        self.project.duplicate_threshold = new
+        self._fill_images = None
+        self._sync_auto_slider_max()
+
+    def _sync_duplicate_widgets(self):
+        threshold = self.project.duplicate_threshold if self.project else -1
+        for w in (self.skip_dups_check, self.dup_threshold_spin):
+            w.blockSignals(True)
+        self.skip_dups_check.setChecked(threshold >= 0)
+        if threshold >= 0:
+            self.dup_threshold_spin.setValue(threshold)
+        for w in (self.skip_dups_check, self.dup_threshold_spin):
+            w.blockSignals(False)
+
     def _maybe_auto_fill_all(self):
         if self.auto_enable.isChecked():
             self._auto_fill_all()
@@ -567,27 +780,125 @@ class EditorPage(QtWidgets.QWidget):
     def _auto_fill_all(self):
         if not self.project:
             return
-        for r, row in enumerate(getattr(self, '_auto_row_widgets', [])):
-            self._auto_fill_row(r, row['start'].value(), row['step'].value())
-        self._refresh_row_preview()
+        images = self._auto_fill_images()
+        # one transaction: single repaint, preview refresh and undo step
+        with self.grid.batch("Fill All Rows"):
+            for r, row in enumerate(getattr(self, '_auto_row_widgets', [])):
+                self._auto_fill_row(r, row['start'].value(), row['step'].value(), images)
 
-    def _auto_fill_row(self, r: int, start: int, step: int):
+    def _auto_fill_row(self, r: int, start: int, step: int, images: list[str] | None = None):
         if not self.project:
             return
-        images = self.project.list_source_images()
+        if images is None:
+            images = self._auto_fill_images()
         n = len(images)
         if n == 0:
             return
         cols = self.grid.columnCount()
         idx = min(max(0, start), max(0, n - 1))
-        for c in range(cols):
-            if 0 <= idx < n:
-                self.grid.set_cell_path(r, c, images[idx])
+        with self.grid.batch("Fill Row"):
+            for c in range(cols):
+                if 0 <= idx < n:
+                    self.grid.set_cell_path(r, c, images[idx])
+                else:
+                    break
+                idx += max(1, step) if step > 0 else 1
+
+    # --- Undo / redo ---
+    def _on_cells_changed(self, changes: list, label: str):
+        if not self.project:
+            return
+        self.change_recorded.emit({"t": "cells", "c": [[r, c, new] for r, c, _old, new in changes]})
+        if self._applying_history:
+            return
+        self.history.record_cells(label, self.grid.columnCount(), changes)
+        self.history_changed.emit()
+
+    def _record_meta(self, label: str, scope: str, index, key: str, old, new):
+        if self._applying_history or not self.project or old == new:
+            return
+        self.change_recorded.emit({"t": "meta", "s": scope, "i": index, "k": key, "v": new})
+        self.history.record_meta(label, scope, index, key, old, new)
+        self.history_changed.emit()
+
+    def reset_history(self):
+        """Forget all undo steps, e.g. after loading a project."""
+        self.history.clear()
+        self.history_changed.emit()
+
+    def undo(self):
+        edit = self.history.pop_undo()
+        if edit is not None:
+            self._apply_edit(edit, undo=True)
+
+    def redo(self):
+        edit = self.history.pop_redo()
+        if edit is not None:
+            self._apply_edit(edit, undo=False)
+
+    def _apply_edit(self, edit, undo: bool):
+        self._applying_history = True
+        try:
+            if isinstance(edit, CellEdit):
+                path_of = self.history.paths.path
+                # one bulk update no matter how many cells the step touched
+                with self.grid.batch(edit.label):
+                    for r, c, idx in edit.cells(undo):
+                        self.grid.set_cell_path(r, c, path_of(idx))
             else:
-                break
-            idx += max(1, step) if step > 0 else 1
-        # Resync maxes in case image count changed
-        self._sync_auto_slider_max()
+                self._set_meta_value(edit.scope, edit.index, edit.key, edit.old if undo else edit.new)
+        finally:
+            self._applying_history = False
+        self.history_changed.emit()
+
+    def _set_meta_value(self, scope: str, index, key: str, value):
+        """Apply a metadata value from history to the project and its widgets."""
+        if not self.project:
+            return
+        self.project.set_meta_value(scope, index, key, value)
+        self.change_recorded.emit({"t": "meta", "s": scope, "i": index, "k": key, "v": value})
+        if scope == "grid" and key == "crop":
+            self._apply_crop_visuals()
+        elif scope == "trigger":
+            w = self._trigger_widgets[index]
+            widget = w["file"] if key == "file" else w["vol"]
+            widget.blockSignals(True)
+            if key == "file":
+                widget.setText(str(value))
+            else:
+                widget.setValue(float(value))
+            widget.blockSignals(False)
+        elif scope == "row":
+            self._sync_row_widgets(index)
+        elif scope == "project" and key == "duplicate_threshold":
+            self._sync_duplicate_widgets()
+            self._fill_images = None
+            self._sync_auto_slider_max()
+
+    def _sync_row_widgets(self, row: int):
+        """Reflect a row's metadata in its auto-populate controls (signals blocked)."""
+        rows = getattr(self, '_auto_row_widgets', [])
+        meta = self.project.rows_meta.get(row) if self.project else None
+        if meta is not None and 0 <= row < len(rows):
+            w = rows[row]
+            s0 = meta.sounds[0] if meta.sounds else {}
+            values = [
+                (w['name_edit'], meta.name),
+                (w['snd_name'], str(s0.get('name', ""))),
+                (w['snd_file'], str(s0.get('file', ""))),
+                (w['trig'], int(s0.get('trigger_frame', 0))),
+                (w['rep'], int(s0.get('repeat_ms', 0))),
+                (w['vol'], float(s0.get('volume', 1.0))),
+            ]
+            for widget, val in values:
+                widget.blockSignals(True)
+                if isinstance(widget, QtWidgets.QLineEdit):
+                    widget.setText(val)
+                else:
+                    widget.setValue(val)
+                widget.blockSignals(False)
+        if row == self._current_row_index():
+            self._on_row_selected(row)
 
     # Selection sync handlers with guards
     # Note: raw -> grid selection sync disabled to avoid selection jumping
@@ -0,0 +1,87 @@
+from __future__ import annotations
+from bisect import bisect_left
+from typing import List, Tuple
+import os
+import re
+from .frame_sources import VIRTUAL_SEP, is_container, list_frames
+
+
+_DIGITS = re.compile(r"(\d+)")
+
+
+def natural_key(name: str) -> tuple:
+    """Sort key treating digit runs as numbers: frame2.png < frame10.png."""
+    if VIRTUAL_SEP in name:
+        name = name.split(VIRTUAL_SEP, 1)[1]  # order by the member path inside the container
+    else:
+        name = os.path.basename(name)
+    parts = _DIGITS.split(name.lower())
+    # even slots are text, odd slots are digit runs
+    return tuple((0, int(p), p) if i % 2 else (1, 0, p) for i, p in enumerate(parts))
+
+
+class FolderIndex:
+    """Cached, naturally sorted listing of the images in one folder.
+
+    The folder is scanned once; `rescan()` re-lists it and applies only the
+    difference, returning what was added and removed so callers can update
+    incrementally. `folder` may also be a container file (ZIP, animated
+    GIF/APNG, or a strip sliced into `frame_size` cells); its frames are
+    listed as virtual paths.
+    """
+
+    def __init__(self, folder: str, extensions: Tuple[str, ...] = (".png",), frame_size: Tuple[int, int] = (0, 0)):
+        self.folder = folder
+        self.extensions = tuple(e.lower() for e in extensions)
+        self.frame_size = tuple(frame_size)
+        self._files: List[str] | None = None
+        self._keys: List[tuple] = []
+
+    def _list_dir(self) -> set[str]:
+        if is_container(self.folder):
+            return set(list_frames(self.folder, self.extensions, self.frame_size))
+        try:
+            with os.scandir(self.folder) as it:
+                return {
+                    os.path.join(self.folder, e.name)
+                    for e in it
+                    if e.name.lower().endswith(self.extensions) and e.is_file()
+                }
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            return set()
+
+    def files(self) -> List[str]:
+        """Sorted full paths. The returned list is shared; do not mutate it."""
+        if self._files is None:
+            found = self._list_dir()
+            self._files = sorted(found, key=natural_key)
+            self._keys = [natural_key(p) for p in self._files]
+        return self._files
+
+    def __len__(self) -> int:
+        return len(self.files())
+
+    def invalidate(self):
+        self._files = None
+        self._keys = []
+
+    def rescan(self) -> Tuple[List[str], List[str]]:
+        """Re-list the folder and merge changes. Returns (added, removed)."""
+        if self._files is None:
+            self.files()
+            return list(self._files), []
+        found = self._list_dir()
+        current = set(self._files)
+        added = sorted(found - current, key=natural_key)
+        removed = sorted(current - found, key=natural_key)
+        if removed:
+            gone = set(removed)
+            keep = [i for i, p in enumerate(self._files) if p not in gone]
+            self._files = [self._files[i] for i in keep]
+            self._keys = [self._keys[i] for i in keep]
+        for p in added:
+            k = natural_key(p)
+            i = bisect_left(self._keys, k)
+            self._keys.insert(i, k)
+            self._files.insert(i, p)
+        return added, removed
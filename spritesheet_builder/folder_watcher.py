@@ -0,0 +1,45 @@
+from PySide6 import QtCore
+from .folder_index import FolderIndex
+
+
+class FolderWatcher(QtCore.QObject):
+    """Keeps a FolderIndex in sync with the file system.
+
+    Directory change notifications are debounced, then the index is rescanned
+    and `changed(added, removed)` fires only if something actually changed.
+    """
+    changed = QtCore.Signal(list, list)
+
+    def __init__(self, parent=None, debounce_ms: int = 250):
+        super().__init__(parent)
+        self.index: FolderIndex | None = None
+        self._watcher = QtCore.QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._watcher.fileChanged.connect(self._on_directory_changed)  # container sources
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self.rescan)
+
+    def watch(self, index: FolderIndex | None):
+        watched = self._watcher.directories() + self._watcher.files()
+        if watched:
+            self._watcher.removePaths(watched)
+        self._timer.stop()
+        self.index = index
+        if index is not None and index.folder and QtCore.QFileInfo.exists(index.folder):
+            self._watcher.addPath(index.folder)
+
+    def _on_directory_changed(self, _path: str):
+        self._timer.start()
+
+    @QtCore.Slot()
+    def rescan(self):
+        if self.index is None:
+            return
+        folder = self.index.folder
+        if QtCore.QFileInfo(folder).isFile() and folder not in self._watcher.files():
+            self._watcher.addPath(folder)  # a replaced file drops its watch
+        added, removed = self.index.rescan()
+        if added or removed:
+            self.changed.emit(added, removed)
@@ -0,0 +1,255 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import List, Tuple
+import io
+import os
+import re
+import threading
+import zipfile
+from PIL import Image
+
+# Frames inside a container file are addressed as "<container>::<member>":
+#   frames.zip::walk/00012.png   a PNG inside a ZIP archive
+#   anim.gif::00012              frame 12 of an animated GIF/APNG/WebP
+#   strip.png::00012@64x48       frame 12 of a strip/atlas sliced into 64x48 cells
+VIRTUAL_SEP = "::"
+CONTAINER_EXTS = (".zip", ".gif", ".png", ".apng", ".webp")
+
+_STRIP_MEMBER = re.compile(r"^(\d+)@(\d+)x(\d+)$")
+
+
+def is_virtual(path: str) -> bool:
+    return VIRTUAL_SEP in path
+
+
+def split_virtual(path: str) -> Tuple[str, str]:
+    container, _, member = path.partition(VIRTUAL_SEP)
+    return container, member
+
+
+def is_container(path: str) -> bool:
+    """True for a single file that can act as a frame source."""
+    return path.lower().endswith(CONTAINER_EXTS) and os.path.isfile(path)
+
+
+def source_basename(path: str) -> str:
+    """Name used to re-find a frame when its container or folder moved."""
+    if is_virtual(path):
+        return split_virtual(path)[1]
+    return os.path.basename(path)
+
+
+def identity(path: str) -> tuple | None:
+    """(path, mtime, size) of the file holding a frame; None if it is gone."""
+    try:
+        st = os.stat(split_virtual(path)[0])
+    except OSError:
+        return None
+    return (path, st.st_mtime_ns, st.st_size)
+
+
+class _ZipSource:
+    """PNG members of an archive, read through one open handle."""
+
+    def __init__(self, path: str):
+        self._zip = zipfile.ZipFile(path)
+        self._lock = threading.Lock()
+
+    def members(self, extensions: Tuple[str, ...]) -> List[str]:
+        return [i.filename for i in self._zip.infolist() if not i.is_dir() and i.filename.lower().endswith(extensions)]
+
+    def has(self, member: str) -> bool:
+        try:
+            self._zip.getinfo(member)
+        except KeyError:
+            return False
+        return True
+
+    def frame(self, member: str) -> Image.Image:
+        with self._lock:
+            data = self._zip.read(member)
+        im = Image.open(io.BytesIO(data))
+        im.load()
+        return im
+
+    def close(self):
+        self._zip.close()
+
+
+class _AnimatedSource:
+    """Frames of an animated GIF/APNG/WebP, decoded on demand from one open stream."""
+
+    def __init__(self, image: Image.Image):
+        self._image = image
+        self.count = getattr(image, "n_frames", 1)
+        self._lock = threading.Lock()
+
+    def members(self, _extensions) -> List[str]:
+        return [f"{i:05d}" for i in range(self.count)]
+
+    def has(self, member: str) -> bool:
+        return member.isdigit() and int(member) < self.count
+
+    def frame(self, member: str) -> Image.Image:
+        with self._lock:
+            self._image.seek(int(member))
+            return self._image.convert("RGBA")
+
+    def close(self):
+        self._image.close()
+
+
+class _StripSource:
+    """One big image sliced into equal cells, row-major. Decoded once."""
+
+    def __init__(self, image: Image.Image):
+        image.load()
+        self._image = image
+        self.size = image.size
+
+    def cell_size(self, frame_size: Tuple[int, int]) -> Tuple[int, int]:
+        w, h = frame_size
+        if w <= 0 and h <= 0:
+            # default: a horizontal strip of square frames
+            w = h = min(self.size)
+        return (w if w > 0 else h), (h if h > 0 else w)
+
+    def members(self, _extensions, frame_size: Tuple[int, int] = (0, 0)) -> List[str]:
+        w, h = self.cell_size(frame_size)
+        count = (self.size[0] // w) * (self.size[1] // h)
+        return [f"{i:05d}@{w}x{h}" for i in range(count)]
+
+    def has(self, member: str) -> bool:
+        m = _STRIP_MEMBER.match(member)
+        if not m:
+            return False
+        i, w, h = (int(v) for v in m.groups())
+        return w > 0 and h > 0 and i < (self.size[0] // w) * (self.size[1] // h)
+
+    def frame(self, member: str) -> Image.Image:
+        m = _STRIP_MEMBER.match(member)
+        if not m:
+            raise KeyError(member)
+        i, w, h = (int(v) for v in m.groups())
+        cols = max(1, self.size[0] // w)
+        x, y = (i % cols) * w, (i // cols) * h
+        return self._image.crop((x, y, x + w, y + h))
+
+    def close(self):
+        self._image.close()
+
+
+# Open containers keyed by file identity, so an edited file is reopened
+_sources: "OrderedDict[tuple, object]" = OrderedDict()
+_sources_lock = threading.Lock()
+_MAX_SOURCES = 8
+
+
+def _open(container: str):
+    try:
+        st = os.stat(container)
+    except OSError as e:
+        raise FileNotFoundError(container) from e
+    key = (container, st.st_mtime_ns, st.st_size)
+    with _sources_lock:
+        src = _sources.get(key)
+        if src is not None:
+            _sources.move_to_end(key)
+            return src
+        if container.lower().endswith(".zip"):
+            src = _ZipSource(container)
+        else:
+            im = Image.open(container)
+            src = _AnimatedSource(im) if getattr(im, "is_animated", False) else _StripSource(im)
+        _sources[key] = src
+        while len(_sources) > _MAX_SOURCES:
+            # not closed explicitly: a worker thread may still be reading it
+            _sources.popitem(last=False)
+        return src
+
+
+class _FrameCache:
+    """Decoded frames by virtual path, bounded by pixel memory."""
+
+    def __init__(self, max_bytes: int = 128 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[tuple, Image.Image]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            im = self._items.get(key)
+            if im is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return im
+
+    def put(self, key, im: Image.Image):
+        size = im.width * im.height * 4
+        with self._lock:
+            if key in self._items:
+                return
+            self._items[key] = im
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._items) > 1:
+                _k, old = self._items.popitem(last=False)
+                self._bytes -= old.width * old.height * 4
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._items), "bytes": self._bytes, "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses}
+
+
+_frames = _FrameCache()
+
+
+def cache_stats() -> dict:
+    """Decoded container frames and open containers, for diagnostics."""
+    with _sources_lock:
+        containers = len(_sources)
+    return {"frames": _frames.stats(), "open_containers": containers}
+
+
+def list_frames(container: str, extensions: Tuple[str, ...] = (".png",), frame_size: Tuple[int, int] = (0, 0)) -> List[str]:
+    """Virtual paths of every frame in a container file (unsorted)."""
+    try:
+        src = _open(container)
+    except (OSError, zipfile.BadZipFile, Image.UnidentifiedImageError):
+        return []
+    if isinstance(src, _StripSource):
+        members = src.members(extensions, frame_size)
+    else:
+        members = src.members(extensions)
+    return [container + VIRTUAL_SEP + m for m in members]
+
+
+def has_frame(path: str) -> bool:
+    container, member = split_virtual(path)
+    try:
+        return _open(container).has(member)
+    except (OSError, zipfile.BadZipFile, Image.UnidentifiedImageError):
+        return False
+
+
+def open_frame(path: str) -> Image.Image:
+    """Decode a frame (virtual or plain file) as a Pillow image.
+
+    Virtual frames are cached; callers must not modify the returned image.
+    """
+    if not is_virtual(path):
+        im = Image.open(path)
+        im.load()
+        return im
+    key = identity(path)
+    if key is None:
+        raise FileNotFoundError(path)
+    im = _frames.get(key)
+    if im is None:
+        container, member = split_virtual(path)
+        im = _open(container).frame(member)
+        _frames.put(key, im)
+    return im
@@ -1,19 +1,65 @@
 from PySide6 import QtWidgets, QtCore, QtGui
 from .project_model import ProjectModel
+from contextlib import contextmanager
+import dataclasses
 import os
-from .image_utils import make_icon_pixmap
+from .image_utils import make_icon_image
+from .image_jobs import ImageJobQueue, PixmapCache
+from .frame_sources import is_virtual, has_frame
 
 
 ROLE_PATH = QtCore.Qt.ItemDataRole.UserRole + 1
 
+# Thumbnail sizes generated for the grid; the smallest one >= the cell's
+# icon size is used, so zooming out never allocates full-size icons
+LOD_SIZES = (16, 32, 64, 128, 256, 512)
+ZOOM_MIN = 0.05
+ZOOM_MAX = 4.0
+ZOOM_STEP = 1.25
+# Default memory budget for cached thumbnails; override with the
+# "grid/pixmap_budget_mb" setting or set_pixmap_budget()
+DEFAULT_PIXMAP_BUDGET_MB = 256
+
 
 class GridWidget(QtWidgets.QTableWidget):
     selected_path_changed = QtCore.Signal(str)
     row_selected = QtCore.Signal(int)
+    # list of (row, col, old path, new path) plus an action label;
+    # one emission per edit or per batch
+    cells_changed = QtCore.Signal(list, str)
     def __init__(self, parent=None):
         super().__init__(parent)
         self.project: ProjectModel | None = None
         self._tinted_row: int | None = None
+        self._read_only = False
+        # Batch state (see batch())
+        self._batch_depth = 0
+        self._batch_changes: dict[tuple[int, int], tuple[str | None, str | None]] = {}
+        self._batch_label = ""
+        # Background thumbnail generation; cells waiting per source path
+        self._thumbs = ImageJobQueue(self)
+        self._thumbs.ready.connect(self._on_thumb_ready)
+        self._thumb_waiters: dict[tuple, set[tuple[int, int]]] = {}
+        # Thumbnails by (path, lod, generation, file version); only cells in
+        # or near the viewport hold an icon, remembered in _shown as
+        # (row, col) -> key. A path's version is bumped when its file changes.
+        budget_mb = QtCore.QSettings().value("grid/pixmap_budget_mb", DEFAULT_PIXMAP_BUDGET_MB, type=int)
+        self._pixmaps = PixmapCache(budget_mb * 1024 * 1024)
+        self._shown: dict[tuple[int, int], tuple] = {}
+        self._thumb_gen = 0
+        self._path_versions: dict[str, int] = {}
+        self._thumb_grid = None
+        self._zoom = 1.0
+        self._base_cell = QtCore.QSize(64, 64)
+        self._visible_timer = QtCore.QTimer(self)
+        self._visible_timer.setSingleShot(True)
+        self._visible_timer.setInterval(15)
+        self._visible_timer.timeout.connect(self._update_visible)
+        # pixel scrolling keeps the zoom anchor math in content pixels
+        self.setHorizontalScrollMode(QtWidgets.QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.horizontalScrollBar().valueChanged.connect(self._schedule_visible)
+        self.verticalScrollBar().valueChanged.connect(self._schedule_visible)
         self.setAcceptDrops(True)
         self.setDragEnabled(False)
         self.setDragDropMode(QtWidgets.QAbstractItemView.DragDropMode.DropOnly)
@@ -30,6 +76,10 @@ class GridWidget(QtWidgets.QTableWidget):
 
     def configure(self, project: ProjectModel):
         self.project = project
+        self._cancel_thumbs()
+        self._pixmaps.clear()
+        self._shown.clear()
+        self._thumb_grid = None
         self.clear()
         self.setRowCount(project.grid.rows)
         self.setColumnCount(project.grid.cols)
@@ -37,43 +87,197 @@ class GridWidget(QtWidgets.QTableWidget):
         tile_w = project.grid.tile_width
         tile_h = project.grid.tile_height
         # Use actual tile size within sensible bounds so thumbnails aren't tiny
-        cell_w = max(64, min(tile_w, 256))
-        cell_h = max(64, min(tile_h, 256))
-        for c in range(project.grid.cols):
-            self.setColumnWidth(c, cell_w)
-        for r in range(project.grid.rows):
-            self.setRowHeight(r, cell_h)
-        # Ensure icons use most of the cell
-        self.setIconSize(QtCore.QSize(cell_w - 2, cell_h - 2))
+        self._base_cell = QtCore.QSize(max(64, min(tile_w, 256)), max(64, min(tile_h, 256)))
+        self._zoom = 1.0
+        self._apply_cell_size()
 
         for r in range(project.grid.rows):
             for c in range(project.grid.cols):
                 item = QtWidgets.QTableWidgetItem()
                 item.setTextAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
                 item.setData(ROLE_PATH, None)
-                item.setSizeHint(QtCore.QSize(cell_w, cell_h))
                 self.setItem(r, c, item)
 
+    # --- Zoom and level of detail ---
+    def zoom(self) -> float:
+        return self._zoom
+
+    def set_zoom(self, zoom: float, anchor: QtCore.QPoint | None = None):
+        """Scale cells relative to their configured size, keeping the cell
+        under `anchor` (viewport coordinates) in place."""
+        zoom = max(ZOOM_MIN, min(ZOOM_MAX, zoom))
+        if zoom == self._zoom:
+            return
+        if anchor is None:
+            anchor = self.viewport().rect().center()
+        hbar, vbar = self.horizontalScrollBar(), self.verticalScrollBar()
+        # content position under the anchor, as a fraction of the content size
+        fx = (hbar.value() + anchor.x()) / max(1, self.horizontalHeader().length())
+        fy = (vbar.value() + anchor.y()) / max(1, self.verticalHeader().length())
+        self._zoom = zoom
+        self._apply_cell_size()
+        hbar.setValue(round(fx * self.horizontalHeader().length() - anchor.x()))
+        vbar.setValue(round(fy * self.verticalHeader().length() - anchor.y()))
+        self._schedule_visible()
+
+    def _apply_cell_size(self):
+        w = max(4, round(self._base_cell.width() * self._zoom))
+        h = max(4, round(self._base_cell.height() * self._zoom))
+        for header, size in ((self.horizontalHeader(), w), (self.verticalHeader(), h)):
+            header.setMinimumSectionSize(4)
+            header.setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Fixed)
+            header.setDefaultSectionSize(size)
+        # Ensure icons use most of the cell
+        self.setIconSize(QtCore.QSize(max(1, w - 2), max(1, h - 2)))
+
+    def _lod(self) -> int:
+        want = max(self.iconSize().width(), self.iconSize().height())
+        return next((s for s in LOD_SIZES if s >= want), LOD_SIZES[-1])
+
+    def wheelEvent(self, event: QtGui.QWheelEvent):
+        if event.modifiers() & QtCore.Qt.KeyboardModifier.ControlModifier:
+            steps = event.angleDelta().y() / 120.0
+            if steps:
+                self.set_zoom(self._zoom * ZOOM_STEP ** steps, event.position().toPoint())
+            event.accept()
+            return
+        super().wheelEvent(event)
+
+    def resizeEvent(self, event: QtGui.QResizeEvent):
+        super().resizeEvent(event)
+        self._schedule_visible()
+
+    def set_pixmap_budget(self, megabytes: int):
+        """Cap the memory held by cached thumbnails of off-screen cells."""
+        self._pixmaps.set_budget(max(1, int(megabytes)) * 1024 * 1024)
+
+    def diagnostics(self) -> dict:
+        return {
+            "cells_with_icon": len(self._shown),
+            "pixmap_cache": self._pixmaps.stats(),
+            "pending_thumbnails": self.pending_thumbnails(),
+            "zoom": round(self._zoom, 3),
+            "lod": self._lod(),
+        }
+
+    def pixmap_memory(self) -> int:
+        """Approximate bytes held by the thumbnail cache."""
+        return self._pixmaps.used_bytes()
+
+    def _visible_range(self) -> tuple[int, int, int, int]:
+        """(first row, last row, first col, last col) in or near the viewport."""
+        vp = self.viewport().rect()
+        rows, cols = self.rowCount(), self.columnCount()
+        r0 = self.rowAt(vp.top())
+        r1 = self.rowAt(vp.bottom())
+        c0 = self.columnAt(vp.left())
+        c1 = self.columnAt(vp.right())
+        r0 = 0 if r0 < 0 else r0
+        c0 = 0 if c0 < 0 else c0
+        r1 = rows - 1 if r1 < 0 else r1
+        c1 = cols - 1 if c1 < 0 else c1
+        # one extra quarter screen around the viewport so short scrolls are ready
+        mr = max(1, (r1 - r0 + 1) // 4)
+        mc = max(1, (c1 - c0 + 1) // 4)
+        return max(0, r0 - mr), min(rows - 1, r1 + mr), max(0, c0 - mc), min(cols - 1, c1 + mc)
+
+    def _in_view(self, row: int, col: int) -> bool:
+        r0, r1, c0, c1 = self._visible_range()
+        return r0 <= row <= r1 and c0 <= col <= c1
+
+    def _schedule_visible(self, *_args):
+        if not self._visible_timer.isActive():
+            self._visible_timer.start()
+
+    def _update_visible(self):
+        """Give cells near the viewport a thumbnail at the current LOD and
+        drop the icons of cells that scrolled away."""
+        if not self.project or self._batch_depth:
+            return
+        r0, r1, c0, c1 = self._visible_range()
+        for (r, c) in list(self._shown):
+            if not (r0 <= r <= r1 and c0 <= c <= c1):
+                it = self.item(r, c)
+                if it:
+                    it.setIcon(QtGui.QIcon())
+                del self._shown[(r, c)]
+        lod = self._lod()
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                it = self.item(r, c)
+                path = it.data(ROLE_PATH) if it else None
+                if path and self._shown.get((r, c)) != self._thumb_key(path, lod):
+                    self._show_thumb(r, c, path, lod, sync=False)
+
+    def _thumb_key(self, path: str, lod: int) -> tuple:
+        return (path, lod, self._thumb_gen, self._path_versions.get(path, 0))
+
+    def _cached_thumb(self, path: str, lod: int) -> QtGui.QPixmap | None:
+        key = self._thumb_key(path, lod)
+        pm = self._pixmaps.get(key)
+        if pm is not None:
+            return pm
+        # downscale a larger level already in memory instead of decoding again
+        for bigger in LOD_SIZES:
+            if bigger > lod:
+                big = self._pixmaps.get(self._thumb_key(path, bigger))
+                if big is not None and not big.isNull():
+                    pm = big.scaled(lod, lod, QtCore.Qt.AspectRatioMode.KeepAspectRatio, QtCore.Qt.TransformationMode.SmoothTransformation)
+                    self._pixmaps.put(key, pm)
+                    return pm
+        return None
+
+    def _show_thumb(self, row: int, col: int, path: str, lod: int, sync: bool):
+        item = self.item(row, col)
+        pm = self._cached_thumb(path, lod)
+        if pm is None and sync:
+            img = make_icon_image(path, QtCore.QSize(lod, lod), self._thumb_grid or self.project.grid)
+            pm = QtGui.QPixmap.fromImage(img) if not img.isNull() else QtGui.QPixmap()
+            self._pixmaps.put(self._thumb_key(path, lod), pm)
+        if pm is None:
+            # current icon (if any) stays until the new level arrives
+            self._request_thumb(row, col, path, lod)
+            return
+        self._shown[(row, col)] = self._thumb_key(path, lod)
+        if pm.isNull():
+            self._apply_icon(item, QtGui.QImage())
+        else:
+            item.setText("")
+            item.setIcon(QtGui.QIcon(pm))
+
+    def set_read_only(self, on: bool):
+        """Refuse drops and clears; viewing, selection and zoom still work."""
+        self._read_only = on
+
     def dragEnterEvent(self, event: QtGui.QDragEnterEvent):
+        if self._read_only:
+            event.ignore()
+            return
         if self._has_image_path(event.mimeData()):
             event.acceptProposedAction()
         else:
             super().dragEnterEvent(event)
 
     def dragMoveEvent(self, event: QtGui.QDragMoveEvent):
+        if self._read_only:
+            event.ignore()
+            return
         if self._has_image_path(event.mimeData()):
             event.acceptProposedAction()
         else:
             super().dragMoveEvent(event)
 
     def dropEvent(self, event: QtGui.QDropEvent):
+        if self._read_only:
+            event.ignore()
+            return
         path = self._extract_path(event.mimeData())
-        if path and os.path.isfile(path):
+        if path:
             pos = event.position().toPoint()
             row = self.rowAt(pos.y())
             col = self.columnAt(pos.x())
             if row >= 0 and col >= 0:
-                self._set_cell_image(row, col, path)
+                self._set_cell_image(row, col, path, label="Place Frame")
                 # Notify listeners: selection path changed (for syncing) and
                 # re-fire row_selected if this row is currently tinted to refresh previews
                 try:
@@ -89,70 +293,160 @@ class GridWidget(QtWidgets.QTableWidget):
                 return
         super().dropEvent(event)
 
-    def _set_cell_image(self, row: int, col: int, path: str):
+    def _set_cell_image(self, row: int, col: int, path: str, label: str = "Edit Cell"):
         if not self.project:
             return
         item = self.item(row, col)
         if not item:
             item = QtWidgets.QTableWidgetItem()
             self.setItem(row, col, item)
+        old = item.data(ROLE_PATH)
+        if old == path:
+            return
         item.setText("")
         item.setData(ROLE_PATH, path)
-        tile_w = max(1, self.columnWidth(col) - 2)
-        tile_h = max(1, self.rowHeight(row) - 2)
-        pm = make_icon_pixmap(path, QtCore.QSize(tile_w, tile_h), self.project.grid if self.project else None)
-        if not pm.isNull():
-            item.setIcon(QtGui.QIcon(pm))
+        item.setIcon(QtGui.QIcon())
+        self._shown.pop((row, col), None)
+        if self._batch_depth:
+            # Icons for visible cells are queued when the batch ends
+            pass
+        elif self._in_view(row, col):
+            self._show_thumb(row, col, path, self._lod(), sync=True)
+        self._notify_changed(row, col, old, path, label)
+
+    def _apply_icon(self, item: QtWidgets.QTableWidgetItem, img: QtGui.QImage, icon: QtGui.QIcon | None = None):
+        if not img.isNull():
+            item.setText("")
+            item.setIcon(icon if icon is not None else QtGui.QIcon(QtGui.QPixmap.fromImage(img)))
         else:
             item.setIcon(QtGui.QIcon())
             item.setText("?")
 
+    def _clear_cell(self, row: int, col: int, label: str = "Clear Cell"):
+        it = self.item(row, col)
+        if not it:
+            it = QtWidgets.QTableWidgetItem()
+            self.setItem(row, col, it)
+        old = it.data(ROLE_PATH)
+        it.setIcon(QtGui.QIcon())
+        it.setText("")
+        it.setData(ROLE_PATH, None)
+        self._shown.pop((row, col), None)
+        if old is not None:
+            self._notify_changed(row, col, old, None, label)
+
+    def _notify_changed(self, row: int, col: int, old: str | None, path: str | None, label: str):
+        if self._batch_depth:
+            prev = self._batch_changes.get((row, col))
+            # keep the value from before the batch started
+            self._batch_changes[(row, col)] = (prev[0] if prev else old, path)
+        else:
+            self.cells_changed.emit([(row, col, old, path)], label)
+
+    @contextmanager
+    def batch(self, label: str = "Edit Cells"):
+        """Group many cell edits into one transaction.
+
+        Inside the block thumbnails are queued for background generation,
+        repaints are suspended and change signals are held back. On exit one
+        `cells_changed` carries every edited cell, and `row_selected` fires
+        once if the tinted row was touched. Batches may be nested; the
+        outermost label names the action.
+        """
+        if self._batch_depth == 0:
+            self._batch_changes = {}
+            self._batch_label = label
+            self.setUpdatesEnabled(False)
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._commit_batch()
+
+    def _commit_batch(self):
+        changes = [(r, c, o, p) for (r, c), (o, p) in self._batch_changes.items() if o != p]
+        self._batch_changes = {}
+        self.setUpdatesEnabled(True)
+        self._update_visible()
+        if not changes:
+            return
+        self.cells_changed.emit(changes, self._batch_label)
+        if self._tinted_row is not None and any(ch[0] == self._tinted_row for ch in changes):
+            self.row_selected.emit(self._tinted_row)
+
+    # --- Background thumbnails ---
+    def _request_thumb(self, row: int, col: int, path: str, lod: int):
+        key = self._thumb_key(path, lod)
+        waiting = self._thumb_waiters.get(key)
+        if waiting is not None:
+            waiting.add((row, col))
+            return
+        self._thumb_waiters[key] = {(row, col)}
+        grid = self._thumb_grid or (self.project.grid if self.project else None)
+        # workers get a private copy so later edits to the config can't race them
+        grid_copy = dataclasses.replace(grid) if grid is not None else None
+        self._thumbs.submit(key, make_icon_image, path, QtCore.QSize(lod, lod), grid_copy)
+
+    def _on_thumb_ready(self, key: tuple, img: QtGui.QImage):
+        cells = self._thumb_waiters.pop(key, ())
+        path, lod, _gen, _version = key
+        if key != self._thumb_key(path, lod):
+            return
+        pm = QtGui.QPixmap.fromImage(img) if not img.isNull() else QtGui.QPixmap()
+        self._pixmaps.put(key, pm)
+        if lod != self._lod():
+            return
+        for r, c in cells:
+            it = self.item(r, c)
+            # skip cells that were reassigned or scrolled away while the job ran
+            if it and it.data(ROLE_PATH) == path and self._in_view(r, c):
+                self._show_thumb(r, c, path, lod, sync=False)
+
+    def _cancel_thumbs(self):
+        self._thumbs.cancel_all()
+        self._thumb_waiters.clear()
+
+    def pending_thumbnails(self) -> int:
+        return self._thumbs.pending()
+
     # Public API to set a cell's image path
     def set_cell_path(self, row: int, col: int, path: str | None):
-        it = self.item(row, col)
         if path:
             self._set_cell_image(row, col, path)
         else:
-            if not it:
-                it = QtWidgets.QTableWidgetItem()
-                self.setItem(row, col, it)
-            it.setIcon(QtGui.QIcon())
-            it.setText("")
-            it.setData(ROLE_PATH, None)
+            self._clear_cell(row, col)
 
     def _on_context_menu(self, pos: QtCore.QPoint):
         index = self.indexAt(pos)
-        if not index.isValid():
+        if not index.isValid() or self._read_only:
             return
         menu = QtWidgets.QMenu(self)
         act_clear = menu.addAction("Clear Cell")
         act = menu.exec(self.viewport().mapToGlobal(pos))
         if act == act_clear:
-            item = self.item(index.row(), index.column())
-            if item:
-                item.setIcon(QtGui.QIcon())
-                item.setText("")
-                item.setData(ROLE_PATH, None)
+            if self.item(index.row(), index.column()):
+                self._clear_cell(index.row(), index.column())
+
+    @staticmethod
+    def _is_frame_path(p: str) -> bool:
+        # plain PNG file, or a frame inside a ZIP/strip/animation source
+        if is_virtual(p):
+            return has_frame(p)
+        return p.lower().endswith('.png') and os.path.exists(p)
 
     def _has_image_path(self, mime: QtCore.QMimeData) -> bool:
-        if mime.hasUrls():
-            for url in mime.urls():
-                if url.isLocalFile() and url.toLocalFile().lower().endswith('.png'):
-                    return True
-        if mime.hasText():
-            t = mime.text()
-            if t.lower().endswith('.png') and os.path.exists(t):
-                return True
-        return False
+        return self._extract_path(mime) is not None
 
     def _extract_path(self, mime: QtCore.QMimeData) -> str | None:
         if mime.hasUrls():
             for url in mime.urls():
-                if url.isLocalFile() and url.toLocalFile().lower().endswith('.png'):
+                if url.isLocalFile() and self._is_frame_path(url.toLocalFile()):
                     return url.toLocalFile()
         if mime.hasText():
             t = mime.text()
-            if t.lower().endswith('.png') and os.path.exists(t):
+            if self._is_frame_path(t):
                 return t
         return None
 
@@ -193,23 +487,28 @@ class GridWidget(QtWidgets.QTableWidget):
             self.row_selected.emit(r)
 
     def refresh_icons(self, grid_config=None):
-        """Rebuild icons for all cells using current or provided grid config (for cropping)."""
+        """Rebuild icons using current or provided grid config (for cropping).
+        Only cells near the viewport are queued, in the background; current
+        icons stay until replaced."""
         grid = grid_config if grid_config is not None else (self.project.grid if self.project else None)
         if grid is None:
             return
-        for r in range(self.rowCount()):
-            for c in range(self.columnCount()):
-                it = self.item(r, c)
-                if not it:
-                    continue
-                path = it.data(ROLE_PATH)
-                if not path:
-                    continue
-                tile_w = max(1, self.columnWidth(c) - 2)
-                tile_h = max(1, self.rowHeight(r) - 2)
-                pm = make_icon_pixmap(path, QtCore.QSize(tile_w, tile_h), grid)
-                if not pm.isNull():
-                    it.setIcon(QtGui.QIcon(pm))
+        self._cancel_thumbs()
+        self._thumb_gen += 1
+        self._pixmaps.clear()
+        self._thumb_grid = grid_config
+        self._update_visible()
+
+    def refresh_paths(self, paths):
+        """Re-decode the thumbnails of these source files (edited on disk).
+        Other cells keep their icons; affected ones update in the background."""
+        paths = set(paths)
+        if not paths:
+            return
+        for p in paths:
+            self._path_versions[p] = self._path_versions.get(p, 0) + 1
+        self._pixmaps.discard(lambda key: key[0] in paths)
+        self._update_visible()
 
     def _tint_row(self, row: int):
         # Clear previous
@@ -253,15 +552,12 @@ class GridWidget(QtWidgets.QTableWidget):
         if not data:
             return
         rows = min(self.rowCount(), len(data))
-        for r in range(rows):
-            cols = min(self.columnCount(), len(data[r]))
-            for c in range(cols):
-                p = data[r][c]
-                if p:
-                    self._set_cell_image(r, c, p)
-                else:
-                    it = self.item(r, c)
-                    if it:
-                        it.setIcon(QtGui.QIcon())
-                        it.setText("")
-                        it.setData(ROLE_PATH, None)
+        with self.batch("Set Cells"):
+            for r in range(rows):
+                cols = min(self.columnCount(), len(data[r]))
+                for c in range(cols):
+                    p = data[r][c]
+                    if p:
+                        self._set_cell_image(r, c, p)
+                    elif self.item(r, c):
+                        self._clear_cell(r, c)
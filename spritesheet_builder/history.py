@@ -0,0 +1,194 @@
+from __future__ import annotations
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+import time
+
+
+class PathTable:
+    """Interns source paths so edits can refer to them by small ints.
+    Index 0 is reserved for an empty cell."""
+
+    def __init__(self):
+        self._paths: List[str | None] = [None]
+        self._index: Dict[str, int] = {}
+
+    def intern(self, path: str | None) -> int:
+        if not path:
+            return 0
+        idx = self._index.get(path)
+        if idx is None:
+            idx = len(self._paths)
+            self._paths.append(path)
+            self._index[path] = idx
+        return idx
+
+    def path(self, idx: int) -> str | None:
+        return self._paths[idx]
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+
+def encode_runs(values: Iterable[int]) -> array:
+    """Pack ints as flat (first, delta, count) triples.
+
+    Auto-fill writes arithmetic sequences (start, start+step, ...) and edits
+    touch contiguous cells, so whole rows usually collapse into one triple.
+    """
+    out = array("i")
+    first = delta = 0
+    count = 0
+    for v in values:
+        if count == 0:
+            first, count = v, 1
+        elif count == 1:
+            delta, count = v - first, 2
+        elif v == first + delta * count:
+            count += 1
+        else:
+            out.extend((first, delta, count))
+            first, delta, count = v, 0, 1
+    if count:
+        out.extend((first, delta, count))
+    return out
+
+
+def decode_runs(runs: array) -> Iterator[int]:
+    for i in range(0, len(runs), 3):
+        first, delta, count = runs[i], runs[i + 1], runs[i + 2]
+        for k in range(count):
+            yield first + delta * k
+
+
+@dataclass
+class CellEdit:
+    """Cells changed by one action: linear positions with old/new path indices."""
+    label: str
+    cols: int
+    positions: array
+    old: array
+    new: array
+
+    @staticmethod
+    def from_changes(label: str, cols: int, changes: Iterable[Tuple[int, int, int, int]]) -> "CellEdit | None":
+        rows = sorted((r * cols + c, o, n) for r, c, o, n in changes if o != n)
+        if not rows:
+            return None
+        return CellEdit(
+            label,
+            cols,
+            encode_runs(p for p, _o, _n in rows),
+            encode_runs(o for _p, o, _n in rows),
+            encode_runs(n for _p, _o, n in rows),
+        )
+
+    def cells(self, undo: bool) -> Iterator[Tuple[int, int, int]]:
+        """(row, col, path index) to apply for undo or redo."""
+        values = self.old if undo else self.new
+        for pos, idx in zip(decode_runs(self.positions), decode_runs(values)):
+            yield pos // self.cols, pos % self.cols, idx
+
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in (self.positions, self.old, self.new))
+
+
+@dataclass
+class MetaEdit:
+    """A single metadata value change, e.g. ("row", 3, "fps", 6, 12)."""
+    label: str
+    scope: str  # "row", "grid" or "trigger"
+    index: int | None
+    key: str
+    old: Any
+    new: Any
+    stamp: float = field(default_factory=time.monotonic)
+
+    def nbytes(self) -> int:
+        return 64
+
+
+class EditHistory:
+    """Undo/redo stack of compact edits.
+
+    Consecutive MetaEdits of the same field within `merge_window` seconds
+    (typing into a name box, dragging a slider) collapse into one step.
+    Oldest entries are dropped past `max_entries` or `max_bytes`.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 32 * 1024 * 1024, merge_window: float = 1.0):
+        self.paths = PathTable()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.merge_window = merge_window
+        self._undo: List[CellEdit | MetaEdit] = []
+        self._redo: List[CellEdit | MetaEdit] = []
+        self._bytes = 0
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._bytes = 0
+
+    def record_cells(self, label: str, cols: int, changes: Iterable[Tuple[int, int, str | None, str | None]]):
+        intern = self.paths.intern
+        edit = CellEdit.from_changes(label, cols, ((r, c, intern(o), intern(n)) for r, c, o, n in changes))
+        if edit is not None:
+            self._push(edit)
+
+    def record_meta(self, label: str, scope: str, index: int | None, key: str, old: Any, new: Any):
+        if old == new:
+            return
+        edit = MetaEdit(label, scope, index, key, old, new)
+        top = self._undo[-1] if self._undo else None
+        if (
+            isinstance(top, MetaEdit)
+            and not self._redo
+            and (top.scope, top.index, top.key) == (scope, index, key)
+            and edit.stamp - top.stamp <= self.merge_window
+        ):
+            top.new = new
+            top.stamp = edit.stamp
+            return
+        self._push(edit)
+
+    def _push(self, edit: CellEdit | MetaEdit):
+        self._redo.clear()
+        self._undo.append(edit)
+        self._bytes += edit.nbytes()
+        while self._undo and (len(self._undo) > self.max_entries or self._bytes > self.max_bytes):
+            self._bytes -= self._undo.pop(0).nbytes()
+
+    def stats(self) -> dict:
+        return {"undo": len(self._undo), "redo": len(self._redo), "bytes": self._bytes, "paths": len(self.paths)}
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def undo_label(self) -> str:
+        return self._undo[-1].label if self._undo else ""
+
+    def redo_label(self) -> str:
+        return self._redo[-1].label if self._redo else ""
+
+    def pop_undo(self) -> CellEdit | MetaEdit | None:
+        if not self._undo:
+            return None
+        edit = self._undo.pop()
+        self._bytes -= edit.nbytes()
+        self._redo.append(edit)
+        return edit
+
+    def pop_redo(self) -> CellEdit | MetaEdit | None:
+        if not self._redo:
+            return None
+        edit = self._redo.pop()
+        self._undo.append(edit)
+        self._bytes += edit.nbytes()
+        return edit
+
+    def nbytes(self) -> int:
+        return self._bytes
@@ -0,0 +1,180 @@
+from __future__ import annotations
+from PySide6 import QtCore, QtGui, QtNetwork
+from .project_model import ProjectModel
+from .bundle_helper import HOT_RELOAD_PORT, encode_hot_message
+
+# Rects merged into one bounding rect past this many per flush
+MAX_TILE_RECTS = 64
+
+
+class HotReloadServer(QtCore.QObject):
+    """Streams live atlas edits to running games on localhost.
+
+    Repainted atlas rects are collected and sent as raw RGBA tiles a few
+    milliseconds later, together with any rows whose frames, fps, loop
+    mode or name changed. New clients get the whole sheet and all rows.
+    The protocol and the client live in the shipped helper
+    (HotReloadClient); pixels are the straight-alpha sheet, without
+    export-time texture options.
+    """
+    status = QtCore.Signal(str)
+
+    def __init__(self, atlas, parent=None, coalesce_ms: int = 30):
+        super().__init__(parent)
+        self.atlas = atlas
+        self.project: ProjectModel | None = None
+        self._server = QtNetwork.QTcpServer(self)
+        self._server.newConnection.connect(self._on_new_connection)
+        self._clients: list[QtNetwork.QTcpSocket] = []
+        self._dirty: list[QtCore.QRect] = []
+        self._rows_dirty = False
+        self._sent_rows: list[dict] = []
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(coalesce_ms)
+        self._timer.timeout.connect(self._flush)
+        atlas.changed.connect(self._on_atlas_changed)
+        atlas.reset.connect(self._on_atlas_reset)
+
+    def is_running(self) -> bool:
+        return self._server.isListening()
+
+    def start(self, project: ProjectModel, port: int = HOT_RELOAD_PORT) -> bool:
+        """Listen on 127.0.0.1:port; False (with a status message) on failure."""
+        self.project = project
+        if self._server.isListening():
+            return True
+        if not self._server.listen(QtNetwork.QHostAddress(QtNetwork.QHostAddress.SpecialAddress.LocalHost), port):
+            self.status.emit(f"Hot reload: {self._server.errorString()}")
+            return False
+        self._sent_rows = self._rows()
+        self._report()
+        return True
+
+    def stop(self):
+        self._timer.stop()
+        self._server.close()
+        clients, self._clients = self._clients, []
+        for sock in clients:
+            sock.disconnectFromHost()
+            sock.deleteLater()
+        self._dirty.clear()
+        self.status.emit("")
+
+    def rows_changed(self):
+        """Row metadata or cells were edited; sends rows that differ."""
+        if self.is_running():
+            self._rows_dirty = True
+            self._timer.start()
+
+    def _report(self):
+        n = len(self._clients)
+        self.status.emit(f"Hot reload: 127.0.0.1:{self._server.serverPort()} ({n} game{'s' if n != 1 else ''})")
+
+    def _on_new_connection(self):
+        # bring existing clients up to date first, so every client's rows
+        # match _sent_rows afterwards
+        if self._timer.isActive():
+            self._timer.stop()
+            self._flush()
+        while self._server.hasPendingConnections():
+            sock = self._server.nextPendingConnection()
+            sock.disconnected.connect(lambda s=sock: self._on_disconnected(s))
+            self._clients.append(sock)
+            sheet = self._sheet_rect()
+            self._sent_rows = self._rows()
+            sock.write(encode_hot_message({"type": "hello", "version": 1, "sheet_name": self.project.sheet_name if self.project else "", "sheet_size": [sheet.width(), sheet.height()]}))
+            sock.write(self._tiles_message([sheet]))
+            sock.write(encode_hot_message({"type": "rows", "rows": self._sent_rows}))
+        self._report()
+
+    def _on_disconnected(self, sock: QtNetwork.QTcpSocket):
+        if sock not in self._clients:
+            return
+        self._clients.remove(sock)
+        try:
+            sock.deleteLater()
+            self._report()
+        except RuntimeError:
+            pass  # already destroyed along with the server on shutdown
+
+    def _on_atlas_changed(self, rect: QtCore.QRect):
+        if self._clients:
+            self._dirty.append(QtCore.QRect(rect))
+            self._timer.start()
+
+    def _on_atlas_reset(self):
+        # new sheet size: clients get the whole (still empty) sheet, then tiles as they arrive
+        if self._clients:
+            self._dirty = [self._sheet_rect()]
+            self._rows_dirty = True
+            self._timer.start()
+
+    def _sheet_rect(self) -> QtCore.QRect:
+        return self.atlas.image().rect()
+
+    def _tiles_message(self, rects: list[QtCore.QRect]) -> bytes:
+        image = self.atlas.image()
+        tiles, payload = [], bytearray()
+        for rect in rects:
+            rect = rect.intersected(image.rect())
+            if rect.isEmpty():
+                continue
+            part = image.copy(rect).convertToFormat(QtGui.QImage.Format.Format_RGBA8888)
+            data = bytes(part.constBits())[: rect.width() * rect.height() * 4]
+            tiles.append({"x": rect.x(), "y": rect.y(), "w": rect.width(), "h": rect.height(), "offset": len(payload), "length": len(data)})
+            payload += data
+        size = image.size()
+        return encode_hot_message({"type": "tiles", "sheet_size": [size.width(), size.height()], "tiles": tiles}, payload)
+
+    def _rows(self) -> list[dict]:
+        """Rows as the bundle describes them (same defaults as meta.json)."""
+        if self.project is None:
+            return []
+        rows = []
+        for r in range(self.project.grid.rows):
+            meta = self.project.rows_meta.get(r)
+            rows.append({
+                "index": r,
+                "name": meta.name if meta and meta.name else f"row_{r}",
+                "fps": int(meta.fps) if meta else 6,
+                "loop_mode": meta.loop_mode if meta else "pingpong",
+                "frames": [[q.x(), q.y(), q.width(), q.height()] for q in self.atlas.row_rects(r)],
+            })
+        return rows
+
+    def _flush(self):
+        if not self._clients:
+            self._dirty.clear()
+            self._rows_dirty = False
+            return
+        messages = []
+        if self._dirty:
+            rects = self._dirty
+            if len(rects) > MAX_TILE_RECTS:
+                bound = QtCore.QRect(rects[0])
+                for q in rects[1:]:
+                    bound = bound.united(q)
+                rects = [bound]
+            messages.append(self._tiles_message(rects))
+            self._dirty = []
+            # painted cells may have gained or lost frames
+            self._rows_dirty = True
+        if self._rows_dirty:
+            self._rows_dirty = False
+            rows = self._rows()
+            old = {row["index"]: row for row in self._sent_rows}
+            delta = []
+            for row in rows:
+                before = old.get(row["index"])
+                if before != row:
+                    entry = dict(row)
+                    if before is not None and before["name"] != row["name"]:
+                        entry["old_name"] = before["name"]
+                    delta.append(entry)
+            self._sent_rows = rows
+            if delta:
+                messages.append(encode_hot_message({"type": "rows", "rows": delta}))
+        for sock in self._clients:
+            for msg in messages:
+                sock.write(msg)
@@ -0,0 +1,130 @@
+from collections import OrderedDict
+from PySide6 import QtCore, QtGui
+
+
+class _JobSignals(QtCore.QObject):
+    done = QtCore.Signal(object, QtGui.QImage)
+
+
+class _ImageJob(QtCore.QRunnable):
+    def __init__(self, key, fn, args, signals: _JobSignals):
+        super().__init__()
+        self._key = key
+        self._fn = fn
+        self._args = args
+        self._signals = signals
+
+    def run(self):
+        try:
+            img = self._fn(*self._args)
+        except Exception:
+            img = QtGui.QImage()
+        self._signals.done.emit(self._key, img)
+
+
+class ImageJobQueue(QtCore.QObject):
+    """Runs QImage-producing functions on a private thread pool.
+
+    `ready(key, image)` is delivered on the GUI thread. `cancel_all()` drops
+    queued jobs and ignores results of jobs already running, so callers can
+    invalidate outstanding work when the grid config changes.
+    """
+    ready = QtCore.Signal(object, QtGui.QImage)
+    idle = QtCore.Signal()
+
+    def __init__(self, parent=None, max_threads: int | None = None):
+        super().__init__(parent)
+        self._pool = QtCore.QThreadPool(self)
+        if max_threads:
+            self._pool.setMaxThreadCount(max_threads)
+        self._signals = _JobSignals()
+        self._signals.done.connect(self._on_done)
+        self._generation = 0
+        self._pending = 0
+
+    def submit(self, key, fn, *args):
+        self._pending += 1
+        self._pool.start(_ImageJob((self._generation, key), fn, args, self._signals))
+
+    def pending(self) -> int:
+        return self._pending
+
+    def cancel_all(self):
+        self._pool.clear()
+        self._generation += 1
+        self._pending = 0
+
+    def wait(self, msecs: int = -1) -> bool:
+        """Block until running jobs finish; results still arrive via the event loop."""
+        return self._pool.waitForDone(msecs)
+
+    def _on_done(self, key, img: QtGui.QImage):
+        gen, user_key = key
+        if gen != self._generation:
+            return
+        self._pending -= 1
+        self.ready.emit(user_key, img)
+        if self._pending == 0:
+            self.idle.emit()
+
+
+class PixmapCache:
+    """LRU of QPixmaps bounded by an approximate byte budget (GUI thread only).
+
+    Pixmaps still shown by a widget stay alive through their QIcon after
+    eviction; the budget bounds what is kept for cells scrolled out of view.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[object, QtGui.QPixmap]" = OrderedDict()
+        self._bytes = 0
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def _cost(pm: QtGui.QPixmap) -> int:
+        return pm.width() * pm.height() * 4
+
+    def get(self, key) -> QtGui.QPixmap | None:
+        pm = self._items.get(key)
+        if pm is not None:
+            self._items.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+        return pm
+
+    def put(self, key, pm: QtGui.QPixmap):
+        old = self._items.pop(key, None)
+        if old is not None:
+            self._bytes -= self._cost(old)
+        self._items[key] = pm
+        self._bytes += self._cost(pm)
+        self._evict()
+
+    def set_budget(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def clear(self):
+        self._items.clear()
+        self._bytes = 0
+
+    def discard(self, match):
+        """Drop every entry whose key satisfies match(key)."""
+        for key in [k for k in self._items if match(k)]:
+            self._bytes -= self._cost(self._items.pop(key))
+
+    def used_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._items), "bytes": self._bytes, "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses}
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._items) > 1:
+            _k, pm = self._items.popitem(last=False)
+            self._bytes -= self._cost(pm)
@@ -1,35 +1,113 @@
 from PySide6 import QtGui, QtCore
 from .project_model import GridConfig
+from .frame_sources import is_virtual, open_frame
+from .color_key import parse_key, open_keyed_frame
+from .compose import sheet_dims, cell_box
+from .metrics import timed
+
+
+def load_source_image(path: str, grid: GridConfig | None = None) -> QtGui.QImage:
+    """Decode a source frame: a plain image file or a virtual container frame.
+    The grid's color key, if set, is applied (see color_key)."""
+    keyed = grid is not None and parse_key(getattr(grid, "color_key", "")) is not None
+    if not is_virtual(path) and not keyed:
+        return QtGui.QImage(path)
+    try:
+        im = (open_keyed_frame(path, grid) if keyed else open_frame(path)).convert("RGBA")
+    except Exception:
+        return QtGui.QImage()
+    data = im.tobytes()
+    return QtGui.QImage(data, im.width, im.height, im.width * 4, QtGui.QImage.Format.Format_RGBA8888).copy()
+
+
+def qimage_to_pil(img: QtGui.QImage):
+    """Copy a QImage into a Pillow RGBA image."""
+    from PIL import Image
+    img = img.convertToFormat(QtGui.QImage.Format.Format_RGBA8888)
+    data = bytes(img.constBits())[: img.sizeInBytes()]
+    return Image.frombuffer("RGBA", (img.width(), img.height()), data, "raw", "RGBA", img.bytesPerLine(), 1)
 
 
 def make_icon_pixmap(path: str, target_size: QtCore.QSize, grid: GridConfig) -> QtGui.QPixmap:
-    pm = QtGui.QPixmap(path)
-    if pm.isNull():
-        return pm
+    img = make_icon_image(path, target_size, grid)
+    if img.isNull():
+        return QtGui.QPixmap()
+    return QtGui.QPixmap.fromImage(img)
+
+
+@timed("thumbnail")
+def make_icon_image(path: str, target_size: QtCore.QSize, grid: GridConfig) -> QtGui.QImage:
+    """QImage variant of make_icon_pixmap; safe to call from worker threads."""
+    img = load_source_image(path, grid)
+    if img.isNull():
+        return img
     # Optional: scale source first
     if grid and getattr(grid, 'source_scale', 100) != 100:
         scale = max(10, min(400, int(grid.source_scale))) / 100.0
-        new_w = max(1, int(pm.width() * scale))
-        new_h = max(1, int(pm.height() * scale))
-        pm = pm.scaled(new_w, new_h, QtCore.Qt.AspectRatioMode.KeepAspectRatio, QtCore.Qt.TransformationMode.SmoothTransformation)
+        new_w = max(1, int(img.width() * scale))
+        new_h = max(1, int(img.height() * scale))
+        img = img.scaled(new_w, new_h, QtCore.Qt.AspectRatioMode.KeepAspectRatio, QtCore.Qt.TransformationMode.SmoothTransformation)
 
-    src = pm
+    src = img
     if grid and grid.crop_enabled:
         # Clamp offsets so there is at least 1px available
-        max_x = max(0, pm.width() - 1)
-        max_y = max(0, pm.height() - 1)
+        max_x = max(0, img.width() - 1)
+        max_y = max(0, img.height() - 1)
         x = max(0, min(grid.offset_x, max_x))
         y = max(0, min(grid.offset_y, max_y))
-        avail_w = pm.width() - x
-        avail_h = pm.height() - y
+        avail_w = img.width() - x
+        avail_h = img.height() - y
         if avail_w <= 0 or avail_h <= 0:
             # Out of bounds; fall back to full image
-            src = pm
+            src = img
         else:
             w = max(1, min(grid.tile_width, avail_w))
             h = max(1, min(grid.tile_height, avail_h))
             rect = QtCore.QRect(x, y, w, h)
-            src = pm.copy(rect)
+            src = img.copy(rect)
     tw = max(1, target_size.width())
     th = max(1, target_size.height())
     return src.scaled(QtCore.QSize(tw, th), QtCore.Qt.AspectRatioMode.KeepAspectRatio, QtCore.Qt.TransformationMode.SmoothTransformation)
+
+
+def sheet_size(grid: GridConfig) -> QtCore.QSize:
+    """Pixel size of the composed sheet for the given grid."""
+    return QtCore.QSize(*sheet_dims(grid))
+
+
+def cell_rect(grid: GridConfig, row: int, col: int) -> QtCore.QRect:
+    """Rect of a grid cell inside the composed sheet."""
+    return QtCore.QRect(*cell_box(grid, row, col))
+
+
+@timed("tile (Qt)")
+def prepare_tile(path: str, grid: GridConfig) -> QtGui.QImage:
+    """Load a source image and scale/crop it into a tile exactly as the exporter does."""
+    tw, th = grid.tile_width, grid.tile_height
+    src = load_source_image(path, grid)
+    if src.isNull():
+        return src
+    # scale whole source first if requested
+    scale_percent = getattr(grid, 'source_scale', 100)
+    if scale_percent != 100:
+        s = max(10, min(400, int(scale_percent))) / 100.0
+        new_w = max(1, int(src.width() * s))
+        new_h = max(1, int(src.height() * s))
+        src = src.scaled(new_w, new_h, QtCore.Qt.AspectRatioMode.KeepAspectRatio, QtCore.Qt.TransformationMode.SmoothTransformation)
+    if grid.crop_enabled:
+        x = max(0, min(grid.offset_x, max(0, src.width() - 1)))
+        y = max(0, min(grid.offset_y, max(0, src.height() - 1)))
+        avail_w = src.width() - x
+        avail_h = src.height() - y
+        if avail_w > 0 and avail_h > 0:
+            w = max(1, min(tw, avail_w))
+            h = max(1, min(th, avail_h))
+            src = src.copy(QtCore.QRect(x, y, w, h))
+        # center if smaller than tile
+        if src.width() != tw or src.height() != th:
+            # scale to fit tile preserving aspect
+            src = src.scaled(QtCore.QSize(tw, th), QtCore.Qt.AspectRatioMode.KeepAspectRatio, QtCore.Qt.TransformationMode.SmoothTransformation)
+    else:
+        # no crop: scale to fit tile preserving aspect
+        src = src.scaled(QtCore.QSize(tw, th), QtCore.Qt.AspectRatioMode.KeepAspectRatio, QtCore.Qt.TransformationMode.SmoothTransformation)
+    return src
@@ -0,0 +1,133 @@
+from __future__ import annotations
+from typing import Callable, List
+import json
+import os
+import queue
+import threading
+from .project_model import ProjectModel, write_project_json
+
+
+def journal_path(project_path: str) -> str:
+    return project_path + ".journal"
+
+
+class ProjectJournal:
+    """Append-only change log next to a project file, written off the GUI thread.
+
+    Every edit is appended as one JSON line. `compact()` writes a full
+    snapshot into the project file (atomically) and then truncates the
+    journal. Appends and compactions run in order on one worker thread, so
+    records queued after a snapshot survive its truncation.
+    """
+
+    def __init__(self, project_path: str, on_error: Callable[[str], None] | None = None):
+        self.project_path = project_path
+        self.path = journal_path(project_path)
+        self.on_error = on_error
+        self._queue: queue.Queue = queue.Queue()
+        self._dirty = False  # records appended since the last compaction was queued
+        self._thread = threading.Thread(target=self._run, name="project-journal", daemon=True)
+        self._thread.start()
+
+    # --- GUI thread API ---
+    def append(self, record: dict):
+        self._dirty = True
+        self._queue.put(("append", json.dumps(record, separators=(",", ":"))))
+
+    def is_dirty(self) -> bool:
+        return self._dirty
+
+    def compact(
+        self,
+        data: dict,
+        cells: List[List[str | None]] | None,
+        on_done: Callable[[], None] | None = None,
+        on_failed: Callable[[str], None] | None = None,
+    ):
+        """Queue a full save of `data` (ProjectModel.to_dict snapshot) and `cells`.
+        The caller must not mutate either afterwards. Callbacks run on the
+        worker thread; a failure goes to `on_failed` if given, else on_error."""
+        self._dirty = False
+        self._queue.put(("compact", (data, cells, on_done, on_failed)))
+
+    def discard(self):
+        """Drop any journal contents without saving them."""
+        self._dirty = False
+        self._queue.put(("truncate", None))
+
+    def close(self, timeout: float | None = 10.0):
+        """Finish queued work and stop the worker."""
+        self._queue.put(("stop", None))
+        self._thread.join(timeout)
+
+    # --- worker thread ---
+    def _run(self):
+        while True:
+            op, arg = self._queue.get()
+            try:
+                if op == "stop":
+                    return
+                if op == "append":
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write(arg + "\n")
+                elif op == "compact":
+                    data, cells, on_done, on_failed = arg
+                    try:
+                        write_project_json(self.project_path, data, cells)
+                    except Exception as e:
+                        # the journal still holds the edits; retry on the next autosave
+                        self._dirty = True
+                        if on_failed is None:
+                            raise
+                        on_failed(str(e))
+                        continue
+                    self._truncate()
+                    if on_done is not None:
+                        on_done()
+                elif op == "truncate":
+                    self._truncate()
+            except Exception as e:
+                if self.on_error is not None:
+                    self.on_error(f"{op} failed: {e}")
+
+    def _truncate(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def replay_journal(project_path: str, project: ProjectModel, cells: List[List[str | None]] | None) -> tuple[List[List[str | None]], int]:
+    """Apply journal records left by a previous session to `project` and `cells`.
+
+    Returns the updated cells and the number of records applied. A torn last
+    line (crash mid-write) is ignored.
+    """
+    g = project.grid
+    out = [list(row[:g.cols]) + [None] * max(0, g.cols - len(row)) for row in (cells or [])[:g.rows]]
+    out += [[None] * g.cols for _ in range(g.rows - len(out))]
+    applied = 0
+    try:
+        f = open(journal_path(project_path), "r", encoding="utf-8")
+    except FileNotFoundError:
+        return out, 0
+    with f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            t = rec.get("t")
+            if t == "cells":
+                for r, c, p in rec.get("c", []):
+                    if 0 <= r < g.rows and 0 <= c < g.cols:
+                        out[r][c] = p
+            elif t == "meta":
+                try:
+                    project.set_meta_value(rec["s"], rec.get("i"), rec["k"], rec["v"])
+                except (KeyError, IndexError, TypeError, ValueError):
+                    continue
+            else:
+                continue
+            applied += 1
+    return out, applied
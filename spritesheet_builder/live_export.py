@@ -0,0 +1,129 @@
+from __future__ import annotations
+from pathlib import Path
+import time
+from PySide6 import QtCore
+from .project_model import ProjectModel
+from .watch import InputWatcher
+from .bundle import sound_files, export_fingerprint, bundle_up_to_date
+from .exporter import ExportTask
+
+
+class LiveExport(QtCore.QObject):
+    """Editor side of watch mode.
+
+    Polls the project's cell sources and sounds; once writes have settled,
+    the changed files are re-composed into the live atlas (only their
+    cells) and the bundle is re-exported from it in the background.
+    `files_changed(paths)` lets the editor refresh thumbnails.
+    """
+    files_changed = QtCore.Signal(list)
+    status = QtCore.Signal(str)
+
+    def __init__(self, atlas, parent=None, interval_ms: int = 250, debounce_ms: int = 300):
+        super().__init__(parent)
+        self.atlas = atlas
+        self.project: ProjectModel | None = None
+        self.dest_dir: Path | None = None
+        self._cells_fn = None
+        self._inputs = InputWatcher()
+        self._pending: set[str] = set()
+        self._task: ExportTask | None = None
+        self._again = False
+        self._poll = QtCore.QTimer(self)
+        self._poll.setInterval(interval_ms)
+        self._poll.timeout.connect(self._on_poll)
+        self._debounce = QtCore.QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce_ms)
+        self._debounce.timeout.connect(self._flush)
+        # waits for the atlas to finish re-decoding before exporting
+        self._settle = QtCore.QTimer(self)
+        self._settle.setSingleShot(True)
+        self._settle.setInterval(50)
+        self._settle.timeout.connect(self._export_when_ready)
+
+    def is_active(self) -> bool:
+        return self.dest_dir is not None
+
+    def start(self, project: ProjectModel, cells_fn, dest_dir: str | Path):
+        """Watch `project` (cells from cells_fn()) and export into dest_dir."""
+        self.project = project
+        self._cells_fn = cells_fn
+        self.dest_dir = Path(dest_dir)
+        self._pending.clear()
+        self._inputs = InputWatcher(self._input_paths())
+        self._poll.start()
+        self._debounce.start()
+
+    def stop(self):
+        """Stop watching; an export already running still completes."""
+        self._poll.stop()
+        self._debounce.stop()
+        self._settle.stop()
+        self._pending.clear()
+        self.dest_dir = None
+        self._again = False
+
+    def inputs_changed(self):
+        """Cells or sounds were edited in the editor: re-watch and re-export."""
+        if not self.is_active():
+            return
+        self._inputs.set_paths(self._input_paths())
+        self._debounce.start()
+
+    def _input_paths(self) -> list[str]:
+        cells = self._cells_fn() if self._cells_fn else []
+        return [p for row in cells for p in row if p] + [f for f in sound_files(self.project) if f]
+
+    def _on_poll(self):
+        changed = self._inputs.poll()
+        if changed:
+            self._pending |= changed
+            self._debounce.start()
+
+    def _flush(self):
+        changed = sorted(self._pending)
+        self._pending.clear()
+        if changed:
+            self.atlas.refresh_paths(changed)
+            self.files_changed.emit(changed)
+        self._export_when_ready()
+
+    def _export_when_ready(self):
+        if not self.is_active():
+            return
+        if self._task is not None:
+            self._again = True
+            return
+        if self.atlas.pending():
+            self._settle.start()
+            return
+        cells = self._cells_fn()
+        fingerprint = export_fingerprint(self.project, cells)
+        if bundle_up_to_date(self.project, self.dest_dir, fingerprint):
+            self.status.emit("Live export: up to date")
+            return
+        # the atlas re-composed just the changed cells; if it lags behind
+        # the grid, the task composes the sheet from scratch instead
+        sheet = frames = None
+        if self.atlas.is_current(self.project, cells):
+            sheet, frames = self.atlas.image(), self.atlas.frames()
+        task = ExportTask(self.project, cells, self.dest_dir, sheet, frames, self, fingerprint)
+        task.succeeded.connect(lambda _zip, _note: self.status.emit(f"Live export: updated {time.strftime('%H:%M:%S')}"))
+        task.failed.connect(lambda err: self.status.emit(f"Live export failed: {err}"))
+        task.ended.connect(self._on_task_ended)
+        task.ended.connect(task.deleteLater)
+        self._task = task
+        self.status.emit("Live export: exporting…")
+        task.start()
+
+    def _on_task_ended(self):
+        self._task = None
+        if self._again:
+            self._again = False
+            self._export_when_ready()
+
+    def wait(self):
+        """Block until a running export has finished (e.g. on close)."""
+        if self._task is not None:
+            self._task.wait(10.0)
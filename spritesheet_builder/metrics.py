@@ -0,0 +1,53 @@
+from __future__ import annotations
+from functools import wraps
+from typing import Dict
+import threading
+import time
+
+# Process-wide timers for the diagnostics panel: calls and seconds spent in
+# hot paths (thumbnails, tile preparation, composition). Thread-safe and
+# cheap enough to stay on; cache hit rates are kept by the caches.
+
+_lock = threading.Lock()
+_timers: Dict[str, list] = {}  # name -> [calls, seconds]
+
+
+def add_time(name: str, seconds: float):
+    with _lock:
+        entry = _timers.setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+
+def timed(name: str):
+    """Decorator recording each call's duration under `name`."""
+    def wrap(fn):
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                add_time(name, time.perf_counter() - t0)
+        return inner
+    return wrap
+
+
+def timers() -> dict:
+    """{name: {"calls", "seconds", "avg_ms"}} since start or the last reset."""
+    with _lock:
+        items = {k: tuple(v) for k, v in _timers.items()}
+    return {
+        name: {"calls": calls, "seconds": round(secs, 3), "avg_ms": round(1000 * secs / calls, 2) if calls else 0.0}
+        for name, (calls, secs) in sorted(items.items())
+    }
+
+
+def reset_timers():
+    with _lock:
+        _timers.clear()
+
+
+def hit_rate(hits: int, misses: int) -> float | None:
+    total = hits + misses
+    return round(hits / total, 3) if total else None
@@ -0,0 +1,79 @@
+from __future__ import annotations
+from typing import Dict, List, Set, Tuple
+import os
+from .frame_sources import VIRTUAL_SEP, is_virtual, is_container, has_frame
+
+
+def list_dir_names(folder: str) -> Set[str] | None:
+    """Names of the regular files in a folder, or None if it can't be listed."""
+    try:
+        with os.scandir(folder) as it:
+            return {e.name for e in it if e.is_file()}
+    except OSError:
+        return None
+
+
+def resolve_cell_paths(
+    cells: List[List[str | None]] | None,
+    cells_basenames: List[List[str | None]] | None,
+    source_folder: str,
+    known_dirs: Dict[str, Set[str]] | None = None,
+) -> Tuple[List[List[str | None]] | None, List[str]]:
+    """Resolve saved cell references to existing files.
+
+    Prefers the stored absolute path; falls back to the basename inside
+    `source_folder`. Every directory involved is listed once and all cells
+    are resolved by set lookup, so a project costs one scan per folder
+    rather than one or two stat calls per cell. `known_dirs` can supply
+    listings the caller already has (e.g. the source folder index).
+    Virtual frame paths (container::member) are checked against their
+    container, and a container source re-finds frames by member name.
+
+    Returns (resolved cells, sorted list of references that were not found).
+    """
+    if cells is None and cells_basenames is None:
+        return None, []
+    listings: Dict[str, Set[str] | None] = {}
+    for folder, names in (known_dirs or {}).items():
+        listings[os.path.normpath(folder)] = names
+
+    def exists(folder: str, name: str) -> bool:
+        key = os.path.normpath(folder)
+        if key not in listings:
+            listings[key] = list_dir_names(folder)
+        names = listings[key]
+        return names is not None and name in names
+
+    source_is_container = is_container(source_folder)
+    rows = cells or cells_basenames or []
+    memo: Dict[tuple, str | None] = {}
+    missing: Set[str] = set()
+    out: List[List[str | None]] = []
+    for r_idx, row in enumerate(rows):
+        out_row: List[str | None] = []
+        for c_idx in range(len(row)):
+            cand = None
+            base = None
+            if cells and r_idx < len(cells) and c_idx < len(cells[r_idx]):
+                cand = cells[r_idx][c_idx]
+            if cells_basenames and r_idx < len(cells_basenames) and c_idx < len(cells_basenames[r_idx]):
+                base = cells_basenames[r_idx][c_idx]
+            key = (cand, base)
+            if key not in memo:
+                path = None
+                # prefer existing absolute path
+                if isinstance(cand, str) and cand:
+                    if has_frame(cand) if is_virtual(cand) else exists(os.path.dirname(cand), os.path.basename(cand)):
+                        path = cand
+                if path is None and isinstance(base, str) and base:
+                    if source_is_container:
+                        if has_frame(source_folder + VIRTUAL_SEP + base):
+                            path = source_folder + VIRTUAL_SEP + base
+                    elif exists(source_folder, base):
+                        path = os.path.join(source_folder, base)
+                if path is None and (cand or base):
+                    missing.add(cand if isinstance(cand, str) and cand else str(base))
+                memo[key] = path
+            out_row.append(memo[key])
+        out.append(out_row)
+    return out, sorted(missing)
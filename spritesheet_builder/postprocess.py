@@ -0,0 +1,113 @@
+from __future__ import annotations
+from typing import List, Tuple
+from PIL import Image, ImageChops
+from .project_model import GridConfig, ExportOptions
+from .compose import cell_box
+
+# Engine-ready texture stages run on the composed sheet at export time. All
+# work is done with whole-buffer Pillow ops (strips stretched per grid row
+# and column, channel multiplies, box reductions), never per pixel.
+
+def wants_postprocess(options: ExportOptions) -> bool:
+    return bool(options.premultiplied_alpha or options.extrude > 0 or options.mip_levels > 0)
+
+
+def effective_extrude(grid: GridConfig, extrude: int) -> int:
+    """Extrusion that fits between tiles: at most half the padding, so
+    neighbours never overwrite each other. At the sheet border it is
+    clipped to the margin by extrude_edges."""
+    if extrude <= 0:
+        return 0
+    if grid.cols > 1 or grid.rows > 1:
+        return min(extrude, grid.padding // 2)
+    return extrude
+
+
+def extrude_warning(grid: GridConfig, extrude: int) -> str:
+    """Why the requested extrusion is not fully applied ("" when it is)."""
+    n = effective_extrude(grid, extrude)
+    if n >= extrude:
+        return ""
+    return (f"Edge extrusion reduced from {extrude} px to {n} px: it is limited to half the "
+            f"padding ({grid.padding} px). Set Padding to at least {2 * extrude} px to keep it.")
+
+
+def _stretch(sheet: Image.Image, out: Image.Image, src: Tuple[int, int, int, int], size: Tuple[int, int], dest: Tuple[int, int]):
+    # one-pixel strip stretched to `size`, clipped to the sheet
+    px, py = dest
+    W, H = out.size
+    cx0, cy0 = max(0, -px), max(0, -py)
+    cx1, cy1 = min(size[0], W - px), min(size[1], H - py)
+    if cx0 >= cx1 or cy0 >= cy1 or size[0] <= 0 or size[1] <= 0:
+        return
+    patch = sheet.crop(src).resize(size, Image.Resampling.NEAREST)
+    out.paste(patch.crop((cx0, cy0, cx1, cy1)), (px + cx0, py + cy0))
+
+
+def extrude_edges(sheet: Image.Image, grid: GridConfig, n: int) -> Image.Image:
+    """Repeat every tile's outermost rows/columns n pixels outwards.
+
+    Tiles sit on a regular grid, so each grid row's top/bottom edges are
+    stretched in one strip, then each grid column's left/right edges over
+    the already extruded height, which fills the corners too. Empty cells
+    and gaps are transparent, so extruding them is a no-op.
+    """
+    if n <= 0 or grid.rows <= 0 or grid.cols <= 0:
+        return sheet
+    out = sheet.copy()
+    x0, y0, tw, th = cell_box(grid, 0, 0)
+    xl, yl, _w, _h = cell_box(grid, grid.rows - 1, grid.cols - 1)
+    x1, y1 = xl + tw, yl + th
+    for r in range(grid.rows):
+        _x, y, _w, _h = cell_box(grid, r, 0)
+        _stretch(sheet, out, (x0, y, x1, y + 1), (x1 - x0, n), (x0, y - n))
+        _stretch(sheet, out, (x0, y + th - 1, x1, y + th), (x1 - x0, n), (x0, y + th))
+    src = out.copy()
+    ya, yb = max(0, y0 - n), min(out.height, y1 + n)
+    for c in range(grid.cols):
+        x, _y, _w, _h = cell_box(grid, 0, c)
+        _stretch(src, out, (x, ya, x + 1, yb), (n, yb - ya), (x - n, ya))
+        _stretch(src, out, (x + tw - 1, ya, x + tw, yb), (n, yb - ya), (x + tw, ya))
+    return out
+
+
+def premultiply(im: Image.Image) -> Image.Image:
+    """RGB channels multiplied by alpha (stored in an RGBA PNG)."""
+    r, g, b, a = im.convert("RGBA").split()
+    return Image.merge("RGBA", (ImageChops.multiply(r, a), ImageChops.multiply(g, a), ImageChops.multiply(b, a), a))
+
+
+def mip_chain(im: Image.Image, levels: int) -> List[Image.Image]:
+    """Up to `levels` successive half-size box-filtered levels (level 1..n).
+
+    Each level is reduced from the previous one with alpha-weighted
+    averaging, so transparent pixels do not darken edges.
+    """
+    out: List[Image.Image] = []
+    cur = im
+    for _ in range(levels):
+        if cur.width == 1 and cur.height == 1:
+            break
+        cur = cur.resize((max(1, cur.width // 2), max(1, cur.height // 2)), Image.Resampling.BOX)
+        out.append(cur)
+    return out
+
+
+def process_sheet(grid: GridConfig, options: ExportOptions, sheet: Image.Image) -> Tuple[Image.Image, List[Image.Image], dict]:
+    """Apply extrusion, premultiplication and mip generation.
+
+    Returns (sheet, mip levels, description for meta.json's "texture").
+    Mips are reduced from the straight-alpha sheet, then premultiplied.
+    """
+    n = effective_extrude(grid, options.extrude)
+    sheet = extrude_edges(sheet.convert("RGBA"), grid, n)
+    mips = mip_chain(sheet, options.mip_levels) if options.mip_levels > 0 else []
+    if options.premultiplied_alpha:
+        sheet = premultiply(sheet)
+        mips = [premultiply(m) for m in mips]
+    info = {
+        "premultiplied_alpha": bool(options.premultiplied_alpha),
+        "extrude": n,
+        "mips": [],
+    }
+    return sheet, mips, info
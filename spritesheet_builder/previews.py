@@ -0,0 +1,66 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import re
+from PIL import Image
+
+# ExportOptions.previews value -> (file extension, Pillow format)
+PREVIEW_FORMATS = {
+    "gif": (".gif", "GIF"),
+    "apng": (".png", "PNG"),
+    "webp": (".webp", "WEBP"),
+}
+
+
+def _sequence(frames: list, loop_mode: str) -> list:
+    # pingpong plays 0..n-1..1, then repeats
+    if loop_mode == "pingpong" and len(frames) > 2:
+        return frames + frames[-2:0:-1]
+    return frames
+
+
+def _encode(path: Path, fmt: str, frames: list, fps: int) -> int:
+    duration = max(1, round(1000 / max(1, fps)))
+    first, rest = frames[0], frames[1:]
+    kwargs = dict(save_all=True, append_images=rest, duration=duration, loop=0)
+    if fmt == "GIF":
+        kwargs["disposal"] = 2  # clear to transparent between frames
+    elif fmt == "PNG":
+        kwargs["disposal"] = 1
+    elif fmt == "WEBP":
+        kwargs["lossless"] = True
+    first.save(path, fmt, **kwargs)
+    return path.stat().st_size
+
+
+def write_row_previews(
+    sheet: Image.Image,
+    frames: list[list[tuple]],
+    rows_meta: list[dict],
+    out_dir: Path,
+    fmt: str = "gif",
+) -> list[tuple[str, Path, int]]:
+    """Render each row as an animated image cut from the composed sheet.
+
+    Frames are copied out of `sheet` (the atlas the bundle is built from), so
+    sources are not decoded again. Rows are encoded in parallel. Returns
+    (row name, file, size in bytes) for every row that has frames.
+    """
+    ext, pil_format = PREVIEW_FORMATS[fmt]
+    out_dir.mkdir(parents=True, exist_ok=True)
+    jobs = []
+    used: set[str] = set()
+    for r, row in enumerate(rows_meta):
+        rects = frames[r] if r < len(frames) else []
+        if not rects:
+            continue
+        stem = re.sub(r"[^\w.-]+", "_", row.get("name") or f"row_{r}").strip("._") or f"row_{r}"
+        if stem in used:
+            stem = f"{stem}_{r}"
+        used.add(stem)
+        images = [sheet.crop((x, y, x + w, y + h)) for x, y, w, h in rects]
+        jobs.append((row.get("name") or f"row_{r}", out_dir / (stem + ext), _sequence(images, row.get("loop_mode", "pingpong")), int(row.get("fps", 6))))
+    # Pillow's encoders release the GIL, so threads render rows side by side
+    with ThreadPoolExecutor() as pool:
+        sizes = list(pool.map(lambda j: _encode(j[1], pil_format, j[2], j[3]), jobs))
+    return [(name, path, size) for (name, path, _f, _fps), size in zip(jobs, sizes)]
@@ -3,6 +3,8 @@ from dataclasses import dataclass, field
 from typing import List, Dict, Tuple
 import os
 import json
+from .folder_index import FolderIndex
+from .frame_sources import is_container, source_basename
 
 
 @dataclass
@@ -18,6 +20,8 @@ class GridConfig:
     offset_x: int = 0  # top-left X of the crop box applied to all frames
     offset_y: int = 0  # top-left Y of the crop box applied to all frames
     source_scale: int = 100  # percentage scaling for source images before cropping (e.g., 100 = 1.0x)
+    color_key: str = ""  # "#rrggbb" background made transparent before scaling; "" = off
+    key_tolerance: int = 0  # max per-channel difference (0..255) still counted as the key
 
 
 @dataclass
@@ -28,20 +32,37 @@ class RowMeta:
     sounds: List[dict] = field(default_factory=list)  # [{name,file,trigger_frame,repeat_ms,volume}]
 
 
+@dataclass
+class ExportOptions:
+    binary_meta: bool = False  # also write meta.bin (packed frames + string table) next to meta.json
+    previews: str = ""  # "" (off), "gif", "apng" or "webp": animated preview per row
+    premultiplied_alpha: bool = False  # write RGB multiplied by alpha
+    extrude: int = 0  # px of repeated tile edge pixels, capped at padding // 2
+    mip_levels: int = 0  # precomputed half-size levels written next to the sheet
+    sound_bank: bool = False  # pack WAV sounds into sounds/soundbank.pcm (offset table in meta.json)
+
+
 @dataclass
 class ProjectModel:
     sheet_name: str
-    source_folder: str  # path to img/raw/sheets/<sheet_name>/
+    source_folder: str  # path to img/raw/sheets/<sheet_name>/, or a ZIP / strip / animated image
     grid: GridConfig = field(default_factory=GridConfig)
     rows_meta: Dict[int, RowMeta] = field(default_factory=dict)
     # 16 engine triggers mapped to sounds: index 0..15
     # each: {"file": str, "volume": float}
     trigger_sounds: List[dict] = field(default_factory=lambda: [{"file": "", "volume": 1.0} for _ in range(16)])
+    export: ExportOptions = field(default_factory=ExportOptions)
+    # cell size used to slice a strip/atlas source; (0, 0) = square frames
+    source_frame_size: Tuple[int, int] = (0, 0)
+    # max dHash bit distance at which two sources count as the same frame; -1 = off
+    duplicate_threshold: int = -1
+    # cached listing of source_folder (not serialized)
+    _source_index: FolderIndex | None = field(default=None, init=False, repr=False, compare=False)
 
     def validate(self) -> Tuple[bool, str]:
         if not self.sheet_name:
             return False, "Sheet name is required"
-        if not os.path.isdir(self.source_folder):
+        if not os.path.isdir(self.source_folder) and not is_container(self.source_folder):
             return False, f"Source folder not found: {self.source_folder}"
         if self.grid.cols <= 0 or self.grid.rows <= 0:
             return False, "Grid dimensions must be positive"
@@ -49,21 +70,25 @@ class ProjectModel:
             return False, "Tile size must be positive"
         return True, ""
 
+    def source_index(self) -> FolderIndex:
+        """Cached index of source_folder; rebuilt if the folder changes."""
+        frame_size = tuple(self.source_frame_size)
+        if (
+            self._source_index is None
+            or self._source_index.folder != self.source_folder
+            or self._source_index.frame_size != frame_size
+        ):
+            self._source_index = FolderIndex(self.source_folder, frame_size=frame_size)
+        return self._source_index
+
     def list_source_images(self) -> List[str]:
-        """Return sorted list of PNG files (00001.png, ...)."""
-        files = []
-        try:
-            for name in os.listdir(self.source_folder):
-                if name.lower().endswith(".png"):
-                    files.append(os.path.join(self.source_folder, name))
-        except FileNotFoundError:
-            return []
-        # sort numerically if names like 00001.png
-        try:
-            files.sort(key=lambda p: int(os.path.splitext(os.path.basename(p))[0]))
-        except ValueError:
-            files.sort()
-        return files
+        """Return naturally sorted list of PNG files (00001.png, ...), or the
+        virtual frame paths when the source is a container file.
+
+        The folder is scanned once and cached; use `source_index().rescan()`
+        (or a FolderWatcher) to pick up changes on disk.
+        """
+        return list(self.source_index().files())
 
     # --- Serialization helpers ---
     def to_dict(self) -> dict:
@@ -82,6 +107,8 @@ class ProjectModel:
                 "offset_x": self.grid.offset_x,
                 "offset_y": self.grid.offset_y,
                 "source_scale": getattr(self.grid, "source_scale", 100),
+                "color_key": self.grid.color_key,
+                "key_tolerance": self.grid.key_tolerance,
             },
             "rows_meta": {
                 str(idx): {
@@ -93,6 +120,16 @@ class ProjectModel:
                 for idx, m in self.rows_meta.items()
             },
             "trigger_sounds": self.trigger_sounds,
+            "source_frame_size": list(self.source_frame_size),
+            "duplicate_threshold": self.duplicate_threshold,
+            "export": {
+                "binary_meta": self.export.binary_meta,
+                "previews": self.export.previews,
+                "premultiplied_alpha": self.export.premultiplied_alpha,
+                "extrude": self.export.extrude,
+                "mip_levels": self.export.mip_levels,
+                "sound_bank": self.export.sound_bank,
+            },
         }
 
     @staticmethod
@@ -110,7 +147,10 @@ class ProjectModel:
             offset_x=grid_d.get("offset_x", 0),
             offset_y=grid_d.get("offset_y", 0),
             source_scale=grid_d.get("source_scale", 100),
+            color_key=str(grid_d.get("color_key", "") or ""),
+            key_tolerance=int(grid_d.get("key_tolerance", 0)),
         )
+        export_d = d.get("export", {})
         rows_meta_d = d.get("rows_meta", {})
         rows_meta: Dict[int, RowMeta] = {}
         for k, v in rows_meta_d.items():
@@ -132,23 +172,46 @@ class ProjectModel:
             trigger_sounds=[
                 {"file": str(ts.get("file", "")), "volume": float(ts.get("volume", 1.0))}
                 for ts in (d.get("trigger_sounds") or [{"file": "", "volume": 1.0} for _ in range(16)])
-            ][:16] + ([{"file": "", "volume": 1.0}] * max(0, 16 - len(d.get("trigger_sounds", []))))
+            ][:16] + ([{"file": "", "volume": 1.0}] * max(0, 16 - len(d.get("trigger_sounds", [])))),
+            source_frame_size=tuple(int(v) for v in d.get("source_frame_size", (0, 0))[:2]),
+            duplicate_threshold=int(d.get("duplicate_threshold", -1)),
+            export=ExportOptions(
+                binary_meta=bool(export_d.get("binary_meta", False)),
+                previews=str(export_d.get("previews", "") or ""),
+                premultiplied_alpha=bool(export_d.get("premultiplied_alpha", False)),
+                extrude=int(export_d.get("extrude", 0)),
+                mip_levels=int(export_d.get("mip_levels", 0)),
+                sound_bank=bool(export_d.get("sound_bank", False)),
+            ),
         )
 
+    def set_meta_value(self, scope: str, index: int | None, key: str, value):
+        """Set one metadata field addressed as (scope, index, key).
+
+        scope "row": key is a RowMeta attribute or "sound.<field>" of the first sound
+        scope "trigger": key is "file" or "volume" of trigger_sounds[index]
+        scope "grid": key "crop" takes (offset_x, offset_y, source_scale[, color_key, key_tolerance])
+        scope "project": key is a ProjectModel attribute (e.g. duplicate_threshold)
+        """
+        if scope == "grid" and key == "crop":
+            self.grid.offset_x, self.grid.offset_y, self.grid.source_scale = (int(v) for v in value[:3])
+            if len(value) > 3:
+                self.grid.color_key, self.grid.key_tolerance = str(value[3] or ""), int(value[4])
+        elif scope == "project":
+            setattr(self, key, value)
+        elif scope == "trigger":
+            self.trigger_sounds[index][key] = value
+        elif scope == "row":
+            meta = self.rows_meta.setdefault(index, RowMeta())
+            if key.startswith("sound."):
+                if not meta.sounds:
+                    meta.sounds.append({"name": "", "file": "", "trigger_frame": 0, "repeat_ms": 0, "volume": 1.0})
+                meta.sounds[0][key[len("sound."):]] = value
+            else:
+                setattr(meta, key, value)
+
     def save_json(self, path: str, cells: List[List[str | None]] | None = None):
-        data = self.to_dict()
-        if cells is not None:
-            data["cells"] = cells
-            # Also store basenames for portability across folders
-            cells_basenames: List[List[str | None]] = []
-            for row in cells:
-                cells_basenames.append([
-                    os.path.basename(p) if isinstance(p, str) else None
-                    for p in row
-                ])
-            data["cells_basenames"] = cells_basenames
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        write_project_json(path, self.to_dict(), cells)
 
     @staticmethod
     def load_json(path: str) -> Tuple["ProjectModel", List[List[str | None]] | None, List[List[str | None]] | None]:
@@ -158,6 +221,83 @@ class ProjectModel:
         except FileNotFoundError:
             raise
         proj = ProjectModel.from_dict(data)
+        if "cells_rle" in data:
+            rows, cols = data.get("cells_shape", [0, 0])
+            paths = data.get("paths", [])
+            cells = decode_cells(paths, data["cells_rle"], rows, cols)
+            bases = [source_basename(p) for p in paths]
+            cells_basenames = decode_cells(bases, data["cells_rle"], rows, cols)
+            return proj, cells, cells_basenames
+        # legacy format: absolute paths + basenames per cell
         cells = data.get("cells")
         cells_basenames = data.get("cells_basenames")
         return proj, cells, cells_basenames
+
+
+# Version written by save_json when cells are included
+PROJECT_FORMAT = 2
+
+
+def write_project_json(path: str, data: dict, cells: List[List[str | None]] | None = None):
+    """Write a project dict (from to_dict) and optional cells atomically.
+
+    Safe to call off the GUI thread with a snapshot of the data. The file is
+    written to a temporary sibling and moved into place, so a crash never
+    leaves a half-written project.
+    """
+    data = dict(data)
+    if cells is not None:
+        # Compact encoding: unique path table + run-length index matrix.
+        # Basenames are derived from the table on load for portability.
+        paths, runs = encode_cells(cells)
+        data["format"] = PROJECT_FORMAT
+        data["cells_shape"] = [len(cells), max((len(r) for r in cells), default=0)]
+        data["paths"] = paths
+        data["cells_rle"] = runs
+        text = json.dumps(data, separators=(",", ":"))
+    else:
+        text = json.dumps(data, indent=2)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def encode_cells(cells: List[List[str | None]]) -> Tuple[List[str], List[int]]:
+    """Encode a cell matrix as (unique paths, runs).
+
+    Runs are row-major: a value >= 0 indexes the path table, a negative
+    value -n stands for n consecutive empty cells.
+    """
+    table: Dict[str, int] = {}
+    paths: List[str] = []
+    runs: List[int] = []
+    width = max((len(r) for r in cells), default=0)
+    for row in cells:
+        for c in range(width):
+            p = row[c] if c < len(row) else None
+            if isinstance(p, str) and p:
+                idx = table.get(p)
+                if idx is None:
+                    idx = table[p] = len(paths)
+                    paths.append(p)
+                runs.append(idx)
+            elif runs and runs[-1] < 0:
+                runs[-1] -= 1
+            else:
+                runs.append(-1)
+    return paths, runs
+
+
+def decode_cells(paths: List[str], runs: List[int], rows: int, cols: int) -> List[List[str | None]]:
+    flat: List[str | None] = []
+    for v in runs:
+        if v < 0:
+            flat.extend([None] * -v)
+        else:
+            flat.append(paths[v] if v < len(paths) else None)
+    total = rows * cols
+    flat = (flat + [None] * max(0, total - len(flat)))[:total]
+    return [flat[r * cols:(r + 1) * cols] for r in range(rows)]
@@ -1,6 +1,8 @@
 from PySide6 import QtWidgets, QtCore, QtGui
 import os
-from .image_utils import make_icon_pixmap
+from .image_utils import make_icon_pixmap, load_source_image
+from .frame_sources import source_basename
+from .folder_index import FolderIndex
 
 
 class RawSpritesPanel(QtWidgets.QListWidget):
@@ -28,26 +30,38 @@ class RawSpritesPanel(QtWidgets.QListWidget):
         self._pressed_item: QtWidgets.QListWidgetItem | None = None
         self.itemSelectionChanged.connect(self._on_selection_changed)
 
-    def load_folder(self, folder: str, grid=None):
+    def load_folder(self, folder: str, grid=None, files: list[str] | None = None):
+        """Show the PNGs of a folder. Pass `files` (sorted full paths) to reuse
+        an existing listing instead of scanning the folder again."""
         self.clear()
         self._folder = folder
         self._grid = grid
-        if not folder or not os.path.isdir(folder):
-            return
-        files = [f for f in os.listdir(folder) if f.lower().endswith('.png')]
-        # numeric sort when possible
-        try:
-            files.sort(key=lambda n: int(os.path.splitext(n)[0]))
-        except ValueError:
-            files.sort()
-        for name in files:
-            path = os.path.join(folder, name)
-            item = QtWidgets.QListWidgetItem(name)
-            pm = make_icon_pixmap(path, self.iconSize(), self._grid) if self._grid else QtGui.QPixmap(path).scaled(self.iconSize(), QtCore.Qt.AspectRatioMode.KeepAspectRatio, QtCore.Qt.TransformationMode.SmoothTransformation)
-            if not pm.isNull():
-                item.setIcon(QtGui.QIcon(pm))
-            item.setData(QtCore.Qt.ItemDataRole.UserRole, path)
-            self.addItem(item)
+        if files is None:
+            files = FolderIndex(folder).files() if folder else []
+        for path in files:
+            self.addItem(self._make_item(path))
+
+    def _make_item(self, path: str) -> QtWidgets.QListWidgetItem:
+        item = QtWidgets.QListWidgetItem(source_basename(path))
+        pm = make_icon_pixmap(path, self.iconSize(), self._grid) if self._grid else QtGui.QPixmap.fromImage(load_source_image(path)).scaled(self.iconSize(), QtCore.Qt.AspectRatioMode.KeepAspectRatio, QtCore.Qt.TransformationMode.SmoothTransformation)
+        if not pm.isNull():
+            item.setIcon(QtGui.QIcon(pm))
+        item.setData(QtCore.Qt.ItemDataRole.UserRole, path)
+        return item
+
+    def apply_changes(self, added: list[str], removed: list[str], files: list[str]):
+        """Incrementally add/remove items. `files` is the full sorted listing
+        after the change, used to place new items in order."""
+        if removed:
+            gone = set(removed)
+            for i in range(self.count() - 1, -1, -1):
+                if self.item(i).data(QtCore.Qt.ItemDataRole.UserRole) in gone:
+                    self.takeItem(i)
+        if added:
+            position = {p: i for i, p in enumerate(files)}
+            # ascending order keeps every earlier neighbour already in place
+            for path in sorted(added, key=lambda p: position.get(p, len(files))):
+                self.insertItem(position.get(path, self.count()), self._make_item(path))
 
     # Provide file URL(s) for the selected item so drops work without custom drag code
     def mimeData(self, items: list[QtWidgets.QListWidgetItem]) -> QtCore.QMimeData:
@@ -63,6 +77,7 @@ class RawSpritesPanel(QtWidgets.QListWidget):
                 urls.append(QtCore.QUrl.fromLocalFile(path))
         if urls:
             mime.setUrls(urls)
+            mime.setText(urls[0].toLocalFile())
         return mime
 
     def setIconSize(self, size: QtCore.QSize) -> None:
@@ -102,6 +117,21 @@ class RawSpritesPanel(QtWidgets.QListWidget):
                 self.scrollToItem(it, QtWidgets.QAbstractItemView.ScrollHint.PositionAtCenter)
                 break
 
+    def refresh_paths(self, paths):
+        """Rebuild the icons of sources whose files changed on disk."""
+        paths = set(paths)
+        for i in range(self.count()):
+            it = self.item(i)
+            path = it.data(QtCore.Qt.ItemDataRole.UserRole)
+            if path in paths:
+                it.setIcon(self._make_item(path).icon())
+
+    def diagnostics(self) -> dict:
+        # icons are built eagerly for every listed file and kept by the items
+        icons = sum(1 for i in range(self.count()) if not self.item(i).icon().isNull())
+        size = self.iconSize()
+        return {"items": self.count(), "icons": icons, "icon_bytes_max": icons * size.width() * size.height() * 4}
+
     def set_grid_config(self, grid):
         """Update grid config reference and refresh icons to apply cropping."""
         self._grid = grid
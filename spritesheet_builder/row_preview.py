@@ -8,6 +8,9 @@ class RowPreview(QtWidgets.QWidget):
         super().__init__(parent)
         self.project: ProjectModel | None = None
         self.paths: list[str] = []
+        # When an atlas is attached, frames are blitted from it instead of decoding paths
+        self.atlas = None
+        self.rects: list[QtCore.QRect] = []
         self.index: int = 0
         self.fps: int = 6
         self.loop_mode: str = "pingpong"  # or "loop"
@@ -45,8 +48,21 @@ class RowPreview(QtWidgets.QWidget):
         self.set_fps(fps)
         self.set_loop_mode(loop_mode)
 
+    def set_atlas(self, atlas):
+        self.atlas = atlas
+
+    def set_rects(self, rects: list[QtCore.QRect]):
+        """Preview frames as sub-rects of the attached atlas."""
+        self.rects = list(rects)
+        self.paths = []
+        self.index = 0
+        self._direction = 1
+        self._render()
+        self._update_timer()
+
     def set_paths(self, paths: list[str]):
         self.paths = [p for p in paths if p]
+        self.rects = []
         self.index = 0
         self._direction = 1
         self._render()
@@ -56,16 +72,19 @@ class RowPreview(QtWidgets.QWidget):
         self.fps = max(1, min(60, int(fps)))
         self._update_timer()
 
+    def _frame_count(self) -> int:
+        return len(self.rects) if self.rects else len(self.paths)
+
     def _update_timer(self):
-        if self.paths and self.fps > 0:
+        if self._frame_count() and self.fps > 0:
             self.timer.start(int(1000 / self.fps))
         else:
             self.timer.stop()
 
     def _advance(self):
-        if not self.paths:
+        n = self._frame_count()
+        if not n:
             return
-        n = len(self.paths)
         if n == 1:
             self._render()
             return
@@ -101,19 +120,34 @@ class RowPreview(QtWidgets.QWidget):
         self.timer.stop()
 
     def _render(self):
-        if not self.project or not self.paths:
+        n = self._frame_count()
+        if not self.project or not n:
             self.view.clear()
             return
+        self.index = min(self.index, n - 1)
         size = self.view.size()
         # Add some padding in preview
         target = QtCore.QSize(max(64, size.width() - 8), max(64, size.height() - 8))
-        frame_path = self.paths[self.index]
-        pm = make_icon_pixmap(frame_path, target, self.project.grid)
+        if self.rects and self.atlas is not None:
+            tile = self.atlas.image().copy(self.rects[self.index])
+            pm = QtGui.QPixmap.fromImage(tile).scaled(target, QtCore.Qt.AspectRatioMode.KeepAspectRatio, QtCore.Qt.TransformationMode.SmoothTransformation)
+        else:
+            frame_path = self.paths[self.index]
+            pm = make_icon_pixmap(frame_path, target, self.project.grid)
         if not pm.isNull():
             self.view.setPixmap(pm)
         else:
             self.view.clear()
 
+    def diagnostics(self) -> dict:
+        pm = self.view.pixmap()
+        return {
+            "frames": self._frame_count(),
+            "source": "atlas" if self.rects else ("files" if self.paths else "none"),
+            "pixmap_bytes": pm.width() * pm.height() * 4 if pm is not None and not pm.isNull() else 0,
+            "playing": self.timer.isActive(),
+        }
+
     def resizeEvent(self, event: QtGui.QResizeEvent) -> None:
         super().resizeEvent(event)
         self._render()
@@ -0,0 +1,240 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+import hashlib
+import json
+import os
+from PIL import Image
+from .project_model import GridConfig
+from .compose import prepare_tile_image
+from .cli import load_project
+from .journal import journal_path
+from .dedupe import duplicate_map
+from .frame_sources import identity
+from .bundle import rows_meta, trigger_sounds_meta, python_helper_code
+
+# Combined metadata written next to the pages; also holds the packing state
+ATLAS_FILE = "atlas.json"
+ATLAS_FORMAT = 2  # 2: frame keys hash RGBA bytes
+
+
+def _next_pow2(n: int) -> int:
+    p = 1
+    while p < n:
+        p <<= 1
+    return p
+
+
+def _cell_tile(path: str, grid: GridConfig) -> Image.Image | None:
+    """Tile-sized frame with the prepared source centered, as in the sheet.
+    Pillow only, so it can run on worker threads."""
+    tile = prepare_tile_image(path, grid)
+    if tile is None:
+        return None
+    img = Image.new("RGBA", (grid.tile_width, grid.tile_height), (0, 0, 0, 0))
+    img.paste(tile, ((img.width - tile.width) // 2, (img.height - tile.height) // 2))
+    return img
+
+
+def _frame_key(img: Image.Image) -> str:
+    h = hashlib.blake2b(digest_size=8)
+    h.update(f"{img.width}x{img.height}".encode())
+    h.update(img.tobytes())
+    return h.hexdigest()
+
+
+def _project_fingerprint(project_path: str, cells: List[List[str | None]]) -> str:
+    """Changes when the project file, its journal or any referenced source changes."""
+    h = hashlib.blake2b(digest_size=12)
+    for p in (project_path, journal_path(project_path)):
+        try:
+            with open(p, "rb") as f:
+                h.update(f.read())
+        except OSError:
+            h.update(b"-")
+    for p in sorted({p for row in cells for p in row if p}):
+        ident = identity(p)
+        h.update(f"{ident or (p, 'missing')}\n".encode())
+    return h.hexdigest()
+
+
+class _Page:
+    """Shelf packer for one atlas page. Freed slots are reused by frames of
+    the same size, so removing and adding a project's frames leaves every
+    other frame where it was."""
+
+    def __init__(self, width: int, height: int, shelves=None, holes=None):
+        self.width = width
+        self.height = height
+        self.shelves: List[List[int]] = shelves or []  # [y, height, next_x]
+        self.holes: List[List[int]] = holes or []  # [x, y, w, h]
+
+    def place(self, w: int, h: int, spacing: int) -> Tuple[int, int] | None:
+        for i, (x, y, hw, hh) in enumerate(self.holes):
+            if (hw, hh) == (w, h):
+                del self.holes[i]
+                return x, y
+        for shelf in self.shelves:
+            y, sh, nx = shelf
+            if h <= sh and nx + w <= self.width:
+                shelf[2] = nx + w + spacing
+                return nx, y
+        y = self.shelves[-1][0] + self.shelves[-1][1] + spacing if self.shelves else 0
+        if y + h <= self.height and w <= self.width:
+            self.shelves.append([y, h, w + spacing])
+            return 0, y
+        return None
+
+    def to_dict(self, image: str) -> dict:
+        return {"image": image, "width": self.width, "height": self.height, "shelves": self.shelves, "holes": self.holes}
+
+
+def export_shared_atlas(
+    project_paths: List[str],
+    dest_dir: str,
+    page_size: int = 2048,
+    spacing: int = 2,
+) -> dict:
+    """Pack the frames of several saved projects into shared atlas pages.
+
+    Writes page<N>.png, atlas.json and python_helper.py into dest_dir.
+    atlas.json holds a deduplicated frame table (content hash -> page, x, y,
+    w, h) and one namespace per project (sheet name) whose rows list frame
+    hashes. Re-running on the same folder is incremental: projects whose
+    file, journal and sources are unchanged are not decoded again, frames
+    already packed keep their slot, and only pages that gained or lost
+    frames are rewritten. Projects left out of `project_paths` are dropped.
+
+    Returns a summary dict for display.
+    """
+    dest = Path(dest_dir)
+    dest.mkdir(parents=True, exist_ok=True)
+    try:
+        state = json.loads((dest / ATLAS_FILE).read_text(encoding="utf-8"))
+        if state.get("format") != ATLAS_FORMAT or state.get("spacing") != spacing:
+            state = {}
+    except (OSError, ValueError):
+        state = {}
+    old_frames: Dict[str, list] = state.get("frames", {})
+    old_projects: Dict[str, dict] = state.get("projects", {})
+    pages = [_Page(p["width"], p["height"], p.get("shelves"), p.get("holes")) for p in state.get("pages", [])]
+
+    projects: Dict[str, dict] = {}
+    new_images: Dict[str, Image.Image] = {}
+    reused = 0
+    with ThreadPoolExecutor() as pool:
+        for project_path in project_paths:
+            project, cells, _missing = load_project(project_path)
+            name = project.sheet_name or Path(project_path).stem
+            if name in projects:
+                raise ValueError(f"Two projects share the sheet name '{name}'")
+            fingerprint = _project_fingerprint(project_path, cells)
+            prev = old_projects.get(name)
+            if prev and prev.get("fingerprint") == fingerprint and all(
+                k in old_frames for row in prev["rows"] for k in row["frames"]
+            ):
+                projects[name] = prev
+                reused += 1
+                continue
+            sounds_dir = dest / "sounds" / name
+            sounds_dir.mkdir(parents=True, exist_ok=True)
+            rows = rows_meta(project, sounds_dir, f"sounds/{name}")
+            g = project.grid
+            # decode/prepare every distinct source once, in parallel
+            used_paths = [p for row in cells[:g.rows] for p in row[:g.cols] if p]
+            # near-duplicates share their representative's frame
+            dup = duplicate_map(used_paths, project.duplicate_threshold, g)
+            unique = sorted(set(used_paths) - set(dup))
+            keys: Dict[str, str | None] = {}
+            for path, tile in zip(unique, pool.map(lambda p: _cell_tile(p, g), unique)):
+                if tile is None:
+                    keys[path] = None
+                    continue
+                key = _frame_key(tile)
+                keys[path] = key
+                if key not in old_frames:
+                    new_images.setdefault(key, tile)
+            for path, rep in dup.items():
+                keys[path] = keys.get(rep)
+            for r, row in enumerate(rows):
+                src_row = cells[r] if r < len(cells) else []
+                row["frames"] = [keys[p] for p in src_row[:g.cols] if p and keys.get(p)]
+            projects[name] = {
+                "source": os.path.abspath(project_path),
+                "fingerprint": fingerprint,
+                "rows": rows,
+                "trigger_sounds": trigger_sounds_meta(project, sounds_dir, f"sounds/{name}"),
+            }
+
+    # free slots of frames no project references any more
+    used = {k for p in projects.values() for row in p["rows"] for k in row["frames"]}
+    dirty: Dict[int, List[list]] = {}  # page -> rects to clear
+    frames: Dict[str, list] = {}
+    for key, (page, x, y, w, h) in old_frames.items():
+        if key in used:
+            frames[key] = [page, x, y, w, h]
+        else:
+            pages[page].holes.append([x, y, w, h])
+            dirty.setdefault(page, []).append([x, y, w, h])
+
+    # pack new frames, tallest first for tighter shelves
+    placed: Dict[int, List[Tuple[str, int, int]]] = {}
+    for key in sorted((k for k in new_images if k in used), key=lambda k: (-new_images[k].height, k)):
+        w, h = new_images[key].size
+        for i, page in enumerate(pages):
+            pos = page.place(w, h, spacing)
+            if pos is not None:
+                break
+        else:
+            pages.append(_Page(max(page_size, _next_pow2(w)), max(page_size, _next_pow2(h))))
+            i = len(pages) - 1
+            pos = pages[i].place(w, h, spacing)
+        frames[key] = [i, pos[0], pos[1], w, h]
+        placed.setdefault(i, []).append((key, pos[0], pos[1]))
+        dirty.setdefault(i, [])
+
+    # repaint only pages that changed
+    old_pages = len(state.get("pages", []))
+    for i in sorted(dirty):
+        page = pages[i]
+        page_path = dest / f"page{i}.png"
+        img = None
+        if i < old_pages:
+            try:
+                with Image.open(page_path) as im:
+                    img = im.convert("RGBA")
+            except OSError:
+                img = None
+        if img is None or img.size != (page.width, page.height):
+            if any(f[0] == i and k not in new_images for k, f in frames.items()):
+                raise FileNotFoundError(f"{page_path} is missing or was modified; delete {ATLAS_FILE} to repack from scratch")
+            img = Image.new("RGBA", (page.width, page.height), (0, 0, 0, 0))
+        for x, y, w, h in dirty[i]:
+            img.paste((0, 0, 0, 0), (x, y, x + w, y + h))
+        for key, x, y in placed.get(i, []):
+            img.paste(new_images[key], (x, y))
+        img.save(page_path)
+
+    data = {
+        "format": ATLAS_FORMAT,
+        "spacing": spacing,
+        "pages": [p.to_dict(f"page{i}.png") for i, p in enumerate(pages)],
+        "frames": frames,
+        "projects": projects,
+    }
+    tmp = dest / (ATLAS_FILE + ".tmp")
+    tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, dest / ATLAS_FILE)
+    (dest / "python_helper.py").write_text(python_helper_code(), encoding="utf-8")
+
+    refs = sum(len(row["frames"]) for p in projects.values() for row in p["rows"])
+    return {
+        "projects": len(projects),
+        "reused_projects": reused,
+        "pages": len(pages),
+        "pages_written": len(dirty),
+        "frames": len(frames),
+        "frame_refs": refs,
+        "new_frames": sum(len(v) for v in placed.values()),
+    }
@@ -0,0 +1,114 @@
+from PySide6 import QtWidgets, QtCore, QtGui
+from .atlas import LiveAtlas
+
+
+class SheetPreview(QtWidgets.QWidget):
+    """Zoomable view of the live atlas (the sheet as it will be exported)."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.atlas: LiveAtlas | None = None
+        self._dirty: QtCore.QRect | None = None
+        self._zoom = 1.0
+        # Coalesce bursts of cell patches into one repaint
+        self._flush_timer = QtCore.QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(30)
+        self._flush_timer.timeout.connect(self._flush)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        bar = QtWidgets.QHBoxLayout()
+        self.zoom_out_btn = QtWidgets.QPushButton("−")
+        self.zoom_in_btn = QtWidgets.QPushButton("+")
+        self.fit_btn = QtWidgets.QPushButton("Fit")
+        self.zoom_label = QtWidgets.QLabel("100%")
+        for b in (self.zoom_out_btn, self.zoom_in_btn):
+            b.setFixedWidth(28)
+        bar.addWidget(self.zoom_out_btn)
+        bar.addWidget(self.zoom_in_btn)
+        bar.addWidget(self.fit_btn)
+        bar.addWidget(self.zoom_label)
+        bar.addStretch(1)
+        layout.addLayout(bar)
+
+        self.view = QtWidgets.QGraphicsView()
+        self.view.setStyleSheet("background-color: #1e1e1e; border: 1px solid #333;")
+        self.view.setDragMode(QtWidgets.QGraphicsView.DragMode.ScrollHandDrag)
+        self.view.setTransformationAnchor(QtWidgets.QGraphicsView.ViewportAnchor.AnchorUnderMouse)
+        self.view.viewport().installEventFilter(self)
+        self.scene = QtWidgets.QGraphicsScene(self.view)
+        self.view.setScene(self.scene)
+        self._item = self.scene.addPixmap(QtGui.QPixmap())
+        # Nearest-neighbour when zoomed in so pixels stay crisp
+        self._item.setTransformationMode(QtCore.Qt.TransformationMode.FastTransformation)
+        layout.addWidget(self.view, 1)
+
+        self.zoom_in_btn.clicked.connect(lambda: self._zoom_by(1.25))
+        self.zoom_out_btn.clicked.connect(lambda: self._zoom_by(0.8))
+        self.fit_btn.clicked.connect(self.fit)
+
+    def set_atlas(self, atlas: LiveAtlas):
+        if self.atlas is not None:
+            try:
+                self.atlas.changed.disconnect(self._on_atlas_changed)
+                self.atlas.reset.disconnect(self._on_atlas_reset)
+            except Exception:
+                pass
+        self.atlas = atlas
+        atlas.changed.connect(self._on_atlas_changed)
+        atlas.reset.connect(self._on_atlas_reset)
+        self._on_atlas_reset()
+
+    def diagnostics(self) -> dict:
+        pm = self._item.pixmap()
+        return {"pixmap_bytes": pm.width() * pm.height() * 4, "zoom": round(self._zoom, 3)}
+
+    def _on_atlas_reset(self):
+        self._dirty = None
+        self._flush_timer.stop()
+        img = self.atlas.image() if self.atlas else QtGui.QImage()
+        self._item.setPixmap(QtGui.QPixmap.fromImage(img))
+        self.scene.setSceneRect(QtCore.QRectF(img.rect()))
+
+    def _on_atlas_changed(self, rect: QtCore.QRect):
+        self._dirty = rect if self._dirty is None else self._dirty.united(rect)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _flush(self):
+        if self._dirty is None or self.atlas is None:
+            return
+        rect, self._dirty = self._dirty, None
+        # Patch only the dirty region of the displayed pixmap
+        pm = self._item.pixmap()
+        if pm.size() != self.atlas.image().size():
+            self._on_atlas_reset()
+            return
+        painter = QtGui.QPainter(pm)
+        painter.setCompositionMode(QtGui.QPainter.CompositionMode.CompositionMode_Source)
+        painter.drawImage(rect.topLeft(), self.atlas.image(), rect)
+        painter.end()
+        self._item.setPixmap(pm)
+
+    def _zoom_by(self, factor: float):
+        new_zoom = max(0.05, min(16.0, self._zoom * factor))
+        factor = new_zoom / self._zoom
+        self._zoom = new_zoom
+        self.view.scale(factor, factor)
+        self.zoom_label.setText(f"{int(round(self._zoom * 100))}%")
+
+    def fit(self):
+        rect = self.scene.sceneRect()
+        if rect.isEmpty():
+            return
+        self.view.fitInView(rect, QtCore.Qt.AspectRatioMode.KeepAspectRatio)
+        self._zoom = self.view.transform().m11()
+        self.zoom_label.setText(f"{int(round(self._zoom * 100))}%")
+
+    def eventFilter(self, obj, event):
+        # Ctrl+wheel zooms; plain wheel scrolls
+        if obj is self.view.viewport() and event.type() == QtCore.QEvent.Type.Wheel:
+            if event.modifiers() & QtCore.Qt.KeyboardModifier.ControlModifier:
+                self._zoom_by(1.25 if event.angleDelta().y() > 0 else 0.8)
+                return True
+        return super().eventFilter(obj, event)
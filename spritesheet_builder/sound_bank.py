@@ -0,0 +1,132 @@
+from __future__ import annotations
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Tuple
+import sys
+import wave
+
+# Optional export stage: every WAV sound of a bundle converted to one sample
+# format (16-bit PCM, the most common rate, mono or stereo) and concatenated
+# into sounds/soundbank.pcm. meta.json's "sound_bank" maps each original
+# "sounds/<name>" reference to (offset, length) in bytes, so a game opens
+# and reads one file and slices it. Only the stdlib is used; conversions
+# are buffer slices, except resampling, which is rare.
+
+BANK_NAME = "soundbank.pcm"
+BANK_ALIGN = 16  # every sound starts on a 16-byte boundary
+SAMPLE_WIDTH = 2
+
+
+def _read_wav(path: Path) -> Tuple[int, int, int, bytes] | None:
+    """(rate, channels, sample width, little-endian frames); None if unreadable."""
+    try:
+        with wave.open(str(path), "rb") as w:
+            return w.getframerate(), w.getnchannels(), w.getsampwidth(), w.readframes(w.getnframes())
+    except (wave.Error, EOFError, OSError):
+        return None
+
+
+def _to_16bit(data: bytes, width: int) -> bytes:
+    # keep the two most significant bytes of each sample (8-bit is unsigned)
+    if width == 2:
+        return data
+    n = len(data) // width
+    out = bytearray(2 * n)
+    if width == 1:
+        out[1::2] = data[:n].translate(bytes((b ^ 0x80) for b in range(256)))
+    else:
+        out[0::2] = data[width - 2::width]
+        out[1::2] = data[width - 1::width]
+    return bytes(out)
+
+
+def _samples(data: bytes) -> array:
+    a = array("h", data)
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a
+
+
+def _resample(a: array, channels: int, src_rate: int, dst_rate: int) -> array:
+    """Linear interpolation per channel."""
+    n = len(a) // channels
+    m = max(1, round(n * dst_rate / src_rate))
+    out = array("h", bytes(2 * m * channels))
+    step = (n - 1) / (m - 1) if m > 1 else 0.0
+    for c in range(channels):
+        src = a[c::channels]
+        dst = []
+        for i in range(m):
+            pos = i * step
+            k = int(pos)
+            frac = pos - k
+            s0 = src[k]
+            s1 = src[k + 1] if k + 1 < n else s0
+            dst.append(int(round(s0 + (s1 - s0) * frac)))
+        out[c::channels] = array("h", dst)
+    return out
+
+
+def build_sound_bank(files: List[Path]) -> Tuple[bytes, dict, Dict[Path, Tuple[int, int]]]:
+    """Convert and concatenate WAV files.
+
+    Returns (blob, format {"sample_rate", "channels", "sample_width"},
+    {file: (offset, length)}). Files that are not PCM WAV (other formats,
+    compressed or more than two channels) are left out; callers keep
+    shipping those as separate files.
+    """
+    decoded = {}
+    for f in files:
+        wav = _read_wav(f)
+        if wav is not None and wav[1] in (1, 2) and wav[2] in (1, 2, 3, 4) and wav[3]:
+            decoded[f] = wav
+    if not decoded:
+        return b"", {}, {}
+    rates = Counter(rate for rate, _c, _w, _d in decoded.values())
+    rate = max(rates, key=lambda r: (rates[r], r))
+    channels = max(c for _r, c, _w, _d in decoded.values())
+
+    blob = bytearray()
+    table = {}
+    for f, (src_rate, src_channels, width, data) in decoded.items():
+        a = _samples(_to_16bit(data, width))
+        if src_rate != rate:
+            a = _resample(a, src_channels, src_rate, rate)
+        if src_channels < channels:
+            stereo = array("h", bytes(4 * len(a)))
+            stereo[0::2] = a
+            stereo[1::2] = a
+            a = stereo
+        if sys.byteorder == "big":
+            a.byteswap()
+        blob += b"\0" * (-len(blob) % BANK_ALIGN)
+        table[f] = (len(blob), 2 * len(a))
+        blob += a.tobytes()
+    fmt = {"sample_rate": rate, "channels": channels, "sample_width": SAMPLE_WIDTH}
+    return bytes(blob), fmt, table
+
+
+def pack_sounds(meta: dict, bundle_dir: Path, rel: str = "sounds") -> dict | None:
+    """Bank the WAV files meta.json references under `rel`/ and delete them.
+
+    Sound "file" entries stay as they are and become keys of the returned
+    "sound_bank" block (also stored in meta); None when there was nothing
+    to pack.
+    """
+    refs = [s.get("file", "") for row in meta.get("rows", []) for s in row.get("sounds", [])]
+    refs += [ts.get("file", "") for ts in meta.get("trigger_sounds", [])]
+    files = {}
+    for ref in refs:
+        if ref.startswith(rel + "/") and ref.lower().endswith(".wav"):
+            files[bundle_dir / ref] = ref
+    blob, fmt, table = build_sound_bank(sorted(f for f in files if f.is_file()))
+    if not table:
+        return None
+    (bundle_dir / rel / BANK_NAME).write_bytes(blob)
+    for f in table:
+        f.unlink()
+    bank = dict(fmt, file=f"{rel}/{BANK_NAME}", align=BANK_ALIGN,
+                sounds={files[f]: [offset, length] for f, (offset, length) in table.items()})
+    meta["sound_bank"] = bank
+    return bank
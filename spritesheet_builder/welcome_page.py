@@ -1,5 +1,6 @@
 from PySide6 import QtWidgets, QtCore
-from .project_model import ProjectModel, GridConfig, RowMeta
+import dataclasses
+from .project_model import ProjectModel, GridConfig, RowMeta, ExportOptions
 import os
 
 
@@ -9,6 +10,8 @@ class WelcomePage(QtWidgets.QWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        # grid of the project being edited; keeps crop/key settings on Update
+        self._grid_template: GridConfig | None = None
         self._build_ui()
 
     def set_update_mode(self, update: bool):
@@ -20,15 +23,28 @@ class WelcomePage(QtWidgets.QWidget):
 
     def populate_from_project(self, project: ProjectModel | None):
         if not project:
+            self._grid_template = None
             return
         # Fill form fields from existing project so pressing Update preserves settings
         self.source_edit.setText(project.source_folder)
         self.sheet_name_edit.setText(project.sheet_name)
+        self.frame_w.setValue(int(project.source_frame_size[0]))
+        self.frame_h.setValue(int(project.source_frame_size[1]))
         self.cols_spin.setValue(project.grid.cols)
         self.rows_spin.setValue(project.grid.rows)
         self.tile_w.setValue(project.grid.tile_width)
         self.tile_h.setValue(project.grid.tile_height)
         self.pow2_check.setChecked(project.grid.power_of_two)
+        self.padding_spin.setValue(project.grid.padding)
+        self.margin_spin.setValue(project.grid.margin)
+        self._grid_template = project.grid
+        self.binary_meta_check.setChecked(project.export.binary_meta)
+        self.premul_check.setChecked(project.export.premultiplied_alpha)
+        self.extrude_spin.setValue(project.export.extrude)
+        self.mips_spin.setValue(project.export.mip_levels)
+        self.sound_bank_check.setChecked(project.export.sound_bank)
+        idx = self.previews_combo.findData(project.export.previews)
+        self.previews_combo.setCurrentIndex(max(0, idx))
         # If there is a row 0 meta, use its fps/loop as defaults
         meta0 = project.rows_meta.get(0)
         if meta0:
@@ -48,14 +64,36 @@ class WelcomePage(QtWidgets.QWidget):
         # Source folder picker
         self.source_edit = QtWidgets.QLineEdit()
         browse_btn = QtWidgets.QPushButton("Browse…")
+        file_btn = QtWidgets.QPushButton("File…")
+        file_btn.setToolTip("Use a ZIP of PNGs, an animated GIF/APNG, or a strip/atlas image as the source")
         browse_layout = QtWidgets.QHBoxLayout()
         browse_layout.addWidget(self.source_edit)
         browse_layout.addWidget(browse_btn)
+        browse_layout.addWidget(file_btn)
         browse_widget = QtWidgets.QWidget()
         browse_widget.setLayout(browse_layout)
         form.addRow("Source folder (img/raw/sheets/<sheet_name>/):", browse_widget)
 
         browse_btn.clicked.connect(self._on_browse)
+        file_btn.clicked.connect(self._on_browse_file)
+
+        # Strip/atlas slicing (only used when the source is a single image)
+        self.frame_w = QtWidgets.QSpinBox()
+        self.frame_w.setRange(0, 8192)
+        self.frame_h = QtWidgets.QSpinBox()
+        self.frame_h.setRange(0, 8192)
+        for spin in (self.frame_w, self.frame_h):
+            spin.setSpecialValueText("auto")
+        frame_row = QtWidgets.QHBoxLayout()
+        frame_row.addWidget(QtWidgets.QLabel("W:"))
+        frame_row.addWidget(self.frame_w)
+        frame_row.addSpacing(12)
+        frame_row.addWidget(QtWidgets.QLabel("H:"))
+        frame_row.addWidget(self.frame_h)
+        frame_row.addStretch(1)
+        frame_widget = QtWidgets.QWidget()
+        frame_widget.setLayout(frame_row)
+        form.addRow("Strip frame size:", frame_widget)
 
         # Sheet name
         self.sheet_name_edit = QtWidgets.QLineEdit()
@@ -117,6 +155,21 @@ class WelcomePage(QtWidgets.QWidget):
         self.pow2_check.setChecked(True)
         grid_form.addRow("Atlas size:", self.pow2_check)
 
+        self.padding_spin = QtWidgets.QSpinBox()
+        self.padding_spin.setRange(0, 64)
+        self.margin_spin = QtWidgets.QSpinBox()
+        self.margin_spin.setRange(0, 64)
+        spacing_row = QtWidgets.QHBoxLayout()
+        spacing_row.addWidget(QtWidgets.QLabel("Padding:"))
+        spacing_row.addWidget(self.padding_spin)
+        spacing_row.addSpacing(12)
+        spacing_row.addWidget(QtWidgets.QLabel("Margin:"))
+        spacing_row.addWidget(self.margin_spin)
+        spacing_row.addStretch(1)
+        spw = QtWidgets.QWidget()
+        spw.setLayout(spacing_row)
+        grid_form.addRow("Spacing (px):", spw)
+
         layout.addWidget(grid_box)
 
         # Animation defaults
@@ -131,6 +184,40 @@ class WelcomePage(QtWidgets.QWidget):
         anim_form.addRow("Loop mode:", self.loop_mode_combo)
         layout.addWidget(anim_box)
 
+        # Export options
+        export_box = QtWidgets.QGroupBox("Export Options")
+        export_form = QtWidgets.QFormLayout(export_box)
+        self.binary_meta_check = QtWidgets.QCheckBox("Also write meta.bin (fast loading; meta.json stays authoritative)")
+        export_form.addRow("Metadata:", self.binary_meta_check)
+        self.previews_combo = QtWidgets.QComboBox()
+        for label, value in [("None", ""), ("GIF", "gif"), ("APNG", "apng"), ("WebP", "webp")]:
+            self.previews_combo.addItem(label, value)
+        export_form.addRow("Animated row previews:", self.previews_combo)
+        self.premul_check = QtWidgets.QCheckBox("Premultiplied alpha")
+        export_form.addRow("Texture:", self.premul_check)
+        self.extrude_spin = QtWidgets.QSpinBox()
+        self.extrude_spin.setRange(0, 8)
+        self.extrude_spin.setSuffix(" px")
+        self.extrude_spin.setToolTip("Repeat each tile's edge pixels outwards; limited to half the padding")
+        export_form.addRow("Edge extrusion:", self.extrude_spin)
+        # shown when the padding leaves less room than the requested extrusion
+        self.extrude_note = QtWidgets.QLabel()
+        self.extrude_note.setWordWrap(True)
+        self.extrude_note.setStyleSheet("color: #c07000;")
+        self.extrude_note.setVisible(False)
+        export_form.addRow("", self.extrude_note)
+        for spin in (self.extrude_spin, self.padding_spin, self.cols_spin, self.rows_spin):
+            spin.valueChanged.connect(self._update_extrude_note)
+        self.mips_spin = QtWidgets.QSpinBox()
+        self.mips_spin.setRange(0, 12)
+        self.mips_spin.setSpecialValueText("Off")
+        self.mips_spin.setToolTip("Write this many half-size levels (spritesheet_mip1.png, …)")
+        export_form.addRow("Mip levels:", self.mips_spin)
+        self.sound_bank_check = QtWidgets.QCheckBox("Pack WAV sounds into one sound bank")
+        self.sound_bank_check.setToolTip("Converts WAV sounds to one sample format and stores them in sounds/soundbank.pcm")
+        export_form.addRow("Sounds:", self.sound_bank_check)
+        layout.addWidget(export_box)
+
         # Create/Update button
         self.create_btn = QtWidgets.QPushButton("Create Project ▶")
         self.create_btn.clicked.connect(self._create_project)
@@ -142,6 +229,16 @@ class WelcomePage(QtWidgets.QWidget):
         layout.addWidget(self.continue_btn)
         layout.addStretch(1)
 
+    def _update_extrude_note(self, *_):
+        text = ""
+        if self.extrude_spin.value() > 0:
+            # imported on first use: postprocess pulls in Pillow
+            from .postprocess import extrude_warning
+            grid = GridConfig(cols=self.cols_spin.value(), rows=self.rows_spin.value(), padding=self.padding_spin.value())
+            text = extrude_warning(grid, self.extrude_spin.value())
+        self.extrude_note.setText(text)
+        self.extrude_note.setVisible(bool(text))
+
     def _apply_preset(self, size):
         w, h = size
         self.tile_w.setValue(w)
@@ -156,17 +253,43 @@ class WelcomePage(QtWidgets.QWidget):
             if not self.sheet_name_edit.text():
                 self.sheet_name_edit.setText(base)
 
+    def _on_browse_file(self):
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self, "Select Source File", "", "Frame Sources (*.zip *.gif *.png *.apng *.webp);;All Files (*)"
+        )
+        if path:
+            self.source_edit.setText(path)
+            if not self.sheet_name_edit.text():
+                self.sheet_name_edit.setText(os.path.splitext(os.path.basename(path))[0])
+
     def _create_project(self):
         source = self.source_edit.text().strip()
         sheet = self.sheet_name_edit.text().strip()
-        grid = GridConfig(
+        grid = dataclasses.replace(
+            self._grid_template or GridConfig(),
             cols=self.cols_spin.value(),
             rows=self.rows_spin.value(),
             tile_width=self.tile_w.value(),
             tile_height=self.tile_h.value(),
+            padding=self.padding_spin.value(),
+            margin=self.margin_spin.value(),
             power_of_two=self.pow2_check.isChecked(),
         )
-        project = ProjectModel(sheet_name=sheet, source_folder=source, grid=grid)
+        export = ExportOptions(
+            binary_meta=self.binary_meta_check.isChecked(),
+            previews=self.previews_combo.currentData() or "",
+            premultiplied_alpha=self.premul_check.isChecked(),
+            extrude=self.extrude_spin.value(),
+            mip_levels=self.mips_spin.value(),
+            sound_bank=self.sound_bank_check.isChecked(),
+        )
+        project = ProjectModel(
+            sheet_name=sheet,
+            source_folder=source,
+            grid=grid,
+            export=export,
+            source_frame_size=(self.frame_w.value(), self.frame_h.value()),
+        )
         ok, msg = project.validate()
         if not ok:
             QtWidgets.QMessageBox.warning(self, "Invalid Project", msg)